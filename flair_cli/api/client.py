@@ -1,7 +1,7 @@
 from .auth import verify_auth
 from .basemodel import get_base_model_url, upload_base_model, delete_base_model
 from .repo import create_repo, list_repos, get_repo, clone_repository, get_repo_by_hash
-from .commit import create_commit, list_commits, get_commit
+from .commit import create_commit, list_commits, get_commit, list_branch_commits, get_commit_for_pull
 from .branch import get_branches, create_branch, delete_branch, get_branch_by_name
 from .utils import _base_url, _client_with_auth
 
@@ -20,6 +20,8 @@ __all__ = [
     "create_commit",
     "list_commits",
     "get_commit",
+    "list_branch_commits",
+    "get_commit_for_pull",
     "get_branches",
     "create_branch",
     "delete_branch",
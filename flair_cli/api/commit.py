@@ -19,3 +19,46 @@ def get_commit(repo_id: str, commit_hash: str) -> Dict[str, Any]:
         r = client.get(f"/repos/{repo_id}/commits/{commit_hash}")
         r.raise_for_status()
         return r.json()
+
+
+def list_branch_commits(
+    repo_hash: str,
+    branch_hash: str,
+    since: str | None = None,
+    skip: int | None = None,
+    limit: int | None = None,
+) -> list[Dict[str, Any]]:
+    """Get commit metadata (without params blobs) for the commits in a branch.
+    
+    Args:
+        repo_hash: Repository hash
+        branch_hash: Branch hash
+        since: Only commits created at or after this ISO timestamp, oldest first
+        skip: Number of those commits to skip (paging)
+        limit: Page size
+    
+    Returns:
+        List of commit data (the whole branch when no filter is given)
+    """
+    params = {k: v for k, v in (("since", since), ("skip", skip), ("limit", limit)) if v is not None}
+    with _client_with_auth() as client:
+        r = client.get(f"/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit/", params=params)
+        r.raise_for_status()
+        return r.json().get("data", [])
+
+
+def get_commit_for_pull(repo_hash: str, branch_hash: str, commit_hash: str) -> Dict[str, Any]:
+    """Get full commit details, including params and ZKML IPFS objects.
+    
+    Args:
+        repo_hash: Repository hash
+        branch_hash: Branch hash
+        commit_hash: Commit hash
+    
+    Returns:
+        Commit data
+    """
+    with _client_with_auth() as client:
+        r = client.get(f"/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit/hash/{commit_hash}/pull")
+        r.raise_for_status()
+        return r.json().get("data", {})
@@ -1,13 +1,22 @@
 import os
 import httpx
-from ..core.config import load_config
+from ..core.config import FlairConfig, load_config
 from ..core.session import load_session
 
-_cfg = load_config()
+# Loaded on first request rather than at import, so importing the API layer never touches ~/.flair
+_cfg: FlairConfig | None = None
+
+
+def _config() -> FlairConfig:
+    """Load the CLI config once per process."""
+    global _cfg
+    if _cfg is None:
+        _cfg = load_config()
+    return _cfg
 
 def _base_url() -> str:
     """Resolve API base URL from env or config."""
-    return __import__("os").environ.get("FLAIR_API_BASE") or _cfg.api_base_url or "http://localhost:2112"
+    return os.environ.get("FLAIR_API_BASE") or _config().api_base_url or "http://localhost:2112"
 
 def _client_with_auth() -> httpx.Client:
     """Create HTTP client with authentication headers if session token exists."""
@@ -15,4 +24,4 @@ def _client_with_auth() -> httpx.Client:
     session = load_session()
     if session and session.token:
         headers["Authorization"] = f"Bearer {session.token}"
-    return httpx.Client(base_url=_base_url(), headers=headers, timeout=30)
\ No newline at end of file
+    return httpx.Client(base_url=_base_url(), headers=headers, timeout=30)
@@ -0,0 +1 @@
+"""Performance benchmarks for the Flair CLI storage engine and network paths."""
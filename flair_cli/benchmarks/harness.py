@@ -0,0 +1,129 @@
+"""Timing, memory measurement and baseline comparison shared by the benchmarks."""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_TOLERANCE = 0.25
+# Metrics compared against the baseline (a larger value is a regression) and the
+# absolute change below which a difference is treated as noise.
+REGRESSION_METRICS = {"medianMs": 1.0, "peakTracedMB": 1.0}
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize_samples(samples_ms: list[float], bytes_processed: int = 0) -> dict:
+    """Wall-time statistics and throughput for a list of samples in milliseconds."""
+    median_ms = statistics.median(samples_ms)
+    return {
+        "repeats": len(samples_ms),
+        "minMs": min(samples_ms),
+        "medianMs": median_ms,
+        "meanMs": statistics.fmean(samples_ms),
+        "p95Ms": _percentile(samples_ms, 95),
+        "p99Ms": _percentile(samples_ms, 99),
+        "maxMs": max(samples_ms),
+        "bytes": bytes_processed,
+        "throughputMBs": (bytes_processed / (1024 * 1024)) / (median_ms / 1000) if bytes_processed and median_ms else None,
+    }
+
+
+def measure(fn: Callable[[], object], repeats: int = 5, bytes_processed: int = 0, setup: Callable[[], None] | None = None) -> dict:
+    """Time fn over `repeats` runs after one traced warm-up run.
+
+    The warm-up run executes under tracemalloc to record peak Python/NumPy
+    allocations; timed runs execute without tracing so it does not skew wall time.
+    Torch allocates outside tracemalloc, so torch cases rely on peakRssMB.
+    """
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples_ms: list[float] = []
+    for _ in range(max(1, repeats)):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        samples_ms.append((time.perf_counter() - start) * 1000)
+
+    result = summarize_samples(samples_ms, bytes_processed)
+    result["peakTracedMB"] = peak_traced / (1024 * 1024)
+    result["peakRssMB"] = _peak_rss_mb()
+    return result
+
+
+def environment() -> dict:
+    """Interpreter and library versions recorded with every run."""
+    info = {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine()}
+    try:
+        import numpy as np
+
+        info["numpy"] = np.__version__
+    except ImportError:
+        pass
+    if "torch" in sys.modules:
+        info["torch"] = sys.modules["torch"].__version__
+    return info
+
+
+def write_results(results: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """Cases whose metrics exceed the baseline by more than `tolerance` (a fraction).
+
+    Cases missing from either side are ignored, so adding a case never fails a run.
+    """
+    regressions: list[dict] = []
+    baseline_cases = baseline.get("cases", {})
+    for name, current in results.get("cases", {}).items():
+        previous = baseline_cases.get(name)
+        if not previous:
+            continue
+        for metric, noise_floor in REGRESSION_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > noise_floor:
+                regressions.append({"case": name, "metric": metric, "baseline": old, "current": new, "ratio": new / old})
+    return regressions
@@ -0,0 +1,275 @@
+"""
+Network benchmarks for push and clone.
+
+Runs the real `flair push` and `flair clone` code paths against the in-process
+stand-in backend and IPFS gateway (benchmarks/standin.py), with simulated latency,
+bandwidth and failure rate, and reports commits/s, MB/s and tail latency per step.
+
+    python -m flair_cli.benchmarks.network --latency-ms 40 --bandwidth-mbps 20 --output net.json
+    python -m flair_cli.benchmarks.network --failure-rate 0.02 --baseline net.json   # exits 1 on regression
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterator
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from . import harness
+from .standin import NetworkProfile, StandInServer
+from .storage import _chdir, report_regressions
+from .synthetic import SyntheticRepoSpec, build_push_repo, make_params
+
+app = typer.Typer()
+console = Console()
+
+PUSH_STEPS = ("push.initiate", "push.zkml_check", "push.zkml_upload", "push.params_upload", "push.finalize")
+
+
+@contextlib.contextmanager
+def _quiet(*modules) -> Iterator[None]:
+    """Silence the module-level consoles of the commands under test."""
+    previous = [module.console for module in modules]
+    for module in modules:
+        module.console = Console(quiet=True)
+    try:
+        yield
+    finally:
+        for module, original in zip(modules, previous):
+            module.console = original
+
+
+@contextlib.contextmanager
+def _api_base(url: str) -> Iterator[None]:
+    previous = os.environ.get("FLAIR_API_BASE")
+    os.environ["FLAIR_API_BASE"] = url
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("FLAIR_API_BASE", None)
+        else:
+            os.environ["FLAIR_API_BASE"] = previous
+
+
+def _run_command(fn, **kwargs) -> bool:
+    """Call a typer command function; True when it completed without a non-zero exit."""
+    try:
+        fn(**kwargs)
+    except typer.Exit as e:
+        return e.exit_code == 0
+    except Exception:
+        return False
+    return True
+
+
+def _upload_bytes(commit_dir: Path, commit_data: dict) -> int:
+    """Bytes push uploads for one commit: the params (or delta) file plus the three ZKP files."""
+    if commit_data["commitType"] == "DELTA":
+        params_file = commit_dir / ".delta_params" / commit_data["deltaParams"]["file"]
+    else:
+        params_file = commit_dir / commit_data["params"]["file"]
+    zkp = commit_data["zkp"]
+    files = [params_file] + [commit_dir / zkp[key] for key in ("proof_file", "verification_key_file", "settings_file")]
+    return sum(f.stat().st_size for f in files)
+
+
+def _step_cases(events: list[dict]) -> dict[str, dict]:
+    samples: dict[str, list[float]] = {}
+    step_bytes: dict[str, int] = {}
+    for event in events:
+        if event["name"] in PUSH_STEPS:
+            samples.setdefault(event["name"], []).append(event["dur"] / 1e6)
+            step_bytes[event["name"]] = step_bytes.get(event["name"], 0) + event["args"].get("bytes", 0)
+    return {name: harness.summarize_samples(values, step_bytes[name] // len(values)) for name, values in samples.items()}
+
+
+def run_push_benchmark(server: StandInServer, spec: SyntheticRepoSpec, repeats: int = 3, zkp_kb: int = 16) -> dict[str, dict]:
+    """Push a fresh `spec.chain_length`-commit repo `repeats` times.
+
+    Returns: The "push" case (one sample per full push) plus one case per protocol step
+    """
+    from ..cli import push as push_cmd
+    from ..core import profiling
+
+    samples_ms: list[float] = []
+    pushed = failures = bytes_per_run = 0
+    step_events: list[dict] = []
+
+    for _ in range(max(1, repeats)):
+        repo_hash = server.state.create_repo("bench-push")
+        with tempfile.TemporaryDirectory(prefix="flair-bench-push-") as temp_dir:
+            root = Path(temp_dir)
+            hashes = build_push_repo(root, spec, repo_hash, zkp_bytes=zkp_kb * 1024)
+            commits_dir = root / ".flair" / ".local_commits"
+            bytes_per_run = sum(
+                _upload_bytes(commits_dir / h, json.loads((commits_dir / h / "commit.json").read_text())) for h in hashes
+            )
+
+            profiling.enable()
+            try:
+                with _chdir(root), _api_base(server.base_url), _quiet(push_cmd):
+                    start = time.perf_counter()
+                    ok = _run_command(push_cmd.push, branch_name="main", upstream=None)
+                    samples_ms.append((time.perf_counter() - start) * 1000)
+                step_events.extend(profiling.events())
+            finally:
+                profiling.disable()
+
+        failures += 0 if ok else 1
+        branches = server.state.repos[repo_hash]["branches"].values()
+        pushed += sum(len(branch["commits"]) for branch in branches)
+
+    case = harness.summarize_samples(samples_ms, bytes_per_run)
+    total_s = sum(samples_ms) / 1000
+    case["commits"] = pushed
+    case["commitsPerSec"] = pushed / total_s if total_s else None
+    case["failures"] = failures
+    return {"push": case, **_step_cases(step_events)}
+
+
+def _seed_clone_repo(server: StandInServer, spec: SyntheticRepoSpec, zkp_kb: int) -> tuple[str, int]:
+    """A remote repo whose default branch tip carries params and ZKP blobs."""
+    import numpy as np
+
+    from ..cli.utils.param_io import _save_numpy_params
+
+    repo_hash = server.state.create_repo("bench-clone")
+    branch = server.state.create_branch(repo_hash, "main")
+    with tempfile.TemporaryDirectory(prefix="flair-bench-seed-") as temp_dir:
+        params_file = Path(temp_dir) / "params.npz"
+        _save_numpy_params(make_params(spec), params_file)
+        params = params_file.read_bytes()
+    rng = np.random.default_rng(spec.seed)
+    zkml = {key: rng.bytes(zkp_kb * 1024) for key in ("proof", "settings", "verification_key")}
+    server.state.add_commit(repo_hash, branch["branchHash"], params, zkml=zkml)
+    return repo_hash, len(params) + sum(len(blob) for blob in zkml.values())
+
+
+def run_clone_benchmark(server: StandInServer, spec: SyntheticRepoSpec, repeats: int = 3, zkp_kb: int = 16) -> dict[str, dict]:
+    """Clone a repo with one `spec.model_mb` params blob `repeats` times."""
+    from ..cli import clone as clone_cmd
+
+    repo_hash, bytes_per_run = _seed_clone_repo(server, spec, zkp_kb)
+    samples_ms: list[float] = []
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="flair-bench-clone-") as temp_dir:
+        for index in range(max(1, repeats)):
+            with _api_base(server.base_url), _quiet(clone_cmd):
+                start = time.perf_counter()
+                ok = _run_command(
+                    clone_cmd.clone,
+                    repo_hash=repo_hash,
+                    target_dir=str(Path(temp_dir) / f"clone-{index}"),
+                    branch=None,
+                    branch_hash=None,
+                    depth=None,
+                    filter_spec=None,
+                )
+                samples_ms.append((time.perf_counter() - start) * 1000)
+            failures += 0 if ok else 1
+
+    case = harness.summarize_samples(samples_ms, bytes_per_run)
+    case["failures"] = failures
+    return {"clone": case}
+
+
+def run_network_benchmarks(
+    profile: NetworkProfile,
+    spec: SyntheticRepoSpec,
+    repeats: int = 3,
+    zkp_kb: int = 16,
+    cases: tuple[str, ...] = ("push", "clone"),
+) -> dict:
+    """Start a stand-in with `profile` and run the selected push/clone cases."""
+    results: dict[str, dict] = {}
+    with StandInServer(profile) as server:
+        if "push" in cases:
+            results.update(run_push_benchmark(server, spec, repeats=repeats, zkp_kb=zkp_kb))
+        if "clone" in cases:
+            results.update(run_clone_benchmark(server, spec, repeats=repeats, zkp_kb=zkp_kb))
+    return {
+        "suite": "network",
+        "spec": spec.to_dict(),
+        "profile": asdict(profile),
+        "environment": harness.environment(),
+        "cases": results,
+    }
+
+
+def print_results(results: dict) -> None:
+    profile = results["profile"]
+    bandwidth = f"{profile['bandwidth_mbps']} MB/s" if profile["bandwidth_mbps"] else "unlimited"
+    table = Table(
+        title=f"Network benchmarks ({profile['latency_ms']} ms latency, {bandwidth}, {profile['failure_rate']:.0%} failures)"
+    )
+    table.add_column("Case")
+    table.add_column("Median ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("Commits/s", justify="right")
+    table.add_column("Failures", justify="right")
+    for name, case in results["cases"].items():
+        throughput = case.get("throughputMBs")
+        commits_per_sec = case.get("commitsPerSec")
+        table.add_row(
+            name,
+            f"{case['medianMs']:.2f}",
+            f"{case['p95Ms']:.2f}",
+            f"{case['p99Ms']:.2f}",
+            f"{throughput:.1f}" if throughput else "-",
+            f"{commits_per_sec:.2f}" if commits_per_sec else "-",
+            str(case.get("failures", "-")),
+        )
+    console.print(table)
+
+
+@app.command()
+def network(
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Added latency per request"),
+    bandwidth_mbps: float = typer.Option(None, "--bandwidth-mbps", help="Per-connection bandwidth in MB/s (default unlimited)"),
+    failure_rate: float = typer.Option(0.0, "--failure-rate", help="Fraction of requests failed with 503"),
+    model_mb: float = typer.Option(4.0, "--model-mb", help="Size of the synthetic model (float32) in MB"),
+    tensors: int = typer.Option(16, "--tensors", help="Number of tensors in the model"),
+    commits: int = typer.Option(5, "--commits", help="Commits per push"),
+    checkpoint_every: int = typer.Option(5, "--checkpoint-every", help="CHECKPOINT spacing in pushed chains"),
+    zkp_kb: int = typer.Option(16, "--zkp-kb", help="Size of each synthetic ZKP file in KB"),
+    cases: str = typer.Option("push,clone", "--cases", help="Comma-separated cases to run"),
+    repeats: int = typer.Option(3, "--repeats", help="Timed runs per case"),
+    seed: int = typer.Option(0, "--seed", help="Seed for params and injected failures"),
+    output: Path = typer.Option(None, "--output", "-o", help="Write results JSON to this path"),
+    baseline: Path = typer.Option(None, "--baseline", help="Fail when results regress against this results JSON"),
+    tolerance: float = typer.Option(harness.DEFAULT_TOLERANCE, "--tolerance", help="Allowed slowdown as a fraction"),
+):
+    """Benchmark push and clone against a local stand-in backend."""
+    profile = NetworkProfile(latency_ms=latency_ms, bandwidth_mbps=bandwidth_mbps, failure_rate=failure_rate, seed=seed)
+    spec = SyntheticRepoSpec(
+        model_mb=model_mb,
+        tensor_count=tensors,
+        chain_length=commits,
+        checkpoint_every=checkpoint_every,
+        seed=seed,
+    )
+    selected = tuple(c.strip() for c in cases.split(",") if c.strip() in ("push", "clone"))
+    results = run_network_benchmarks(profile, spec, repeats=repeats, zkp_kb=zkp_kb, cases=selected)
+    print_results(results)
+
+    if output:
+        harness.write_results(results, output)
+        console.print(f"[dim]Results written to {output}[/dim]")
+
+    if not report_regressions(results, baseline, tolerance):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
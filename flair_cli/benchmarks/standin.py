@@ -0,0 +1,524 @@
+"""
+In-process stand-in for the Flair backend and IPFS gateway.
+
+Implements the endpoints the CLI calls (repo/branch lookups, clone, commit listing and
+pull, the five-step commit flow and gateway blob serving) over plain HTTP on
+127.0.0.1, with configurable latency, bandwidth and failure rate. State lives in
+memory; blobs are spooled to a temporary directory.
+
+Responses follow the backend's shapes. Where the CLI reads a field the backend does
+not return yet (finalize's top-level ``commitHash``), the stand-in returns both.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class NetworkProfile:
+    """Simulated network conditions applied to every request."""
+
+    latency_ms: float = 0.0
+    # Per-connection bandwidth in MB/s for request and response bodies (None = unlimited)
+    bandwidth_mbps: float | None = None
+    # Probability that a request fails with 503 before it is handled
+    failure_rate: float = 0.0
+    seed: int = 0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_multipart(content_type: str, body: bytes) -> tuple[dict[str, str], dict[str, bytes]]:
+    """Split a multipart/form-data body into (fields, files)."""
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    fields: dict[str, str] = {}
+    files: dict[str, bytes] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True) or b""
+        if part.get_filename() is not None:
+            files[name] = payload
+        else:
+            fields[name] = payload.decode()
+    return fields, files
+
+
+class StandInState:
+    """Repositories, branches, commits, sessions and blobs held by the stand-in."""
+
+    def __init__(self, blob_dir: Path):
+        self.blob_dir = blob_dir
+        self.base_url = ""
+        self.repos: dict[str, dict] = {}
+        self.sessions: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    # Blobs ---------------------------------------------------------------
+
+    def put_blob(self, data: bytes, extension: str) -> dict:
+        cid = "b" + hashlib.sha256(data).hexdigest()
+        path = self.blob_dir / cid
+        if not path.exists():
+            path.write_bytes(data)
+        return {
+            "cid": cid,
+            "uri": f"{self.base_url}/ipfs/{cid}",
+            "extension": extension.lstrip("."),
+            "size": len(data),
+            "createdAt": _now(),
+        }
+
+    def blob_path(self, cid: str) -> Path | None:
+        path = self.blob_dir / cid
+        return path if re.fullmatch(r"b[0-9a-f]{64}", cid) and path.exists() else None
+
+    # Seeding -------------------------------------------------------------
+
+    def create_repo(self, name: str, owner: str = "bench", base_model: bytes | None = None) -> str:
+        repo_hash = secrets.token_hex(16)
+        with self.lock:
+            self.repos[repo_hash] = {
+                "name": name,
+                "hash": repo_hash,
+                "owner": owner,
+                "metadata": {"repoHash": repo_hash, "framework": "numpy"},
+                "baseModel": self.put_blob(base_model, ".npz") if base_model else None,
+                "defaultBranchHash": None,
+                "createdAt": _now(),
+                "updatedAt": _now(),
+                "branches": {},
+            }
+        return repo_hash
+
+    def create_branch(self, repo_hash: str, name: str, description: str | None = None) -> dict:
+        with self.lock:
+            repo = self.repos[repo_hash]
+            branch_hash = secrets.token_hex(16)
+            branch = {
+                "id": uuid.uuid4().hex,
+                "name": name,
+                "branchHash": branch_hash,
+                "description": description,
+                "createdAt": _now(),
+                "updatedAt": _now(),
+                "commits": [],
+            }
+            repo["branches"][branch_hash] = branch
+            if repo["defaultBranchHash"] is None:
+                repo["defaultBranchHash"] = branch_hash
+            return branch
+
+    def add_commit(
+        self,
+        repo_hash: str,
+        branch_hash: str,
+        params: bytes,
+        commit_type: str = "CHECKPOINT",
+        message: str = "seeded commit",
+        architecture: str = "numpy",
+        zkml: dict[str, bytes] | None = None,
+        commit_hash: str | None = None,
+        param_hash: str | None = None,
+    ) -> dict:
+        """Append a commit with its blobs to a branch, as finalize would."""
+        params_obj = self.put_blob(params, ".pt" if architecture == "pytorch" else ".npz")
+        zkml_obj = {key: self.put_blob(value, ".zlib") for key, value in (zkml or {}).items()}
+        with self.lock:
+            branch = self.repos[repo_hash]["branches"][branch_hash]
+            previous = branch["commits"][-1]["commitHash"] if branch["commits"] else "_GENESIS_COMMIT_"
+            commit = {
+                "id": uuid.uuid4().hex,
+                "commitHash": commit_hash or str(uuid.uuid4()),
+                "previousCommitHash": previous,
+                "commitType": commit_type,
+                "message": message,
+                "architecture": architecture,
+                "paramHash": param_hash or hashlib.sha256(params).hexdigest(),
+                "committerAddress": self.repos[repo_hash]["owner"],
+                "status": "MERGED",
+                "createdAt": _now(),
+                "params": {"ipfsObject": params_obj, "ZKMLProof": zkml_obj or None},
+            }
+            branch["commits"].append(commit)
+            branch["updatedAt"] = _now()
+            return commit
+
+    # Views ---------------------------------------------------------------
+
+    @staticmethod
+    def commit_metadata(commit: dict) -> dict:
+        return {key: value for key, value in commit.items() if key != "params"}
+
+    def branch_view(self, branch: dict, with_latest: bool = False) -> dict:
+        view = {key: value for key, value in branch.items() if key != "commits"}
+        if with_latest:
+            view["latestCommit"] = branch["commits"][-1] if branch["commits"] else None
+        return view
+
+    def clone_view(self, repo_hash: str) -> dict:
+        repo = self.repos[repo_hash]
+        return {
+            "repo": {key: value for key, value in repo.items() if key != "branches"},
+            "branches": [
+                {**self.branch_view(b, with_latest=True), "isDefault": b["branchHash"] == repo["defaultBranchHash"]}
+                for b in repo["branches"].values()
+            ],
+            "branchCount": len(repo["branches"]),
+        }
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _make_handler(state: StandInState, profile: NetworkProfile, rng: random.Random, rng_lock: threading.Lock):
+    routes: list[tuple[str, re.Pattern, str]] = []
+
+    def route(method: str, pattern: str):
+        def decorator(func):
+            routes.append((method, re.compile(f"^{pattern}$"), func.__name__))
+            return func
+
+        return decorator
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and small JSON bodies go out in separate writes; avoid delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):  # noqa: A002 - silence per-request logging
+            pass
+
+        # Transport ------------------------------------------------------
+
+        def _throttle(self, nbytes: int) -> None:
+            if profile.bandwidth_mbps:
+                time.sleep(nbytes / (profile.bandwidth_mbps * 1024 * 1024))
+
+        def _read_body(self) -> bytes:
+            remaining = int(self.headers.get("Content-Length") or 0)
+            chunks = []
+            while remaining > 0:
+                chunk = self.rfile.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self._throttle(len(chunk))
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            return b"".join(chunks)
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_file(self, path: Path) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(path.stat().st_size))
+            self.end_headers()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                    self._throttle(len(chunk))
+                    self.wfile.write(chunk)
+
+        def _dispatch(self, method: str) -> None:
+            path = unquote(urlparse(self.path).path)
+            # push.py prefixes its requests with /api; the API layer does not
+            if path.startswith("/api/"):
+                path = path[4:]
+            body = self._read_body() if method in ("POST", "PUT", "DELETE") else b""
+
+            if profile.latency_ms:
+                time.sleep(profile.latency_ms / 1000)
+            with rng_lock:
+                fail = profile.failure_rate and rng.random() < profile.failure_rate
+            if fail:
+                self._send_json(503, {"error": {"message": "Injected failure"}})
+                return
+
+            for route_method, pattern, handler_name in routes:
+                match = pattern.match(path)
+                if route_method == method and match:
+                    try:
+                        result = getattr(self, handler_name)(body, **match.groupdict())
+                    except _HTTPError as e:
+                        self._send_json(e.status, {"error": {"message": e.message}})
+                        return
+                    except KeyError:
+                        self._send_json(404, {"error": {"message": "Not found."}})
+                        return
+                    if isinstance(result, Path):
+                        self._send_file(result)
+                    else:
+                        status, payload = result
+                        self._send_json(status, payload)
+                    return
+            self._send_json(404, {"error": {"message": f"No route for {method} {path}"}})
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        # Helpers --------------------------------------------------------
+
+        def _json(self, body: bytes) -> dict:
+            return json.loads(body or b"{}")
+
+        def _form(self, body: bytes) -> tuple[dict[str, str], dict[str, bytes]]:
+            return _parse_multipart(self.headers.get("Content-Type", ""), body)
+
+        def _branch(self, repo_hash: str, branch_hash: str) -> dict:
+            return state.repos[repo_hash]["branches"][branch_hash]
+
+        def _session(self, session_id: str, token: str, status: str) -> dict:
+            session = state.sessions.get(session_id)
+            if not session or session["initiateToken"] != token:
+                raise _HTTPError(403, "Invalid or expired initiateToken.")
+            if session["status"] != status:
+                raise _HTTPError(403, f"Invalid or expired session. Expected {status} status.")
+            return session
+
+        # Gateway --------------------------------------------------------
+
+        @route("GET", r"/ipfs/(?P<cid>[^/]+)")
+        def get_blob(self, body, cid):
+            path = state.blob_path(cid)
+            if path is None:
+                raise _HTTPError(404, "Blob not found.")
+            return path
+
+        # Repositories and branches --------------------------------------
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)")
+        def get_repo(self, body, repo_hash):
+            repo = state.repos[repo_hash]
+            return 200, {"data": {key: value for key, value in repo.items() if key != "branches"}}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/clone")
+        def clone(self, body, repo_hash):
+            return 200, {"data": state.clone_view(repo_hash)}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/basemodel/fetch_url")
+        def base_model_url(self, body, repo_hash):
+            base_model = state.repos[repo_hash]["baseModel"]
+            if not base_model:
+                raise _HTTPError(404, "Base model not found.")
+            return 200, {"data": base_model}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/branch")
+        def list_branches(self, body, repo_hash):
+            branches = state.repos[repo_hash]["branches"].values()
+            return 200, {"data": [state.branch_view(b, with_latest=True) for b in branches]}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/name/(?P<name>[^/]+)")
+        def branch_by_name(self, body, repo_hash, name):
+            for branch in state.repos[repo_hash]["branches"].values():
+                if branch["name"] == name:
+                    return 200, {"data": state.branch_view(branch, with_latest=True)}
+            raise _HTTPError(404, "Branch not found.")
+
+        @route("POST", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/create")
+        def create_branch(self, body, repo_hash):
+            payload = self._json(body)
+            branch = state.create_branch(repo_hash, payload.get("name") or "main", payload.get("description"))
+            return 201, {"data": state.branch_view(branch)}
+
+        @route("DELETE", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/hash/(?P<branch_hash>[^/]+)/delete")
+        def delete_branch(self, body, repo_hash, branch_hash):
+            with state.lock:
+                state.repos[repo_hash]["branches"].pop(branch_hash)
+            return 200, {"message": "Branch deleted."}
+
+        # Commits --------------------------------------------------------
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/hash/(?P<branch_hash>[^/]+)/commit/?")
+        def list_commits(self, body, repo_hash, branch_hash):
+            commits = self._branch(repo_hash, branch_hash)["commits"]
+            # Incremental listing, as the backend: createdAt >= since, oldest first, then skip/limit
+            query = parse_qs(urlparse(self.path).query)
+            if "since" in query:
+                commits = [c for c in commits if c["createdAt"] >= query["since"][0]]
+            skip = int(query.get("skip", ["0"])[0])
+            limit = int(query["limit"][0]) if "limit" in query else None
+            commits = commits[skip:None if limit is None else skip + limit]
+            return 200, {"data": [state.commit_metadata(c) for c in commits]}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/hash/(?P<branch_hash>[^/]+)/commit/latest")
+        def latest_commit(self, body, repo_hash, branch_hash):
+            commits = self._branch(repo_hash, branch_hash)["commits"]
+            if not commits:
+                raise _HTTPError(404, "No commits found.")
+            return 200, {"data": state.commit_metadata(commits[-1])}
+
+        @route("GET", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/hash/(?P<branch_hash>[^/]+)/commit/hash/(?P<commit_hash>[^/]+)(?P<pull>/pull)?")
+        def get_commit(self, body, repo_hash, branch_hash, commit_hash, pull=None):
+            for commit in self._branch(repo_hash, branch_hash)["commits"]:
+                if commit["commitHash"] == commit_hash:
+                    return 200, {"data": commit if pull else state.commit_metadata(commit)}
+            raise _HTTPError(404, "Commit not found.")
+
+        # Five-step commit flow ------------------------------------------
+
+        @route("POST", r"/repo/hash/(?P<repo_hash>[^/]+)/branch/hash/(?P<branch_hash>[^/]+)/commit/create/initiate")
+        def initiate(self, body, repo_hash, branch_hash):
+            parent = self._json(body).get("parentCommitHash") or "_GENESIS_COMMIT_"
+            commits = self._branch(repo_hash, branch_hash)["commits"]
+            if parent != "_GENESIS_COMMIT_" and parent not in {c["commitHash"] for c in commits}:
+                raise _HTTPError(404, "Parent commit not found in this branch.")
+            session_id = uuid.uuid4().hex
+            token = secrets.token_hex(16)
+            with state.lock:
+                state.sessions[session_id] = {
+                    "repoHash": repo_hash,
+                    "branchHash": branch_hash,
+                    "parentCommitHash": parent,
+                    "initiateToken": token,
+                    "status": "INITIATED",
+                }
+            return 200, {"sessionId": session_id, "initiateToken": token, "expiresAt": _now()}
+
+        @route("POST", r"/repo/hash/[^/]+/branch/hash/[^/]+/commit/create/zkml-check")
+        def zkml_check(self, body):
+            payload = self._json(body)
+            session = self._session(payload.get("sessionId"), payload.get("initiateToken"), "INITIATED")
+            session["zkmlToken"] = secrets.token_hex(16)
+            session["status"] = "ZKML_CHECKED"
+            return 200, {"zkmlToken": session["zkmlToken"], "expiresAt": _now()}
+
+        @route("POST", r"/repo/hash/[^/]+/branch/hash/[^/]+/commit/create/zkml-upload")
+        def zkml_upload(self, body):
+            fields, files = self._form(body)
+            session = self._session(fields.get("sessionId"), fields.get("initiateToken"), "ZKML_CHECKED")
+            if fields.get("zkmlToken") != session["zkmlToken"]:
+                raise _HTTPError(403, "Invalid or expired zkmlToken.")
+            if not all(key in files for key in ("proof", "settings", "verification_key")):
+                raise _HTTPError(400, "proof, settings and verification_key files are required.")
+            session["zkml"] = {key: state.put_blob(files[key], ".zlib") for key in ("proof", "settings", "verification_key")}
+            session["zkmlReceiptToken"] = secrets.token_hex(16)
+            session["status"] = "ZKML_UPLOADED"
+            return 200, {
+                "success": True,
+                "zkmlReceiptToken": session["zkmlReceiptToken"],
+                "proofCid": session["zkml"]["proof"]["cid"],
+                "settingsCid": session["zkml"]["settings"]["cid"],
+                "vkCid": session["zkml"]["verification_key"]["cid"],
+            }
+
+        @route("POST", r"/repo/hash/[^/]+/branch/hash/[^/]+/commit/create/params-upload")
+        def params_upload(self, body):
+            fields, files = self._form(body)
+            session = self._session(fields.get("sessionId"), fields.get("initiateToken"), "ZKML_UPLOADED")
+            if fields.get("zkmlReceiptToken") != session["zkmlReceiptToken"]:
+                raise _HTTPError(403, "Invalid or expired zkmlReceiptToken.")
+            if "params" not in files:
+                raise _HTTPError(400, "No parameters file uploaded.")
+            session["params"] = state.put_blob(files["params"], Path(fields.get("filename", "params.npz")).suffix)
+            session["paramHash"] = fields.get("paramHash") or hashlib.sha256(files["params"]).hexdigest()
+            session["paramsReceiptToken"] = secrets.token_hex(16)
+            session["status"] = "PARAMS_UPLOADED"
+            return 200, {
+                "success": True,
+                "paramsReceiptToken": session["paramsReceiptToken"],
+                "paramsCid": session["params"]["cid"],
+            }
+
+        @route("POST", r"/repo/hash/[^/]+/branch/hash/[^/]+/commit/create/finalize")
+        def finalize(self, body):
+            payload = self._json(body)
+            session = self._session(payload.get("sessionId"), payload.get("initiateToken"), "PARAMS_UPLOADED")
+            if payload.get("paramsReceiptToken") != session["paramsReceiptToken"]:
+                raise _HTTPError(403, "Invalid or expired paramsReceiptToken.")
+            if not payload.get("message"):
+                raise _HTTPError(400, "Commit message is required.")
+
+            commit_type = (payload.get("commitType") or "CHECKPOINT").upper()
+            with state.lock:
+                branch = state.repos[session["repoHash"]]["branches"][session["branchHash"]]
+                commit = {
+                    "id": uuid.uuid4().hex,
+                    "commitHash": payload.get("commitHash") or str(uuid.uuid4()),
+                    "previousCommitHash": session["parentCommitHash"],
+                    "commitType": "CHECKPOINT" if commit_type == "CHECKPOINT" else "DELTA",
+                    "message": payload["message"],
+                    "architecture": payload.get("architecture"),
+                    "metrics": payload.get("metrics"),
+                    "paramHash": payload.get("paramHash") or session["paramHash"],
+                    "committerAddress": state.repos[session["repoHash"]]["owner"],
+                    "status": "MERGED",
+                    "createdAt": _now(),
+                    "params": {"ipfsObject": session["params"], "ZKMLProof": session["zkml"]},
+                }
+                branch["commits"].append(commit)
+                session["status"] = "FINALIZED"
+            return 201, {"data": commit, "commitHash": commit["commitHash"], "message": "Commit created successfully."}
+
+    return Handler
+
+
+class StandInServer:
+    """Threaded stand-in backend + gateway, usable as a context manager.
+
+        with StandInServer(NetworkProfile(latency_ms=20)) as server:
+            os.environ["FLAIR_API_BASE"] = server.base_url
+    """
+
+    def __init__(self, profile: NetworkProfile | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.profile = profile or NetworkProfile()
+        self._blob_dir = Path(tempfile.mkdtemp(prefix="flair-standin-"))
+        self.state = StandInState(self._blob_dir)
+        handler = _make_handler(self.state, self.profile, random.Random(self.profile.seed), threading.Lock())
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self._httpd.server_address[1]}"
+        self.state.base_url = self.base_url
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="flair-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        shutil.rmtree(self._blob_dir, ignore_errors=True)
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,209 @@
+"""
+Storage-engine micro-benchmarks.
+
+Builds synthetic .flair repositories and times the storage hot paths:
+reconstruction from the nearest CHECKPOINT, delta computation, param_io load/save
+per format, file hashing and architecture hashing.
+
+    python -m flair_cli.benchmarks.storage --model-mb 16 --chain 20 --output results.json
+    python -m flair_cli.benchmarks.storage --baseline baseline.json   # exits 1 on regression
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from . import harness
+from .synthetic import SyntheticRepoSpec, build_synthetic_repo, make_params, params_extension
+
+app = typer.Typer()
+console = Console()
+
+FORMATS = ("numpy", "pytorch")
+
+
+@contextlib.contextmanager
+def _chdir(path: Path) -> Iterator[None]:
+    """Reconstruction resolves .flair relative to the working directory."""
+    previous = Path.cwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _available_formats(requested: list[str]) -> list[str]:
+    formats = []
+    for framework in requested:
+        if framework == "pytorch":
+            try:
+                import torch  # noqa: F401
+            except ImportError:
+                console.print("[yellow]torch not installed; skipping pytorch cases[/yellow]")
+                continue
+        formats.append(framework)
+    return formats
+
+
+def _chain_bytes(root: Path, hashes: list[str], spec: SyntheticRepoSpec) -> int:
+    """Bytes read when reconstructing the last commit: nearest CHECKPOINT plus later deltas."""
+    commits_dir = root / ".flair" / ".local_commits"
+    ext = params_extension(spec.framework)
+    last_checkpoint = (len(hashes) - 1) // max(1, spec.checkpoint_every) * max(1, spec.checkpoint_every)
+    total = (commits_dir / hashes[last_checkpoint] / f"params{ext}").stat().st_size
+    for commit_hash in hashes[last_checkpoint + 1:]:
+        total += (commits_dir / commit_hash / ".delta_params" / f"delta{ext}").stat().st_size
+    return total
+
+
+def run_storage_benchmarks(spec: SyntheticRepoSpec, formats: list[str], repeats: int = 5) -> dict:
+    """Run every storage case for each format and return the results document."""
+    from ..cli.commit import _compute_numpy_delta, _compute_pytorch_delta
+    from ..cli.push import _compute_param_hash
+    from ..cli.utils.architecture import compute_architecture_hash
+    from ..cli.utils.branch_cache import _hash_file
+    from ..cli.utils.param_io import _load_numpy_params, _load_pytorch_params, _save_numpy_params, _save_pytorch_params
+    from ..cli.utils.reconstruction import _reconstruct_params_from_checkpoint
+
+    cases: dict[str, dict] = {}
+    for framework in formats:
+        fw_spec = SyntheticRepoSpec(**{**spec.to_dict(), "framework": framework})
+        ext = params_extension(framework)
+        load = _load_pytorch_params if framework == "pytorch" else _load_numpy_params
+        save = _save_pytorch_params if framework == "pytorch" else _save_numpy_params
+        compute_delta = _compute_pytorch_delta if framework == "pytorch" else _compute_numpy_delta
+
+        with tempfile.TemporaryDirectory(prefix="flair-bench-") as temp_dir:
+            root = Path(temp_dir)
+            hashes = build_synthetic_repo(root, fw_spec)
+            checkpoint_file = root / ".flair" / ".local_commits" / hashes[0] / f"params{ext}"
+            file_bytes = checkpoint_file.stat().st_size
+            params = load(checkpoint_file)
+            previous = load(checkpoint_file)
+            current = {key: value + 1 for key, value in previous.items()}
+            scratch_file = root / f"scratch{ext}"
+
+            with _chdir(root):
+                cases[f"reconstruct.{framework}"] = harness.measure(
+                    lambda: _reconstruct_params_from_checkpoint(hashes[-1], framework),
+                    repeats=repeats,
+                    bytes_processed=_chain_bytes(root, hashes, fw_spec),
+                )
+
+            cases[f"delta.compute.{framework}"] = harness.measure(
+                lambda: compute_delta(current, previous),
+                repeats=repeats,
+                bytes_processed=2 * file_bytes,
+            )
+            cases[f"param_io.load.{framework}"] = harness.measure(
+                lambda: load(checkpoint_file),
+                repeats=repeats,
+                bytes_processed=file_bytes,
+            )
+            cases[f"param_io.save.{framework}"] = harness.measure(
+                lambda: save(params, scratch_file),
+                repeats=repeats,
+                bytes_processed=file_bytes,
+            )
+            cases[f"hash.file.{framework}"] = harness.measure(
+                lambda: _hash_file(checkpoint_file),
+                repeats=repeats,
+                bytes_processed=file_bytes,
+            )
+            cases[f"hash.push_param.{framework}"] = harness.measure(
+                lambda: _compute_param_hash(checkpoint_file),
+                repeats=repeats,
+                bytes_processed=file_bytes,
+            )
+            cases[f"hash.architecture.{framework}"] = harness.measure(
+                lambda: compute_architecture_hash(params, framework=framework),
+                repeats=repeats,
+            )
+
+    return {
+        "suite": "storage",
+        "spec": spec.to_dict(),
+        "formats": formats,
+        "environment": harness.environment(),
+        "cases": cases,
+    }
+
+
+def print_results(results: dict) -> None:
+    table = Table(title=f"Storage benchmarks ({results['spec']['model_mb']} MB, chain {results['spec']['chain_length']})")
+    table.add_column("Case")
+    table.add_column("Median ms", justify="right")
+    table.add_column("p95 ms", justify="right")
+    table.add_column("MB/s", justify="right")
+    table.add_column("Peak traced MB", justify="right")
+    for name, case in results["cases"].items():
+        throughput = case.get("throughputMBs")
+        table.add_row(
+            name,
+            f"{case['medianMs']:.2f}",
+            f"{case['p95Ms']:.2f}",
+            f"{throughput:.1f}" if throughput else "-",
+            f"{case['peakTracedMB']:.1f}",
+        )
+    console.print(table)
+
+
+def report_regressions(results: dict, baseline_path: Path | None, tolerance: float) -> bool:
+    """Print regressions against the baseline. Returns True when the run passes."""
+    if baseline_path is None:
+        return True
+    regressions = harness.compare_to_baseline(results, harness.load_results(baseline_path), tolerance)
+    if not regressions:
+        console.print(f"[green]✓ No regressions against {baseline_path} (tolerance {tolerance:.0%})[/green]")
+        return True
+    for regression in regressions:
+        console.print(
+            f"[red]✗ {regression['case']} {regression['metric']}: "
+            f"{regression['baseline']:.2f} → {regression['current']:.2f} ({regression['ratio']:.2f}x)[/red]"
+        )
+    return False
+
+
+@app.command()
+def storage(
+    model_mb: float = typer.Option(16.0, "--model-mb", help="Size of the synthetic model (float32) in MB"),
+    tensors: int = typer.Option(32, "--tensors", help="Number of tensors in the model"),
+    chain: int = typer.Option(20, "--chain", help="Number of commits in the synthetic chain"),
+    checkpoint_every: int = typer.Option(10, "--checkpoint-every", help="CHECKPOINT spacing in the chain"),
+    formats: str = typer.Option("numpy,pytorch", "--formats", help="Comma-separated param formats"),
+    repeats: int = typer.Option(5, "--repeats", help="Timed runs per case"),
+    seed: int = typer.Option(0, "--seed", help="Seed for the synthetic params"),
+    output: Path = typer.Option(None, "--output", "-o", help="Write results JSON to this path"),
+    baseline: Path = typer.Option(None, "--baseline", help="Fail when results regress against this results JSON"),
+    tolerance: float = typer.Option(harness.DEFAULT_TOLERANCE, "--tolerance", help="Allowed slowdown/growth as a fraction"),
+):
+    """Benchmark reconstruction, delta, param I/O and hashing on synthetic repos."""
+    spec = SyntheticRepoSpec(
+        model_mb=model_mb,
+        tensor_count=tensors,
+        chain_length=chain,
+        checkpoint_every=checkpoint_every,
+        seed=seed,
+    )
+    selected = _available_formats([f.strip() for f in formats.split(",") if f.strip() in FORMATS])
+    results = run_storage_benchmarks(spec, selected, repeats=repeats)
+    print_results(results)
+
+    if output:
+        harness.write_results(results, output)
+        console.print(f"[dim]Results written to {output}[/dim]")
+
+    if not report_regressions(results, baseline, tolerance):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
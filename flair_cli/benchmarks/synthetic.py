@@ -0,0 +1,160 @@
+"""Synthetic .flair repositories for benchmarks.
+
+A synthetic repo is a chain of local commits laid out exactly like `flair commit`
+writes them: full params for CHECKPOINT commits, `.delta_params/delta<ext>` for
+DELTA commits, and HEAD pointing at the newest commit.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ..cli.utils.param_io import _save_numpy_params, _save_pytorch_params
+
+
+@dataclass
+class SyntheticRepoSpec:
+    framework: str = "numpy"
+    model_mb: float = 16.0
+    tensor_count: int = 32
+    chain_length: int = 20
+    checkpoint_every: int = 10
+    delta_scale: float = 1e-3
+    seed: int = 0
+
+    @property
+    def param_count(self) -> int:
+        return max(self.tensor_count, int(self.model_mb * 1024 * 1024 / 4))
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _commit_hash(seed: int, index: int) -> str:
+    return hashlib.sha256(f"synthetic:{seed}:{index}".encode()).hexdigest()
+
+
+def _tensor_shapes(param_count: int, tensor_count: int) -> list[tuple[int, ...]]:
+    """Split param_count float32 values into tensor_count 2-D (weight-like) tensors."""
+    per_tensor = max(1, param_count // tensor_count)
+    cols = max(1, int(per_tensor ** 0.5))
+    rows = max(1, per_tensor // cols)
+    return [(rows, cols) for _ in range(tensor_count)]
+
+
+def make_params(spec: SyntheticRepoSpec, seed_offset: int = 0, scale: float = 1.0) -> dict[str, np.ndarray]:
+    """Deterministic float32 params with the spec's size and tensor count."""
+    rng = np.random.default_rng(spec.seed + seed_offset)
+    return {
+        f"layer{i}.weight": (rng.standard_normal(shape, dtype=np.float32) * scale)
+        for i, shape in enumerate(_tensor_shapes(spec.param_count, spec.tensor_count))
+    }
+
+
+def _to_framework(params: dict[str, np.ndarray], framework: str):
+    if framework == "pytorch":
+        import torch
+
+        return {key: torch.from_numpy(value) for key, value in params.items()}
+    return params
+
+
+def _save(params, file_path: Path, framework: str) -> None:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    saved = _save_pytorch_params(params, file_path) if framework == "pytorch" else _save_numpy_params(params, file_path)
+    if not saved:
+        raise RuntimeError(f"Could not write {file_path}")
+
+
+def params_extension(framework: str) -> str:
+    return ".pt" if framework == "pytorch" else ".npz"
+
+
+def build_synthetic_repo(root: Path, spec: SyntheticRepoSpec) -> list[str]:
+    """Write a synthetic commit chain under root/.flair.
+
+    Returns: Commit hashes, oldest first
+    """
+    flair_dir = root / ".flair"
+    commits_dir = flair_dir / ".local_commits"
+    commits_dir.mkdir(parents=True, exist_ok=True)
+    ext = params_extension(spec.framework)
+
+    hashes: list[str] = []
+    previous_hash = "_GENESIS_COMMIT_"
+    for index in range(spec.chain_length):
+        commit_hash = _commit_hash(spec.seed, index)
+        commit_dir = commits_dir / commit_hash
+        is_checkpoint = index % max(1, spec.checkpoint_every) == 0
+        commit_data = {
+            "commitHash": commit_hash,
+            "previousCommitHash": previous_hash,
+            "commitType": "CHECKPOINT" if is_checkpoint else "DELTA",
+            "message": f"synthetic commit {index}",
+            "params": None,
+            "deltaParams": None,
+        }
+
+        if is_checkpoint:
+            _save(_to_framework(make_params(spec, seed_offset=index), spec.framework), commit_dir / f"params{ext}", spec.framework)
+            commit_data["params"] = {"file": f"params{ext}", "framework": spec.framework}
+        else:
+            delta = make_params(spec, seed_offset=index, scale=spec.delta_scale)
+            _save(_to_framework(delta, spec.framework), commit_dir / ".delta_params" / f"delta{ext}", spec.framework)
+            commit_data["deltaParams"] = {"file": f"delta{ext}", "previousCommitHash": previous_hash}
+
+        commit_dir.mkdir(parents=True, exist_ok=True)
+        with open(commit_dir / "commit.json", "w") as f:
+            json.dump(commit_data, f, indent=2)
+
+        hashes.append(commit_hash)
+        previous_hash = commit_hash
+
+    with open(flair_dir / "HEAD", "w") as f:
+        json.dump({"currentBranch": "main", "latestCommitHash": previous_hash, "previousCommit": previous_hash}, f, indent=2)
+
+    return hashes
+
+
+def build_push_repo(root: Path, spec: SyntheticRepoSpec, repo_hash: str, zkp_bytes: int = 16 * 1024) -> list[str]:
+    """Write a synthetic chain that `flair push` treats as complete.
+
+    Like `flair params create` + `flair zkp create` + `flair commit`, every commit gets
+    full params (DELTA commits keep their delta alongside) and the three ZKP files;
+    repo.json carries the repo hash push uploads to.
+
+    Returns: Commit hashes, oldest first
+    """
+    hashes = build_synthetic_repo(root, spec)
+    flair_dir = root / ".flair"
+    commits_dir = flair_dir / ".local_commits"
+    ext = params_extension(spec.framework)
+    rng = np.random.default_rng(spec.seed)
+
+    for index, commit_hash in enumerate(hashes):
+        commit_dir = commits_dir / commit_hash
+        commit_file = commit_dir / "commit.json"
+        commit_data = json.loads(commit_file.read_text())
+        if commit_data["params"] is None:
+            _save(_to_framework(make_params(spec, seed_offset=index), spec.framework), commit_dir / f"params{ext}", spec.framework)
+            commit_data["params"] = {"file": f"params{ext}", "framework": spec.framework}
+        for name in ("proof.zlib", "verification_key.zlib", "settings.zlib"):
+            (commit_dir / name).write_bytes(rng.bytes(zkp_bytes))
+        commit_data["zkp"] = {
+            "proof_file": "proof.zlib",
+            "verification_key_file": "verification_key.zlib",
+            "settings_file": "settings.zlib",
+        }
+        commit_data["status"] = "FINALIZED"
+        commit_file.write_text(json.dumps(commit_data, indent=2))
+        # push orders local commits by directory mtime
+        os.utime(commit_dir, (1_700_000_000 + index, 1_700_000_000 + index))
+
+    with open(flair_dir / "repo.json", "w") as f:
+        json.dump({"repoHash": repo_hash, "metadata": {"repoHash": repo_hash, "framework": spec.framework}}, f, indent=2)
+    return hashes
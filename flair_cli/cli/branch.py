@@ -8,9 +8,10 @@ from rich.table import Table
 from pathlib import Path
 import json
 import httpx
-import shutil
 
 from ..api import client as api_client
+from ..core.config import load_config
+from .utils import branch_cache
 
 app = typer.Typer()
 console = Console()
@@ -30,93 +31,83 @@ def _get_cache_dir() -> Path:
     return cache_dir
 
 
-def _get_branch_cache_dir(branch_name: str) -> Path:
-    """Get cache directory for a specific branch."""
-    cache_dir = _get_cache_dir()
-    branch_cache = cache_dir / branch_name
-    branch_cache.mkdir(parents=True, exist_ok=True)
-    return branch_cache
-
-
-def _save_artifacts_to_cache(branch_name: str):
-    """Save current params and zkml files to cache for a branch."""
+def _artifact_files() -> list[Path]:
+    """List current params and zkml files in .flair/.params and .flair/.zkp."""
     flair_dir = Path.cwd() / ".flair"
-    branch_cache = _get_branch_cache_dir(branch_name)
+    files: list[Path] = []
     
     # Params from .flair/.params
     params_dir = flair_dir / ".params"
     if params_dir.exists():
-        for file_path in params_dir.glob("params*"):
-            if file_path.is_file():
-                dest = branch_cache / file_path.name
-                shutil.copy2(file_path, dest)
+        files.extend(p for p in params_dir.glob("params*") if p.is_file())
     
     # ZKML files from .flair/.zkp
     zkp_dir = flair_dir / ".zkp"
     if zkp_dir.exists():
-        for file_path in zkp_dir.glob("zkml_*"):
-            if file_path.is_file():
-                dest = branch_cache / file_path.name
-                shutil.copy2(file_path, dest)
+        files.extend(p for p in zkp_dir.glob("zkml_*") if p.is_file())
+    
+    return files
 
 
-def _restore_artifacts_from_cache(branch_name: str) -> bool:
-    """Restore params and zkml files from cache for a branch. Returns True if successful."""
-    branch_cache = _get_branch_cache_dir(branch_name)
+def _artifact_target(file_name: str) -> Path:
+    """Resolve where a cached artifact belongs in the working directories."""
     flair_dir = Path.cwd() / ".flair"
+    if file_name.startswith("params"):
+        return flair_dir / ".params" / file_name
+    return flair_dir / ".zkp" / file_name
+
+
+def _save_artifacts_to_cache(branch_name: str):
+    """Record current params and zkml files as the cached artifacts of a branch.
     
-    # Check if cache has any artifacts
-    if not list(branch_cache.glob("*")):
+    Files are hardlinked into the digest-named object store, so unchanged
+    artifacts are neither copied nor rehashed.
+    """
+    branch_cache._save_branch(_get_cache_dir(), branch_name, _artifact_files())
+
+
+def _restore_artifacts_from_cache(branch_name: str, verify: bool = False) -> bool:
+    """Relink params and zkml files from cache for a branch. Returns True if successful."""
+    flair_dir = Path.cwd() / ".flair"
+    if not branch_cache._load_index(_get_cache_dir())["branches"].get(branch_name):
         return False
     
-    # Ensure directories exist
-    params_dir = flair_dir / ".params"
-    zkp_dir = flair_dir / ".zkp"
-    params_dir.mkdir(exist_ok=True)
-    zkp_dir.mkdir(exist_ok=True)
-    
     # Remove current artifacts from .flair/.params and .flair/.zkp
-    for file_path in params_dir.glob("params*"):
-        if file_path.is_file():
-            file_path.unlink()
+    for file_path in _artifact_files():
+        file_path.unlink()
     
-    for file_path in zkp_dir.glob("zkml_*"):
-        if file_path.is_file():
-            file_path.unlink()
+    (flair_dir / ".params").mkdir(exist_ok=True)
+    (flair_dir / ".zkp").mkdir(exist_ok=True)
     
-    # Restore cached artifacts
-    for cached_file in branch_cache.glob("*"):
-        if cached_file.is_file():
-            if cached_file.name.startswith("params"):
-                dest = params_dir / cached_file.name
-            else:
-                dest = zkp_dir / cached_file.name
-            shutil.copy2(cached_file, dest)
-    
-    return True
+    return branch_cache._restore_branch(
+        _get_cache_dir(),
+        branch_name,
+        _artifact_target,
+        verify=verify,
+        warn=lambda msg: console.print(f"[yellow]Warning: {msg}[/yellow]"),
+    )
 
 
-def _cleanup_old_caches(max_branches: int = 4):
-    """Keep only the latest N cached branches."""
+def _cleanup_old_caches(keep: list[str] | None = None):
+    """Evict least recently used branch caches beyond the configured byte budget."""
     cache_dir = _get_cache_dir()
-    if not cache_dir.exists():
-        return
+    branch_cache._remove_legacy_branch_dirs(cache_dir)
     
-    # Get list of all branch caches
-    branch_caches = sorted(
-        [d for d in cache_dir.iterdir() if d.is_dir()],
-        key=lambda d: d.stat().st_mtime,
-        reverse=True
-    )
+    max_mb = load_config().branch_cache_max_mb
+    if max_mb is None or max_mb < 0:
+        return
     
-    # Remove oldest caches if we exceed max
-    for old_cache in branch_caches[max_branches:]:
-        shutil.rmtree(old_cache)
+    evicted = branch_cache._evict(cache_dir, max_mb * 1024 * 1024, keep=keep or [])
+    for name in evicted:
+        console.print(f"[dim]Evicted cached artifacts for '{name}'[/dim]")
 
 
 def _download_file(url: str, target_path: Path):
     """Download a file from URL to target path."""
     target_path.parent.mkdir(parents=True, exist_ok=True)
+    # Never write through an existing file: it may be hardlinked into the cache
+    if target_path.exists():
+        target_path.unlink()
     with httpx.stream("GET", url, timeout=120) as resp:
         resp.raise_for_status()
         with open(target_path, "wb") as f:
@@ -375,13 +366,15 @@ def list_or_create_branch(
 @app.command()
 def checkout(
     branch_name: str = typer.Argument(..., help="Branch name to switch to"),
-    no_cache: bool = typer.Option(False, "--no-cache", help="Force download instead of using cache")
+    no_cache: bool = typer.Option(False, "--no-cache", help="Force download instead of using cache"),
+    verify: bool = typer.Option(False, "--verify", help="Rehash cached artifacts before restoring them")
 ):
     """Switch to a different branch with intelligent artifact caching.
     
-    - If branch is cached, artifacts are restored from cache
+    - If branch is cached, artifacts are relinked from the digest-named object store
     - If branch is not cached, artifacts are downloaded and cached
     - Current artifacts are cached before switching
+    - Least recently used branches are evicted beyond branch_cache_max_mb
     
     Example:
       flair checkout main
@@ -417,7 +410,7 @@ def checkout(
         # Step 2: Try to restore from cache (unless --no-cache flag)
         artifacts_restored = False
         if not no_cache:
-            artifacts_restored = _restore_artifacts_from_cache(branch_name)
+            artifacts_restored = _restore_artifacts_from_cache(branch_name, verify=verify)
             if artifacts_restored:
                 console.print(f"[green]✓ Restored artifacts from cache[/green]")
         
@@ -436,8 +429,8 @@ def checkout(
         }
         _set_current_branch(head_data)
         
-        # Step 5: Cleanup old caches (keep only 4 branches)
-        _cleanup_old_caches(max_branches=4)
+        # Step 5: Evict least recently used caches beyond the byte budget
+        _cleanup_old_caches(keep=[branch_name])
         
         console.print(f"✓ Switched to branch '{branch_name}'", style="green")
         
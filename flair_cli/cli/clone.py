@@ -11,6 +11,7 @@ import re
 import httpx
 
 from ..api import client as api_client
+from .utils.remote_commits import _record_remote_history, _select_history
 
 app = typer.Typer()
 console = Console()
@@ -39,16 +40,32 @@ def clone(
     repo_hash: str = typer.Argument(..., help="Repository hash"),
     target_dir: str = typer.Option(None, "--target-dir", "-C", help="Target directory (defaults to repo name)"),
     branch: str = typer.Option(None, "--branch", help="Branch name to download artifacts for"),
-    branch_hash: str = typer.Option(None, "--branch-hash", help="Branch hash to download artifacts for")
+    branch_hash: str = typer.Option(None, "--branch-hash", help="Branch hash to download artifacts for"),
+    depth: int = typer.Option(None, "--depth", help="Record the last N commits of history (extended to the nearest CHECKPOINT)"),
+    filter_spec: str = typer.Option(None, "--filter", help="History filter: 'lazy' records the full commit chain and fetches blobs on demand")
 ):
     """Clone a remote repository to local directory.
     
+    With --depth or --filter=lazy, commit metadata is recorded in .flair/.remote_commits
+    so log, diff, reset and revert can work on older commits. Params and delta blobs are
+    only downloaded when reconstruction needs them (nearest CHECKPOINT plus the deltas
+    on the path).
+    
         Examples:
             flair clone <repo_hash>
             flair clone <repo_hash> --target-dir ./my-repo
             flair clone <repo_hash> --branch main
             flair clone <repo_hash> --branch-hash 123e4567
+            flair clone <repo_hash> --depth 10
+            flair clone <repo_hash> --filter=lazy
     """
+    if filter_spec is not None and filter_spec != "lazy":
+        console.print(f"[red]Unsupported filter '{filter_spec}'. Supported filters: lazy[/red]")
+        raise typer.Exit(code=1)
+    if depth is not None and depth <= 0:
+        console.print("[red]--depth must be greater than 0[/red]")
+        raise typer.Exit(code=1)
+    
     try:
         # Fetch clone data from backend using repo hash
         clone_data = api_client.clone_repository(repo_hash)
@@ -204,6 +221,27 @@ def clone(
                     console.print(f"[dim]Downloading {label.replace('_', ' ')} for {selected_branch.get('name')}...[/dim]")
                     _download_file(obj["uri"], target)
 
+        # Record commit history metadata for partial clones (blobs are fetched lazily)
+        if selected_branch and (depth is not None or filter_spec == "lazy"):
+            latest_commit = selected_branch.get("latestCommit") or {}
+            head_hash = latest_commit.get("commitHash")
+            if head_hash:
+                history = api_client.list_branch_commits(repo_hash_returned, selected_branch.get("branchHash"))
+                chain = _select_history(history, head_hash, depth=depth)
+                recorded = _record_remote_history(flair_dir, chain, repo_hash_returned, selected_branch.get("branchHash"))
+                
+                # Track REMOTE_HEAD so reset cannot move behind the cloned history
+                remote_head_data = {
+                    "currentBranch": selected_branch.get("name"),
+                    "branchHash": selected_branch.get("branchHash"),
+                    "latestCommitHash": head_hash,
+                    "previousCommit": head_hash
+                }
+                with open(flair_dir / "REMOTE_HEAD", "w") as f:
+                    json.dump(remote_head_data, f, indent=2)
+                
+                console.print(f"[dim]Recorded {recorded} commit(s) of history; blobs are fetched on demand[/dim]")
+
         # Display clone info
         console.print(f"✓ Repository cloned successfully!", style="green")
         console.print(f"  Name: {repo_name}")
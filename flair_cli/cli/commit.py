@@ -9,8 +9,10 @@ from pathlib import Path
 import json
 import hashlib
 
+from ..core.profiling import profiled
 from .utils.local_commits import _get_commit_by_hash, _get_head_info, _get_latest_local_commit
 from .utils.architecture import ArchitectureMismatch, compute_architecture_hash, resolve_commit_type
+from .utils.commit_stats import compute_commit_stats, _write_commit_stats
 from .utils.param_io import _load_numpy_params as _shared_load_numpy_params
 from .utils.param_io import _load_pytorch_params as _shared_load_pytorch_params
 from .utils.param_io import _save_numpy_params as _shared_save_numpy_params
@@ -56,6 +58,7 @@ def _is_genesis_commit() -> bool:
     return False
 
 
+@profiled("delta.compute")
 def _compute_pytorch_delta(
     current_params,
     previous_params,
@@ -82,6 +85,7 @@ def _compute_pytorch_delta(
         return None
 
 
+@profiled("delta.compute")
 def _compute_numpy_delta(
     current_params: dict,
     previous_params: dict,
@@ -220,6 +224,7 @@ def _cleanup_old_full_params() -> int:
     return cleaned_count
 
 
+@profiled("hash.file")
 def _compute_file_hash(file_path: Path) -> str:
     """Compute SHA256 hash of a file."""
     sha256 = hashlib.sha256()
@@ -229,6 +234,19 @@ def _compute_file_hash(file_path: Path) -> str:
     return sha256.hexdigest()
 
 
+def _record_commit_stats(commit_dir: Path, params, delta_params, previous_commit_hash: str | None) -> None:
+    """Write the stats sidecar read by `flair diff --fast` and `flair log --stat`.
+
+    Stats are an accelerator only, so a failure here warns instead of failing the commit.
+    """
+    try:
+        stats = compute_commit_stats(params, delta_params, delta_base=previous_commit_hash)
+        _write_commit_stats(commit_dir, stats)
+        console.print(f"[dim]Recorded tensor statistics for {len(stats['tensors'])} tensor(s)[/dim]")
+    except Exception as e:
+        console.print(f"[yellow]Warning: Failed to record commit statistics: {e}[/yellow]")
+
+
 def _load_staged_metrics(flair_dir: Path) -> dict | None:
     """Load staged metrics from .flair/metrics.json when present."""
     metrics_file = flair_dir / "metrics.json"
@@ -316,6 +334,8 @@ def finalize(
         
         # Determine commit type: CHECKPOINT for genesis or when architecture changes.
         framework = commit_data.get("architecture", "pytorch").lower()
+        current_params = None
+        delta_params = None
         head_info = _get_head_info()
         previous_commit_hash = head_info.get("previousCommit") if head_info else "_GENESIS_COMMIT_"
 
@@ -471,6 +491,20 @@ def finalize(
         if commit_type == "CHECKPOINT" and architecture_changed:
             commit_data["deltaParams"] = None
 
+        if current_params is None:
+            current_params_file = commit_dir / commit_data["params"]["file"]
+            if framework == "pytorch":
+                current_params = _load_pytorch_params(current_params_file)
+            else:
+                current_params = _load_numpy_params(current_params_file)
+        if current_params is not None:
+            _record_commit_stats(
+                commit_dir,
+                current_params,
+                delta_params if commit_type == "DELTA" else None,
+                previous_commit_hash,
+            )
+
         staged_metrics = _load_staged_metrics(flair_dir)
         if staged_metrics is not None:
             commit_data["metrics"] = staged_metrics
@@ -39,6 +39,16 @@ def view():
     session_timeout = cfg.session_timeout_hours or 168
     table.add_row("session_timeout_hours", str(session_timeout), "config")
     
+    cache_budget = cfg.branch_cache_max_mb if cfg.branch_cache_max_mb is not None else 10240
+    table.add_row("branch_cache_max_mb", str(cache_budget), "config")
+    
+    diff_cache_entries = cfg.diff_cache_max_entries if cfg.diff_cache_max_entries is not None else 256
+    table.add_row("diff_cache_max_entries", str(diff_cache_entries), "config")
+
+    merger_address = os.environ.get("FLAIR_MERGER_ADDRESS") or cfg.merger_address
+    merger_source = "env" if os.environ.get("FLAIR_MERGER_ADDRESS") else "config"
+    table.add_row("merger_address", merger_address or "-", f"[dim]({merger_source})[/dim]")
+    
     console.print(table)
     console.print(f"\n[dim]Config file: {config_mod.CONFIG_PATH}[/dim]")
 
@@ -47,7 +57,10 @@ def view():
 def set_config(
     api_base_url: str = typer.Option(None, help="Backend API base URL"),
     auth_url: str = typer.Option(None, help="Auth frontend URL"),
-    session_timeout_hours: int = typer.Option(None, help="Session timeout in hours (default: 168)")
+    session_timeout_hours: int = typer.Option(None, help="Session timeout in hours (default: 168)"),
+    branch_cache_max_mb: int = typer.Option(None, help="Branch artifact cache budget in MB (default: 10240)"),
+    diff_cache_max_entries: int = typer.Option(None, help="Diff result cache budget in entries (default: 256)"),
+    merger_address: str = typer.Option(None, help="Wallet address the merger service commits with"),
 ):
     """Set configuration values in ~/.flair/config.yaml.
     
@@ -78,6 +91,21 @@ def set_config(
         console.print(f"✓ Set session_timeout_hours = {session_timeout_hours}", style="green")
         changed = True
     
+    if branch_cache_max_mb is not None:
+        cfg.branch_cache_max_mb = branch_cache_max_mb
+        console.print(f"✓ Set branch_cache_max_mb = {branch_cache_max_mb}", style="green")
+        changed = True
+    
+    if diff_cache_max_entries is not None:
+        cfg.diff_cache_max_entries = diff_cache_max_entries
+        console.print(f"✓ Set diff_cache_max_entries = {diff_cache_max_entries}", style="green")
+        changed = True
+    
+    if merger_address:
+        cfg.merger_address = merger_address
+        console.print(f"✓ Set merger_address = {merger_address}", style="green")
+        changed = True
+    
     if changed:
         config_mod.save_config(cfg)
         console.print(f"[dim]Config saved to {config_mod.CONFIG_PATH}[/dim]")
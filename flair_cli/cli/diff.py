@@ -5,21 +5,86 @@ This module provides comprehensive diff functionality for federated learning,
 and model reproducibility workflows.
 """
 
+import csv
+import heapq
+import io
 import json
-from typing import Dict, Any, Tuple, List
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Tuple, List, Optional
 import numpy as np
 import typer
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
+from ..core.config import load_config
+from ..core.profiling import profiled
+from .utils.approx_diff import iter_sampled_tensors, summarize_samples
+from .utils.commit_stats import _load_commit_stats, estimate_diff
+from .utils.diff_cache import DIFF_CACHE_DIR, _load_diff, _store_diff
+from .utils.diff_kernel import (
+    DiffTotals,
+    ParamSpool,
+    TensorDiff,
+    _as_array,
+    _is_torch_tensor,
+    default_jobs,
+    iter_tensor_diffs,
+    similarity_from_gram,
+)
 from .utils.local_commits import _get_commit_by_hash
-from .utils.reconstruction import _reconstruct_params_from_checkpoint
+from .utils.reconstruction import _delta_path, _open_param_view, _reconstruct_params_from_checkpoint, _sum_deltas
 
 app = typer.Typer(help="Compare two commits")
 console = Console()
 
 
+def _resolve_framework(metadata: Dict[str, Any], commit_dir) -> str:
+    """Framework recorded for a commit, falling back to its params file extension."""
+    params_info = metadata.get("params") or {}
+    framework = params_info.get("framework")
+    
+    # Fallback: detect framework from params file if not stored
+    if not framework:
+        # DELTA commits may only carry their delta; its extension tells the framework
+        params_file = params_info.get("file") or (metadata.get("deltaParams") or {}).get("file")
+        if params_file and not params_info.get("file"):
+            commit_dir = commit_dir / ".delta_params"
+        if params_file:
+            params_path = commit_dir / params_file
+            if params_path.exists():
+                ext = params_path.suffix.lower()
+                if ext in [".pt", ".pth"]:
+                    framework = "pytorch"
+                else:
+                    framework = "numpy"
+        else:
+            framework = "numpy"  # Default fallback
+    return framework
+
+
+def _silent(msg: str) -> None:
+    pass
+
+
+def _load_metadata(commit_hash: str) -> Dict[str, Any]:
+    commit_result = _get_commit_by_hash(commit_hash)
+    if not commit_result:
+        raise FileNotFoundError(f"Commit not found: {commit_hash}")
+    return commit_result[0]
+
+
+def _diff_cache_dir() -> Optional[Path]:
+    flair_dir = Path.cwd() / ".flair"
+    return flair_dir / DIFF_CACHE_DIR if flair_dir.exists() else None
+
+
+def _diff_cache_max_entries() -> Optional[int]:
+    return load_config().diff_cache_max_entries
+
+
+@profiled("diff.load")
 def load_commit_params(commit_hash: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
     """
     Load and reconstruct parameters for a commit.
@@ -40,37 +105,14 @@ def load_commit_params(commit_hash: str) -> Tuple[Dict[str, np.ndarray], Dict[st
         raise FileNotFoundError(f"Commit not found: {commit_hash}")
     
     metadata, commit_dir = commit_result
-    
-    # Extract framework from commit metadata
-    params_info = metadata.get("params", {})
-    framework = params_info.get("framework")
-    
-    # Fallback: detect framework from params file if not stored
-    if not framework:
-        params_file = params_info.get("file")
-        if params_file:
-            params_path = commit_dir / params_file
-            if params_path.exists():
-                ext = params_path.suffix.lower()
-                if ext in [".pt", ".pth"]:
-                    framework = "pytorch"
-                else:
-                    framework = "numpy"
-        else:
-            framework = "numpy"  # Default fallback
+    framework = _resolve_framework(metadata, commit_dir)
     
     # Reconstruct parameters using the reconstruction function
-    def _info_callback(msg: str):
-        pass  # Silent callbacks
-    
-    def _warn_callback(msg: str):
-        pass  # Silent callbacks
-    
     params = _reconstruct_params_from_checkpoint(
         commit_hash,
         framework,
-        info=_info_callback,
-        warn=_warn_callback,
+        info=_silent,
+        warn=_silent,
     )
     
     if params is None:
@@ -79,35 +121,152 @@ def load_commit_params(commit_hash: str) -> Tuple[Dict[str, np.ndarray], Dict[st
     return params, metadata
 
 
+@profiled("diff.chain")
+def load_chain_params(
+    commit_a: str,
+    commit_b: str,
+) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], bool, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Load a diff along the delta chain when one commit descends from the other.
+    
+    Only the ancestor is reconstructed; the change between the commits is the sum
+    of the deltas stored on the path, so the cost is one reconstruction plus the
+    size of those deltas rather than two full reconstructions. Statistics derived
+    from the summed delta match a full diff up to float rounding of the replayed
+    weights.
+    
+    Args:
+        commit_a: First commit hash
+        commit_b: Second commit hash
+        
+    Returns:
+        Tuple of (ancestor params, summed delta, whether commit_b is the ancestor,
+        metadata A, metadata B), or None when the commits are not linked by DELTA
+        commits only
+    """
+    if commit_a == commit_b:
+        return None
+    
+    swapped = False
+    path = _delta_path(commit_a, commit_b)
+    if path is None:
+        path = _delta_path(commit_b, commit_a)
+        swapped = True
+    if path is None:
+        return None
+    
+    ancestor = commit_b if swapped else commit_a
+    ancestor_params, ancestor_metadata = load_commit_params(ancestor)
+    descendant_metadata, descendant_dir = path[-1][1], path[-1][2]
+    
+    delta = _sum_deltas(path, _resolve_framework(descendant_metadata, descendant_dir), warn=_silent)
+    if delta is None:
+        return None
+    
+    if swapped:
+        return ancestor_params, delta, True, descendant_metadata, ancestor_metadata
+    return ancestor_params, delta, False, ancestor_metadata, descendant_metadata
+
+
 def flatten_params(params: Dict[str, np.ndarray]) -> np.ndarray:
-    """Flatten all parameters into a single vector."""
+    """
+    Flatten all parameters into a single vector.
+    
+    This copies the whole model; the diff itself streams tensors through the
+    kernel instead. NumPy arrays and torch tensors are included (bfloat16 as float32).
+    """
     flattened = []
     for value in params.values():
-        if isinstance(value, np.ndarray):
-            flattened.append(value.flatten())
+        if isinstance(value, np.ndarray) or _is_torch_tensor(value):
+            flattened.append(_as_array(value)[:])
     return np.concatenate(flattened) if flattened else np.array([])
 
 
+@profiled("diff.kernel")
+def compute_tensor_diffs(
+    params_a: Dict[str, np.ndarray],
+    params_b: Dict[str, np.ndarray],
+    jobs: int = 1,
+    b_is_delta: bool = False,
+    swap_sides: bool = False,
+) -> List[TensorDiff]:
+    """
+    Run the single-pass diff kernel over every shared tensor.
+    
+    The result feeds compute_overall_stats and compute_layer_stats, so each
+    weight is read once per diff.
+    
+    Args:
+        params_a: Parameters from commit A
+        params_b: Parameters from commit B
+        jobs: Worker threads; results are identical for any value
+        b_is_delta: params_b is the summed delta from params_a (see load_chain_params)
+        swap_sides: params_a is the ancestor of the commit given first
+        
+    Returns:
+        List of per-tensor accumulators, in sorted key order
+    """
+    return list(iter_tensor_diffs(params_a, params_b, jobs=jobs, b_is_delta=b_is_delta, swap_sides=swap_sides))
+
+
+def compute_diff_payload(
+    params_a: Dict[str, np.ndarray],
+    params_b: Dict[str, np.ndarray],
+    params_b_shapes: Dict[str, np.ndarray],
+    architecture_hash_a: str,
+    architecture_hash_b: str,
+    top_k: Optional[int] = None,
+    jobs: int = 1,
+    b_is_delta: bool = False,
+    swap_sides: bool = False,
+) -> Dict[str, Any]:
+    """
+    Overall statistics, per-layer statistics and merge readiness of a diff.
+    
+    This is the part of a diff that depends on the weights, and what the diff
+    cache stores. See load_chain_params for b_is_delta/swap_sides.
+    
+    Returns:
+        Dictionary with "overall", "layers" and "mergeReadiness"
+    """
+    # One pass over every tensor feeds both the overall and per-layer statistics
+    tensor_diffs = compute_tensor_diffs(params_a, params_b, jobs=jobs, b_is_delta=b_is_delta, swap_sides=swap_sides)
+    overall_stats = compute_overall_stats(
+        params_a, params_b, architecture_hash_a, architecture_hash_b, tensor_diffs=tensor_diffs
+    )
+    layer_stats = compute_layer_stats(params_a, params_b, tensor_diffs=tensor_diffs, top_k=top_k)
+    merge_readiness = compute_merge_readiness(
+        overall_stats["architecture_compatible"],
+        params_a,
+        params_b_shapes,
+        overall_stats,
+    )
+    return {"overall": overall_stats, "layers": layer_stats, "mergeReadiness": merge_readiness}
+
+
+@profiled("diff.overall_stats")
 def compute_overall_stats(
     params_a: Dict[str, np.ndarray],
     params_b: Dict[str, np.ndarray],
     architecture_hash_a: str,
     architecture_hash_b: str,
+    tensor_diffs: Optional[List[TensorDiff]] = None,
 ) -> Dict[str, Any]:
     """
     Compute overall statistics comparing two parameter sets.
     
+    Cosine similarity is taken over the tensors present in both commits with
+    matching shapes, accumulated in float64.
+    
     Args:
         params_a: Parameters from commit A
         params_b: Parameters from commit B
         architecture_hash_a: Architecture hash from commit A
         architecture_hash_b: Architecture hash from commit B
+        tensor_diffs: Precomputed kernel results (computed here when omitted)
         
     Returns:
         Dictionary with overall statistics
-        
-    Raises:
-        ValueError: If architectures don't match
     """
     if architecture_hash_a != architecture_hash_b:
         return {
@@ -116,57 +275,21 @@ def compute_overall_stats(
             "architecture_hash_b": architecture_hash_b,
         }
     
-    total_params = 0
-    changed_params = 0
-    delta_norms = []
-    
-    vec_a = flatten_params(params_a)
-    vec_b = flatten_params(params_b)
-    
-    # Compute per-parameter statistics
-    for key in params_a.keys():
-        if key not in params_b:
-            continue
-        
-        p_a = params_a[key]
-        p_b = params_b[key]
-        
-        if p_a.shape != p_b.shape:
-            continue
-        
-        total_params += p_a.size
-        diff = p_b - p_a
-        
-        changed = np.count_nonzero(diff)
-        changed_params += changed
-        
-        delta_norm = np.linalg.norm(diff)
-        delta_norms.append(delta_norm)
-    
-    delta_norms = np.array(delta_norms)
+    if tensor_diffs is None:
+        tensor_diffs = compute_tensor_diffs(params_a, params_b)
     
-    # Compute cosine similarity
-    cosine_sim = 1.0
-    if len(vec_a) > 0 and len(vec_b) > 0:
-        norm_a = np.linalg.norm(vec_a)
-        norm_b = np.linalg.norm(vec_b)
-        if norm_a > 0 and norm_b > 0:
-            cosine_sim = float(np.dot(vec_a, vec_b) / (norm_a * norm_b))
-    
-    return {
-        "architecture_compatible": True,
-        "total_parameters": int(total_params),
-        "changed_parameters": int(changed_params),
-        "percent_changed": float(100.0 * changed_params / total_params) if total_params > 0 else 0.0,
-        "mean_delta_norm": float(np.mean(delta_norms)) if len(delta_norms) > 0 else 0.0,
-        "max_delta_norm": float(np.max(delta_norms)) if len(delta_norms) > 0 else 0.0,
-        "cosine_similarity": cosine_sim,
-    }
+    totals = DiffTotals()
+    for tensor_diff in tensor_diffs:
+        totals.add(tensor_diff)
+    return totals.overall_stats()
 
 
+@profiled("diff.layer_stats")
 def compute_layer_stats(
     params_a: Dict[str, np.ndarray],
     params_b: Dict[str, np.ndarray],
+    tensor_diffs: Optional[List[TensorDiff]] = None,
+    top_k: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     Compute per-layer statistics.
@@ -174,38 +297,235 @@ def compute_layer_stats(
     Args:
         params_a: Parameters from commit A
         params_b: Parameters from commit B
+        tensor_diffs: Precomputed kernel results (computed here when omitted)
+        top_k: Keep only the k layers with the largest delta norm (heap selection)
         
     Returns:
         List of layer statistics, sorted by delta norm descending
     """
-    layer_stats = []
+    if tensor_diffs is None:
+        tensor_diffs = compute_tensor_diffs(params_a, params_b)
     
-    for key in sorted(params_a.keys()):
-        if key not in params_b:
-            continue
-        
-        p_a = params_a[key]
-        p_b = params_b[key]
+    if top_k is not None:
+        selected = heapq.nlargest(top_k, tensor_diffs, key=lambda t: t.delta_norm)
+    else:
+        selected = sorted(tensor_diffs, key=lambda t: t.delta_norm, reverse=True)
+    return [tensor_diff.to_layer_stats() for tensor_diff in selected]
+
+
+@profiled("diff.matrix")
+def compute_similarity_matrix(
+    commits: List[str],
+    base: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Pairwise cosine similarity and L2 distance between many commits.
+    
+    Each commit (and the base, if given) is reconstructed once and written as a row
+    of an on-disk float32 matrix under .flair; the Gram matrix is then accumulated
+    over column blocks with BLAS. Cost is n loads and memory is one model plus one
+    block, rather than n² pairwise diffs.
+    
+    Args:
+        commits: Commit hashes, in output order
+        base: Optional commit whose params are subtracted from every commit first,
+            so cosine similarity compares updates rather than whole models
         
-        if p_a.shape != p_b.shape:
-            continue
+    Returns:
+        Dictionary with the commit list, base, and both matrices as nested lists
         
-        diff = p_b - p_a
-        delta_norm = float(np.linalg.norm(diff))
-        percent_changed = float(100.0 * np.count_nonzero(diff) / p_a.size) if p_a.size > 0 else 0.0
-        max_abs_diff = float(np.max(np.abs(diff))) if p_a.size > 0 else 0.0
+    Raises:
+        ValueError: If commits have different parameter layouts
+    """
+    base_params = load_commit_params(base)[0] if base else None
+    spool_parent = Path.cwd() / ".flair"
+    
+    with tempfile.TemporaryDirectory(prefix="matrix-", dir=spool_parent if spool_parent.exists() else None) as spool_dir:
+        spool = None
+        for row, commit_hash in enumerate(commits):
+            params, _ = load_commit_params(commit_hash)
+            if spool is None:
+                spool = ParamSpool(Path(spool_dir) / "params.f32", ParamSpool.layout_of(params), len(commits))
+            spool.write_row(row, params, base=base_params)
+            del params
+        gram = spool.gram()
+        del spool
+    
+    cosine, distance = similarity_from_gram(gram)
+    return {
+        "commits": commits,
+        "base": base,
+        "cosineSimilarity": cosine.tolist(),
+        "l2Distance": distance.tolist(),
+    }
+
+
+@profiled("diff.fast")
+def compute_fast_diff(commit_a: str, commit_b: str) -> Dict[str, Any]:
+    """
+    Estimate a diff from the stats sidecars written at commit time.
+    
+    No params are loaded or reconstructed. Norms are exact; delta norms are exact
+    when one commit's delta is taken against the other, and estimated from the
+    count sketches otherwise (see estimate_diff).
+    
+    Raises:
+        FileNotFoundError: If a commit doesn't exist
+        ValueError: If a commit has no stats sidecar or the layouts differ
+    """
+    stats = []
+    for commit_hash in (commit_a, commit_b):
+        commit_result = _get_commit_by_hash(commit_hash)
+        if not commit_result:
+            raise FileNotFoundError(f"Commit not found: {commit_hash}")
+        commit_stats = _load_commit_stats(commit_result[1])
+        if commit_stats is None:
+            raise ValueError(f"No stats recorded for commit {commit_hash[:8]}...; run without --fast")
+        stats.append(commit_stats)
+    
+    estimate = estimate_diff(stats[0], stats[1], commit_a, commit_b)
+    return {"commitA": commit_a, "commitB": commit_b, **estimate}
+
+
+@profiled("diff.approx")
+def compute_approx_diff(commit_a: str, commit_b: str, fraction: float) -> Dict[str, Any]:
+    """
+    Estimate a diff from a uniform sample of coordinates in every tensor.
+    
+    Both commits are opened as memory-mapped CHECKPOINT + delta files and read only
+    at the sampled coordinates, so the cost scales with the sample size rather than
+    the model size. Estimates carry 95% confidence intervals (see summarize_samples).
+    
+    Args:
+        commit_a: First commit hash
+        commit_b: Second commit hash
+        fraction: Share of each tensor to sample, in (0, 1]
         
-        layer_stats.append({
-            "name": key,
-            "shape": list(p_a.shape),
-            "delta_norm": delta_norm,
-            "percent_changed": percent_changed,
-            "max_abs_difference": max_abs_diff,
-        })
+    Raises:
+        FileNotFoundError: If a commit doesn't exist
+        ValueError: If the fraction is out of range, the architectures differ or params cannot be opened
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError("--approx must be in (0, 1]")
+    
+    views = []
+    metadata = []
+    for commit_hash in (commit_a, commit_b):
+        commit_result = _get_commit_by_hash(commit_hash)
+        if not commit_result:
+            raise FileNotFoundError(f"Commit not found: {commit_hash}")
+        view = _open_param_view(commit_hash, _resolve_framework(*commit_result), warn=_silent)
+        if view is None:
+            raise ValueError(f"Failed to open parameters for commit {commit_hash}")
+        views.append(view)
+        metadata.append(commit_result[0])
+    
+    if metadata[0].get("architectureHash", "unknown") != metadata[1].get("architectureHash", "unknown"):
+        raise ValueError("Cannot diff commits with different model architectures.")
+    
+    estimate = summarize_samples(list(iter_sampled_tensors(views[0], views[1], fraction)), fraction)
+    return {"commitA": commit_a, "commitB": commit_b, **estimate}
+
+
+def format_approx_output(estimate: Dict[str, Any], top_k: Optional[int] = 5) -> None:
+    """Print a sampled diff estimate with its confidence intervals."""
+    console.print(f"Commit A: {estimate['commitA'][:8]}...")
+    console.print(f"Commit B: {estimate['commitB'][:8]}...")
+    console.print()
+    
+    def ci(values: List[float], fmt: str) -> str:
+        return f"[{fmt.format(values[0])}, {fmt.format(values[1])}]"
+    
+    change_text = f"""Sampled: {estimate['samples']:,} of {estimate['total_parameters']:,} parameters
+Parameters changed: {estimate['percent_changed']:.2f}% {ci(estimate['percent_changed_ci'], '{:.2f}')}
+Delta norm: {estimate['delta_norm']:.6f} {ci(estimate['delta_norm_ci'], '{:.6f}')}
+Cosine similarity between models: {estimate['cosine_similarity']:.6f} {ci(estimate['cosine_similarity_ci'], '{:.6f}')}"""
+    title = f"Approximate Change ({100 * estimate['fraction']:g}% sample, {100 * estimate['confidence']:.0f}% CI)"
+    console.print(Panel(change_text, title=title))
+    
+    layers = sorted(estimate["layers"], key=lambda layer: layer["delta_norm"], reverse=True)
+    if top_k is not None:
+        layers = layers[:top_k]
+    if layers:
+        table = Table(title="Largest layer changes (estimated)")
+        table.add_column("Layer", style="cyan")
+        table.add_column("Δ norm", justify="right")
+        table.add_column("95% CI", justify="right")
+        table.add_column("% changed", justify="right")
+        for layer in layers:
+            table.add_row(
+                layer["name"],
+                f"{layer['delta_norm']:.6f}",
+                ci(layer["delta_norm_ci"], "{:.6f}"),
+                f"{layer['percent_changed']:.1f}",
+            )
+        console.print(table)
+
+
+def format_fast_output(estimate: Dict[str, Any], top_k: Optional[int] = 5) -> None:
+    """Print a sketch-based diff estimate."""
+    console.print(f"Commit A: {estimate['commitA'][:8]}...")
+    console.print(f"Commit B: {estimate['commitB'][:8]}...")
+    console.print()
+    
+    if estimate["exact"]:
+        delta_text = f"{estimate['delta_norm']:.6f} (exact, from stored delta)"
+    else:
+        delta_text = f"{estimate['delta_norm']:.6f} ± {estimate['delta_norm_stderr']:.6f} (sketch, dim {estimate['sketch_dim']})"
+    change_text = f"""Parameters: {estimate['total_parameters']:,} in {estimate['tensor_count']} tensors
+Model norm A / B: {estimate['norm_a']:.6f} / {estimate['norm_b']:.6f}
+Delta norm: {delta_text}
+Cosine similarity between models: {estimate['cosine_similarity']:.6f}"""
+    console.print(Panel(change_text, title="Estimated Change (from commit stats)"))
+    
+    layers = estimate["layers"]
+    if estimate["exact"]:
+        layers = sorted(layers, key=lambda layer: layer["delta_norm"], reverse=True)
+    else:
+        layers = sorted(layers, key=lambda layer: abs(layer["norm_change"]), reverse=True)
+    if top_k is not None:
+        layers = layers[:top_k]
+    
+    if layers:
+        table = Table(title="Largest layer changes")
+        table.add_column("Layer", style="cyan")
+        table.add_column("Norm A", justify="right")
+        table.add_column("Norm B", justify="right")
+        table.add_column("Δ norm" if estimate["exact"] else "Norm change", justify="right")
+        for layer in layers:
+            change = layer["delta_norm"] if estimate["exact"] else layer["norm_change"]
+            table.add_row(layer["name"], f"{layer['norm_a']:.6f}", f"{layer['norm_b']:.6f}", f"{change:.6f}")
+        console.print(table)
+
+
+def format_matrix_output(matrix: Dict[str, Any]) -> None:
+    """Print the cosine similarity and L2 distance matrices as tables."""
+    labels = [commit_hash[:8] for commit_hash in matrix["commits"]]
+    if matrix["base"]:
+        console.print(f"[dim]Centred on base commit {matrix['base'][:8]}...[/dim]")
     
-    # Sort by delta norm descending
-    layer_stats.sort(key=lambda x: x["delta_norm"], reverse=True)
-    return layer_stats
+    for title, key, fmt in [
+        ("Cosine similarity", "cosineSimilarity", "{:.4f}"),
+        ("L2 distance", "l2Distance", "{:.6f}"),
+    ]:
+        table = Table(title=title)
+        table.add_column("", style="cyan")
+        for label in labels:
+            table.add_column(label, justify="right")
+        for label, row in zip(labels, matrix[key]):
+            table.add_row(label, *(fmt.format(value) for value in row))
+        console.print(table)
+
+
+def format_matrix_csv(matrix: Dict[str, Any]) -> str:
+    """Both matrices as CSV rows: matrix name, row commit, then one column per commit."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["matrix", "commit", *matrix["commits"]])
+    for name, key in [("cosine_similarity", "cosineSimilarity"), ("l2_distance", "l2Distance")]:
+        for commit_hash, row in zip(matrix["commits"], matrix[key]):
+            writer.writerow([name, commit_hash, *(repr(float(value)) for value in row)])
+    return buffer.getvalue()
 
 
 def extract_metadata_changes(
@@ -307,6 +627,7 @@ def extract_metric_changes(
     return changes
 
 
+@profiled("diff.merge_readiness")
 def compute_merge_readiness(
     architecture_compatible: bool,
     params_a: Dict[str, np.ndarray],
@@ -579,12 +900,63 @@ def format_json_output(
     return json.dumps(output, indent=2)
 
 
+def stream_ndjson_output(
+    commit_a: str,
+    commit_b: str,
+    params_a: Dict[str, np.ndarray],
+    params_b: Dict[str, np.ndarray],
+    metadata_a: Dict[str, Any],
+    metadata_b: Dict[str, Any],
+    jobs: int = 1,
+    b_is_delta: bool = False,
+    swap_sides: bool = False,
+) -> None:
+    """
+    Stream diff output as newline-delimited JSON.
+    
+    One `layer` record is written per tensor as soon as the kernel finishes it (in
+    layer-name order), followed by a `summary` record with the overall statistics,
+    metadata/metric changes and merge readiness. Only running totals are kept, so
+    memory does not grow with the number of layers.
+    """
+    totals = DiffTotals()
+    kernel = iter_tensor_diffs(params_a, params_b, jobs=jobs, b_is_delta=b_is_delta, swap_sides=swap_sides)
+    for tensor_diff in kernel:
+        totals.add(tensor_diff)
+        typer.echo(json.dumps({"type": "layer", **tensor_diff.to_layer_stats()}))
+    
+    overall_stats = totals.overall_stats()
+    merge_readiness = compute_merge_readiness(True, params_a, params_a if b_is_delta else params_b, overall_stats)
+    metadata_changes = extract_metadata_changes(metadata_a, metadata_b)
+    metric_changes = extract_metric_changes(metadata_a, metadata_b)
+    typer.echo(json.dumps({
+        "type": "summary",
+        "commitA": commit_a,
+        "commitB": commit_b,
+        "architectureCompatible": True,
+        "overall": overall_stats,
+        "metadataChanges": {key: {"old": old, "new": new} for key, (old, new) in metadata_changes.items()},
+        "metricChanges": {key: {"old": old, "new": new} for key, (old, new) in metric_changes.items()},
+        "mergeReadiness": merge_readiness,
+    }))
+
+
 @app.command()
 def diff(
     commit_a: str = typer.Argument(..., help="First commit hash to compare"),
     commit_b: str = typer.Argument(..., help="Second commit hash to compare"),
+    more_commits: List[str] = typer.Argument(None, help="Further commits to compare (with --matrix)"),
     detailed: bool = typer.Option(False, "--detailed", help="Show all layers (not just top 5)"),
     json_output: bool = typer.Option(False, "--json", help="Output machine-readable JSON"),
+    top: int = typer.Option(None, "--top", help="Only report the N layers with the largest change (--detailed/--json)"),
+    ndjson: bool = typer.Option(False, "--ndjson", help="Stream one JSON record per layer, then a summary record"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Worker threads for the diff kernel (default: CPU count)"),
+    matrix: bool = typer.Option(False, "--matrix", help="Pairwise cosine similarity and L2 distance across all given commits"),
+    base: str = typer.Option(None, "--base", help="With --matrix: subtract this commit's params from every commit first"),
+    csv_output: bool = typer.Option(False, "--csv", help="With --matrix: output CSV"),
+    fast: bool = typer.Option(False, "--fast", help="Estimate from the stats recorded at commit time, without loading params"),
+    approx: float = typer.Option(None, "--approx", help="Estimate from this fraction of each tensor (e.g. 0.01), with confidence intervals"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Recompute instead of reusing a cached result"),
 ):
     """
     Compare two model commits and produce a semantic summary of changes.
@@ -600,57 +972,114 @@ def diff(
         flair diff 9f2c... b71e...
         flair diff <commitA> <commitB> --detailed
         flair diff <commitA> <commitB> --json
+        flair diff <commitA> <commitB> --detailed --top 50
+        flair diff <commitA> <commitB> --ndjson > diff.ndjson
+        flair diff <commitA> <commitB> --jobs 16
+        flair diff <commitA> <commitB> --fast
+        flair diff <commitA> <commitB> --approx 0.01
+        flair diff <commitA> <commitB> --json --no-cache
+        flair diff --matrix c1 c2 c3 c4 --base <baseCommit> --csv
     """
+    jobs = jobs or default_jobs()
+    if more_commits and not matrix:
+        console.print("[red]Pass --matrix to compare more than two commits.[/red]")
+        raise typer.Exit(1)
+    
     try:
-        # Load both commits
-        params_a, metadata_a = load_commit_params(commit_a)
-        params_b, metadata_b = load_commit_params(commit_b)
-        
-        # Extract architecture hashes
-        arch_hash_a = metadata_a.get("architectureHash", "unknown")
-        arch_hash_b = metadata_b.get("architectureHash", "unknown")
+        if matrix:
+            result = compute_similarity_matrix([commit_a, commit_b, *(more_commits or [])], base=base)
+            if json_output:
+                console.print(json.dumps(result, indent=2))
+            elif csv_output:
+                typer.echo(format_matrix_csv(result), nl=False)
+            else:
+                format_matrix_output(result)
+            return
         
-        # Compute overall statistics
-        overall_stats = compute_overall_stats(
-            params_a, params_b, arch_hash_a, arch_hash_b
-        )
+        if fast:
+            estimate = compute_fast_diff(commit_a, commit_b)
+            if json_output:
+                console.print(json.dumps(estimate, indent=2))
+            else:
+                format_fast_output(estimate, top_k=top if detailed else 5)
+            return
         
-        # If architectures don't match, print error and exit
-        if not overall_stats.get("architecture_compatible", True):
+        if approx is not None:
+            estimate = compute_approx_diff(commit_a, commit_b, approx)
             if json_output:
-                output = {
-                    "commitA": commit_a,
-                    "commitB": commit_b,
-                    "architectureCompatible": False,
-                    "architectureHashA": overall_stats["architecture_hash_a"],
-                    "architectureHashB": overall_stats["architecture_hash_b"],
-                    "error": "Cannot diff commits with different model architectures.",
-                }
-                console.print(json.dumps(output, indent=2))
+                console.print(json.dumps(estimate, indent=2))
             else:
-                console.print(
-                    "[red]Cannot diff commits with different model architectures.[/red]"
+                format_approx_output(estimate, top_k=top if detailed else 5)
+            return
+        
+        top_k = top if (json_output or detailed) else 5
+        cache_dir = None if (ndjson or no_cache) else _diff_cache_dir()
+        cache_options = {"top": top_k}
+        payload = _load_diff(cache_dir, commit_a, commit_b, cache_options) if cache_dir else None
+        
+        if payload is not None:
+            metadata_a = _load_metadata(commit_a)
+            metadata_b = _load_metadata(commit_b)
+        else:
+            # Along a delta chain, load the ancestor and the summed deltas; otherwise both commits
+            chain = load_chain_params(commit_a, commit_b)
+            if chain:
+                params_a, params_b, swap_sides, metadata_a, metadata_b = chain
+                kernel_options = {"b_is_delta": True, "swap_sides": swap_sides}
+                # Shapes of the other endpoint equal the ancestor's (no CHECKPOINT on the path)
+                params_b_shapes = params_a
+            else:
+                params_a, metadata_a = load_commit_params(commit_a)
+                params_b, metadata_b = load_commit_params(commit_b)
+                kernel_options = {}
+                params_b_shapes = params_b
+            
+            # Extract architecture hashes
+            arch_hash_a = metadata_a.get("architectureHash", "unknown")
+            arch_hash_b = metadata_b.get("architectureHash", "unknown")
+            
+            # If architectures don't match, print error and exit
+            if arch_hash_a != arch_hash_b:
+                overall_stats = compute_overall_stats(params_a, params_b, arch_hash_a, arch_hash_b)
+                if json_output or ndjson:
+                    output = {
+                        "commitA": commit_a,
+                        "commitB": commit_b,
+                        "architectureCompatible": False,
+                        "architectureHashA": overall_stats["architecture_hash_a"],
+                        "architectureHashB": overall_stats["architecture_hash_b"],
+                        "error": "Cannot diff commits with different model architectures.",
+                    }
+                    console.print(json.dumps(output, indent=2))
+                else:
+                    console.print(
+                        "[red]Cannot diff commits with different model architectures.[/red]"
+                    )
+                    console.print(f"  Architecture Hash A: {overall_stats['architecture_hash_a']}")
+                    console.print(f"  Architecture Hash B: {overall_stats['architecture_hash_b']}")
+                
+                raise typer.Exit(1)
+            
+            if ndjson:
+                stream_ndjson_output(
+                    commit_a, commit_b, params_a, params_b, metadata_a, metadata_b, jobs=jobs, **kernel_options
                 )
-                console.print(f"  Architecture Hash A: {overall_stats['architecture_hash_a']}")
-                console.print(f"  Architecture Hash B: {overall_stats['architecture_hash_b']}")
+                return
             
-            raise typer.Exit(1)
+            payload = compute_diff_payload(
+                params_a, params_b, params_b_shapes, arch_hash_a, arch_hash_b, top_k=top_k, jobs=jobs, **kernel_options
+            )
+            if cache_dir:
+                _store_diff(cache_dir, commit_a, commit_b, cache_options, payload, _diff_cache_max_entries())
         
-        # Compute per-layer statistics
-        layer_stats = compute_layer_stats(params_a, params_b)
+        overall_stats = payload["overall"]
+        layer_stats = payload["layers"]
+        merge_readiness = payload["mergeReadiness"]
         
         # Extract metadata and metric changes
         metadata_changes = extract_metadata_changes(metadata_a, metadata_b)
         metric_changes = extract_metric_changes(metadata_a, metadata_b)
         
-        # Compute merge readiness
-        merge_readiness = compute_merge_readiness(
-            overall_stats["architecture_compatible"],
-            params_a,
-            params_b,
-            overall_stats,
-        )
-        
         # Output in requested format
         if json_output:
             json_str = format_json_output(
@@ -54,10 +54,48 @@ def _resolve_branch_head(branch_name: str | None) -> tuple[str | None, str | Non
     return branch_name, None
 
 
+def _stat_line(commit_hash: str, commit_data: dict, commit_dir) -> str:
+    """One-line summary of a commit's recorded stats and its change vs the parent."""
+    # Loads numpy and the diff kernel; only `log --stat` pays for them
+    from .utils.commit_stats import _load_commit_stats, estimate_diff, sketch_cosine
+
+    stats = _load_commit_stats(commit_dir)
+    if stats is None:
+        return "no stats recorded"
+
+    parts = [
+        f"{len(stats['tensors'])} tensors",
+        f"{sum(t['size'] for t in stats['tensors']):,} params",
+    ]
+    parent_hash = commit_data.get("previousCommitHash")
+    parent = _get_commit_by_hash(parent_hash) if parent_hash and parent_hash != "_GENESIS_COMMIT_" else None
+    parent_stats = _load_commit_stats(parent[1]) if parent else None
+
+    try:
+        estimate = estimate_diff(parent_stats, stats, parent_hash, commit_hash) if parent_stats else None
+    except ValueError:
+        estimate = None
+        parts.append("layout changed")
+
+    if estimate:
+        parts.append(f"norm {estimate['norm_b']:.4f}")
+        marker = "" if estimate["exact"] else "~"
+        parts.append(f"Δ norm {marker}{estimate['delta_norm']:.4f}")
+        parts.append(f"cos {marker}{estimate['cosine_similarity']:.6f}")
+        alignment = sketch_cosine(parent_stats.get("deltaSketch"), stats.get("deltaSketch"))
+        if alignment is not None:
+            parts.append(f"update alignment ~{alignment:.3f}")
+    else:
+        norm = sum(t["norm"] ** 2 for t in stats["tensors"]) ** 0.5
+        parts.append(f"norm {norm:.4f}")
+    return " | ".join(parts)
+
+
 def log(
     graph: bool = False,
     branch: str | None = None,
     limit: int = 50,
+    stat: bool = False,
 ) -> None:
     """Show local commit history, newest first."""
     if limit <= 0:
@@ -87,11 +125,14 @@ def log(
             console.print(f"[yellow]Stopped: commit {current_hash[:8]}... not found locally.[/yellow]")
             break
 
-        commit_data, _ = commit_result
+        commit_data, commit_dir = commit_result
         message = commit_data.get("message") or "(no message)"
         prefix = "* " if graph else ""
 
         console.print(f"{prefix}{_short_hash(current_hash)} {message}")
+        if stat:
+            indent = "| " if graph else "  "
+            console.print(f"{indent}[dim]{_stat_line(current_hash, commit_data, commit_dir)}[/dim]")
 
         printed += 1
         current_hash = commit_data.get("previousCommitHash")
@@ -8,6 +8,7 @@ from pathlib import Path
 import json
 import hashlib
 
+from ..core.profiling import profiled
 from .utils.local_commits import _get_commit_by_hash, _get_head_info, _get_latest_local_commit
 from .utils.architecture import ArchitectureMismatch, compute_architecture_hash
 from .utils.param_io import _load_numpy_params as _shared_load_numpy_params
@@ -59,6 +60,7 @@ def _detect_framework(model_path: Path) -> str | None:
     return None
 
 
+@profiled("params.extract")
 def _extract_pytorch_weights(model_path: Path, output_path: Path) -> bool:
     """Extract weights from PyTorch model."""
     try:
@@ -102,6 +104,7 @@ def _extract_pytorch_weights(model_path: Path, output_path: Path) -> bool:
         return False
 
 
+@profiled("params.extract")
 def _extract_tensorflow_weights(model_path: Path, output_path: Path) -> bool:
     """Extract weights from TensorFlow/Keras model."""
     try:
@@ -133,6 +136,7 @@ def _extract_tensorflow_weights(model_path: Path, output_path: Path) -> bool:
         return False
 
 
+@profiled("params.extract")
 def _extract_onnx_weights(model_path: Path, output_path: Path) -> bool:
     """Extract weights from ONNX model."""
     try:
@@ -166,6 +170,7 @@ def _extract_onnx_weights(model_path: Path, output_path: Path) -> bool:
         return False
 
 
+@profiled("hash.file")
 def _compute_file_hash(file_path: Path) -> str:
     """Compute SHA256 hash of a file."""
     sha256 = hashlib.sha256()
@@ -211,6 +216,7 @@ def _get_previous_commit_params(previous_commit_hash: str) -> Path | None:
     return None
 
 
+@profiled("delta.compute")
 def _compute_pytorch_delta(
     current_path: Path,
     previous_path: Path,
@@ -252,6 +258,7 @@ def _compute_pytorch_delta(
         return False
 
 
+@profiled("delta.compute")
 def _compute_tensorflow_delta(
     current_path: Path,
     previous_path: Path,
@@ -293,6 +300,7 @@ def _compute_tensorflow_delta(
         return False
 
 
+@profiled("delta.compute")
 def _compute_onnx_delta(
     current_path: Path,
     previous_path: Path,
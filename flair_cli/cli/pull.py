@@ -0,0 +1,297 @@
+"""Pull command: fast-forward the current branch to the remote head.
+
+Only the commits after the local HEAD are fetched. Their delta blobs are applied to
+the cached HEAD params, or, when a newer CHECKPOINT is on the remote path, replay
+starts from that CHECKPOINT's params.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import httpx
+import typer
+from rich.console import Console
+
+from ..api import client as api_client
+from .utils.branch_cache import _hash_file
+from .utils.local_commits import _get_commit_by_hash, _get_flair_dir, _get_head_info
+from .utils.param_io import _load_numpy_params, _load_pytorch_params, _save_numpy_params, _save_pytorch_params
+from .utils.reconstruction import _apply_delta, _reconstruct_params_from_checkpoint
+from .utils.remote_commits import (
+    DEFAULT_FETCH_WORKERS,
+    _blob_path,
+    _branch_tip,
+    _commits_since,
+    _fetch_history,
+    _fetch_missing_blobs,
+    _list_commits_since,
+    _missing_blobs,
+    _params_extension,
+    _record_remote_history,
+    _remote_commit_type,
+)
+from .utils.repo_state import _load_repo_hash, _short_hash
+
+console = Console()
+
+
+def _ensure_ext(ext: str) -> str:
+    ext = ext or ""
+    return ext if ext.startswith(".") else f".{ext}" if ext else ""
+
+
+def _plan_pull(new_commits: list[dict]) -> tuple[dict | None, list[dict]]:
+    """Split the new commits into a starting CHECKPOINT (None: the HEAD params) and the deltas to replay.
+
+    Deltas cannot be replayed across a CHECKPOINT, so replay starts at the newest
+    CHECKPOINT among the new commits, or at the HEAD params when there is none.
+    """
+    for idx in range(len(new_commits) - 1, -1, -1):
+        if _remote_commit_type(new_commits[idx]) != "DELTA":
+            return new_commits[idx], new_commits[idx + 1:]
+    return None, list(new_commits)
+
+
+def _head_created_at(repo_hash: str, branch_hash: str, head_hash: str | None) -> str | None:
+    """Server timestamp of the local HEAD commit, or None when the remote does not have it."""
+    if not head_hash or head_hash == "_GENESIS_COMMIT_":
+        return None
+    commit_result = _get_commit_by_hash(head_hash)
+    created_at = ((commit_result[0].get("remote") or {}).get("createdAt")) if commit_result else None
+    if created_at:
+        return created_at
+    try:
+        return api_client.get_commit_for_pull(repo_hash, branch_hash, head_hash).get("createdAt")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise
+
+
+def _load_params(file_path: Path, framework: str | None):
+    warn = lambda msg: console.print(f"[yellow]{msg}[/yellow]")
+    if (framework or "").lower() == "pytorch":
+        return _load_pytorch_params(file_path, warn=warn)
+    return _load_numpy_params(file_path, warn=warn)
+
+
+def _load_commit_blob(commit_hash: str, framework: str | None):
+    commit_result = _get_commit_by_hash(commit_hash)
+    if not commit_result:
+        return None
+    commit_data, commit_dir = commit_result
+    blob_path = _blob_path(commit_data, commit_dir)
+    if blob_path is None or not blob_path.exists():
+        return None
+    return _load_params(blob_path, framework)
+
+
+def _head_params_file(flair_dir: Path, head_info: dict, head_commit: dict, framework: str | None) -> Path | None:
+    """The .flair/.params file holding full params of the local HEAD, when it is known to match it.
+
+    The working params match HEAD when they were written by a previous pull, or when
+    HEAD is a CHECKPOINT whose pushed param hash equals the file hash.
+    """
+    params_file = flair_dir / ".params" / f"params{_params_extension(framework)}"
+    if not params_file.exists():
+        return None
+
+    head_hash = head_commit.get("commitHash")
+    expected_hash = None
+    if head_info.get("paramsCommitHash") == head_hash:
+        expected_hash = head_info.get("paramsHash")
+    elif head_commit and _remote_commit_type(head_commit) == "CHECKPOINT":
+        expected_hash = head_commit.get("paramHash")
+
+    if not expected_hash or _hash_file(params_file) != expected_hash:
+        return None
+    return params_file
+
+
+def _write_head_params(flair_dir: Path, params, framework: str | None) -> Path | None:
+    """Atomically replace .flair/.params with the pulled params.
+
+    The file is written next to the target and renamed over it, so a params file
+    hardlinked into the branch cache is never modified in place.
+    """
+    warn = lambda msg: console.print(f"[yellow]{msg}[/yellow]")
+    params_dir = flair_dir / ".params"
+    params_dir.mkdir(exist_ok=True)
+    ext = _params_extension(framework)
+    target = params_dir / f"params{ext}"
+    tmp_path = params_dir / f".pull_params{ext}"
+
+    if (framework or "").lower() == "pytorch":
+        saved = _save_pytorch_params(params, tmp_path, warn=warn)
+    else:
+        saved = _save_numpy_params(params, tmp_path, warn=warn)
+    if not saved:
+        return None
+
+    for stale in params_dir.glob("params*"):
+        if stale != target and stale.is_file():
+            stale.unlink()
+    os.replace(tmp_path, target)
+    return target
+
+
+def _download_zkml_artifacts(flair_dir: Path, commit_detail: dict) -> int:
+    """Replace .flair/.zkp with the proof, settings and verification key of a commit."""
+    zkml = (commit_detail.get("params") or {}).get("ZKMLProof") or {}
+    zkp_dir = flair_dir / ".zkp"
+    zkp_dir.mkdir(exist_ok=True)
+
+    downloaded = 0
+    for label in ("proof", "settings", "verification_key"):
+        obj = zkml.get(label)
+        if not obj or not obj.get("uri"):
+            continue
+        for stale in zkp_dir.glob(f"{label}*"):
+            if stale.is_file():
+                stale.unlink()
+        target = zkp_dir / f"{label}{_ensure_ext(obj.get('extension') or 'zlib')}"
+        part_path = target.with_name(f"{target.name}.part")
+        with httpx.stream("GET", obj["uri"], timeout=120) as resp:
+            resp.raise_for_status()
+            with open(part_path, "wb") as f:
+                for chunk in resp.iter_bytes(chunk_size=8192):
+                    f.write(chunk)
+        os.replace(part_path, target)
+        downloaded += 1
+    return downloaded
+
+
+def pull(jobs: int = DEFAULT_FETCH_WORKERS) -> None:
+    """Fetch commits after the local HEAD and apply them to the cached HEAD params."""
+    info = lambda msg: console.print(f"[dim]{msg}[/dim]")
+    warn = lambda msg: console.print(f"[yellow]{msg}[/yellow]")
+
+    try:
+        flair_dir = _get_flair_dir()
+    except typer.BadParameter as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+
+    head_info = _get_head_info() or {}
+    branch_name = head_info.get("currentBranch")
+    branch_hash = head_info.get("branchHash")
+    head_hash = head_info.get("latestCommitHash") or head_info.get("previousCommit")
+    repo_hash = _load_repo_hash()
+
+    if not repo_hash or not branch_hash:
+        console.print("[red]No remote branch tracked. Clone the repository or checkout a branch first.[/red]")
+        raise typer.Exit(code=1)
+
+    try:
+        # Only HEAD and the commits after it; the whole branch when HEAD is not on the remote
+        head_created_at = _head_created_at(repo_hash, branch_hash, head_hash)
+        if head_created_at:
+            commits = _list_commits_since(repo_hash, branch_hash, head_created_at)
+        else:
+            commits = api_client.list_branch_commits(repo_hash, branch_hash)
+        tip = _branch_tip(commits)
+        if tip is None or tip["commitHash"] == head_hash:
+            console.print(f"[green]Already up to date with '{branch_name}'.[/green]")
+            return
+
+        new_commits = _commits_since(commits, tip["commitHash"], head_hash)
+        if new_commits is None:
+            console.print(f"[red]HEAD {_short_hash(head_hash)} is not on the remote history of '{branch_name}'.[/red]")
+            console.print("[red]Push or reset your local commits before pulling.[/red]")
+            raise typer.Exit(code=1)
+
+        console.print(f"[cyan]Pulling {len(new_commits)} commit(s) into '{branch_name}'[/cyan]")
+        console.print(f"  [dim]{_short_hash(head_hash)} → {_short_hash(tip['commitHash'])}[/dim]")
+
+        _record_remote_history(flair_dir, new_commits, repo_hash, branch_hash)
+        framework = tip.get("architecture")
+        by_hash = {c["commitHash"]: c for c in commits}
+        checkpoint, deltas = _plan_pull(new_commits)
+
+        # Load the params replay starts from
+        if checkpoint is not None:
+            info(f"Starting from CHECKPOINT {_short_hash(checkpoint['commitHash'])}")
+            start_commits = [checkpoint]
+        else:
+            start_commits = []
+
+        to_fetch = []
+        for commit in start_commits + deltas:
+            commit_result = _get_commit_by_hash(commit["commitHash"])
+            if commit_result:
+                to_fetch.append(commit_result)
+
+        missing = _missing_blobs(to_fetch)
+        if not _fetch_missing_blobs(to_fetch, max_workers=jobs, info=info, warn=warn):
+            console.print("[red]✗ Failed to fetch all required blobs[/red]")
+            raise typer.Exit(code=1)
+        fetched_bytes = sum(blob_path.stat().st_size for _, blob_path in missing)
+
+        if checkpoint is not None:
+            current_params = _load_commit_blob(checkpoint["commitHash"], framework)
+        else:
+            head_params_file = _head_params_file(flair_dir, head_info, by_hash.get(head_hash) or {}, framework)
+            current_params = _load_params(head_params_file, framework) if head_params_file else None
+            if current_params is None:
+                # Working params do not match HEAD: rebuild them from HEAD's nearest CHECKPOINT
+                info("Cached HEAD params not found; reconstructing HEAD from history...")
+                history = _fetch_history(repo_hash, branch_hash, head_hash, by_hash)
+                _record_remote_history(
+                    flair_dir,
+                    [c for c in history if not (flair_dir / ".local_commits" / c["commitHash"]).exists()],
+                    repo_hash,
+                    branch_hash,
+                )
+                current_params = _reconstruct_params_from_checkpoint(head_hash, framework, info=info, warn=warn)
+
+        if current_params is None:
+            console.print("[red]✗ Could not load the params to apply new commits to[/red]")
+            raise typer.Exit(code=1)
+
+        for commit in deltas:
+            delta_params = _load_commit_blob(commit["commitHash"], framework)
+            if delta_params is None:
+                console.print(f"[red]✗ Missing delta for {_short_hash(commit['commitHash'])}[/red]")
+                raise typer.Exit(code=1)
+            _apply_delta(current_params, delta_params)
+            info(f"Applied delta from {_short_hash(commit['commitHash'])}")
+
+        params_file = _write_head_params(flair_dir, current_params, framework)
+        if params_file is None:
+            raise typer.Exit(code=1)
+
+        tip_detail = api_client.get_commit_for_pull(repo_hash, branch_hash, tip["commitHash"])
+        _download_zkml_artifacts(flair_dir, tip_detail)
+
+        head_info.update({
+            "currentBranch": branch_name,
+            "branchHash": branch_hash,
+            "latestCommitHash": tip["commitHash"],
+            "previousCommit": tip["commitHash"],
+            "paramsCommitHash": tip["commitHash"],
+            "paramsHash": _hash_file(params_file),
+        })
+        with open(flair_dir / "HEAD", "w") as f:
+            json.dump(head_info, f, indent=2)
+
+        remote_head_data = {
+            "currentBranch": branch_name,
+            "branchHash": branch_hash,
+            "latestCommitHash": tip["commitHash"],
+            "previousCommit": tip["commitHash"],
+        }
+        with open(flair_dir / "REMOTE_HEAD", "w") as f:
+            json.dump(remote_head_data, f, indent=2)
+
+        console.print(f"[green]✓ Fast-forwarded to {_short_hash(tip['commitHash'])}[/green]")
+        console.print(f"  [dim]Commits: {len(new_commits)}, blobs applied: {len(start_commits) + len(deltas)}[/dim]")
+        console.print(f"  [dim]Downloaded: {fetched_bytes / (1024 * 1024):.2f} MB[/dim]")
+
+    except httpx.HTTPStatusError as e:
+        error_detail = e.response.json() if e.response.content else {}
+        console.print(f"[red]HTTP Error: {e.response.status_code}[/red]")
+        console.print(f"[red]{error_detail.get('error', {}).get('message', str(e))}[/red]")
+        raise typer.Exit(code=1)
@@ -14,6 +14,7 @@ import shutil
 from ..api import client as api_client
 from ..api.utils import _base_url, _client_with_auth
 from ..core import session
+from ..core.profiling import profiled, span
 from .utils.local_commits import _get_all_local_commits, _get_flair_dir, _get_head_info, _get_latest_local_commit
 
 app = typer.Typer()
@@ -145,6 +146,16 @@ def _load_repo_settings() -> dict:
 
     return settings
 
+def _delta_params_file(commit_dir: Path, file_name: str) -> Path:
+    """Path of a DELTA commit's delta params file."""
+    # flair commit writes deltas under .delta_params/ and records only the file name
+    params_file = commit_dir / ".delta_params" / file_name
+    if not params_file.exists():
+        params_file = commit_dir / file_name
+    return params_file
+
+
+@profiled("hash.file")
 def _compute_param_hash(file_path: Path) -> str:
     """Compute SHA256 hash of params file."""
     sha256 = hashlib.sha256()
@@ -305,7 +316,7 @@ def push(
                     console.print(f"[red]✗ Commit {idx}: Delta parameters missing[/red]")
                     console.print(f"[yellow]Stopping push after {pushed_count} successful commit(s).[/yellow]")
                     raise typer.Exit(code=1)
-                params_file = commit_dir / delta_params_info["file"]
+                params_file = _delta_params_file(commit_dir, delta_params_info["file"])
             else:
                 if not params_info or not params_info.get("file"):
                     console.print(f"[red]✗ Commit {idx}: Parameters missing[/red]")
@@ -346,7 +357,7 @@ def push(
             
             # Step 1: Initiate commit session
             console.print("[cyan]Step 1/5: Initiating commit session...[/cyan]")
-            with _client_with_auth() as client:
+            with span("push.initiate"), _client_with_auth() as client:
                 response = client.post(
                     f"{_base_url()}/api/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit/create/initiate",
                     json={"parentCommitHash": parent_commit_hash}
@@ -366,7 +377,7 @@ def push(
             
             # Step 2: Check ZKML proof uniqueness
             console.print("[cyan]Step 2/5: Checking ZKML proof uniqueness...[/cyan]")
-            with _client_with_auth() as client:
+            with span("push.zkml_check"), _client_with_auth() as client:
                 response = client.post(
                     f"{_base_url()}/api/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit/create/zkml-check",
                     json={
@@ -390,7 +401,7 @@ def push(
             
             # Step 3: Upload ZKML proofs
             console.print("[cyan]Step 3/5: Uploading ZKML proofs...[/cyan]")
-            with _client_with_auth() as client:
+            with span("push.zkml_upload"), _client_with_auth() as client:
                 files = {
                     "proof": ("proof.zlib", open(zkp_files["proof_file"], "rb"), "application/octet-stream"),
                     "settings": ("settings.zlib", open(zkp_files["settings_file"], "rb"), "application/octet-stream"),
@@ -422,7 +433,7 @@ def push(
             console.print("[cyan]Step 4/5: Uploading parameters...[/cyan]")
             param_hash = _compute_param_hash(params_file)
             
-            with _client_with_auth() as client:
+            with span("push.params_upload", bytes=params_file.stat().st_size), _client_with_auth() as client:
                 files = {
                     "params": (params_file.name, open(params_file, "rb"), "application/octet-stream")
                 }
@@ -452,7 +463,7 @@ def push(
             # Step 5: Finalize commit
             console.print("[cyan]Step 5/5: Finalizing commit...[/cyan]")
             
-            with _client_with_auth() as client:
+            with span("push.finalize"), _client_with_auth() as client:
                 response = client.post(
                     f"{_base_url()}/api/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit/create/finalize",
                     json={
@@ -461,6 +472,7 @@ def push(
                         "zkmlReceiptToken": zkml_receipt_token,
                         "paramsReceiptToken": params_receipt_token,
                         "message": message,
+                        "commitType": commit_type,
                         "architecture": framework,
                         "metrics": commit_metrics,
                     }
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from .reconstruction import ParamView
+
+# Two-sided 95% normal quantile for the reported intervals
+APPROX_Z = 1.96
+APPROX_CONFIDENCE = 0.95
+# Fewer samples than this per tensor make the normal approximation unreliable
+MIN_SAMPLES = 1024
+APPROX_SEED = 0xD1FF
+
+# Per-sample estimator columns: a·b, a², b², (b-a)², 1[b≠a]
+_DOT, _NORM_A, _NORM_B, _DELTA_SQ, _CHANGED = range(5)
+
+
+@dataclass
+class SampledTensor:
+    """Sample moments of one tensor pair; totals are size × mean, with variance size² × cov / samples."""
+
+    name: str
+    shape: tuple[int, ...]
+    size: int
+    samples: int
+    mean: np.ndarray
+    cov: np.ndarray
+    max_abs_sampled: float
+
+    @property
+    def exact(self) -> bool:
+        return self.samples >= self.size
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self.size * self.mean
+
+    @property
+    def totals_cov(self) -> np.ndarray:
+        if self.exact or self.samples < 2:
+            return np.zeros((5, 5))
+        cov = self.cov.copy()
+        # Agresti-Coull: a sample where all (or no) coordinates changed still leaves uncertainty
+        changed = (self.mean[_CHANGED] * self.samples + 2.0) / (self.samples + 4.0)
+        cov[_CHANGED, _CHANGED] = max(cov[_CHANGED, _CHANGED], changed * (1.0 - changed))
+        return self.size * self.size * cov / self.samples
+
+
+def sample_count(size: int, fraction: float) -> int:
+    """Samples drawn from a tensor of `size` elements; >= size means read it whole."""
+    return min(size, max(MIN_SAMPLES, math.ceil(fraction * size)))
+
+
+def _sample_index(name: str, size: int, samples: int) -> np.ndarray | slice:
+    """Uniform indices (with replacement), sorted for locality; the same for every commit."""
+    if samples >= size:
+        return slice(None)
+    rng = np.random.default_rng([APPROX_SEED, zlib.crc32(name.encode("utf-8"))])
+    index = rng.integers(0, size, size=samples)
+    index.sort()
+    return index
+
+
+def iter_sampled_tensors(view_a: ParamView, view_b: ParamView, fraction: float) -> Iterator[SampledTensor]:
+    """Yield one SampledTensor per shared, same-shape tensor, in sorted key order.
+
+    Both views are read at the same coordinates, so only about `fraction` of each
+    tensor (at least MIN_SAMPLES elements) is touched on disk.
+    """
+    for key in sorted(view_a.keys()):
+        if key not in view_b.keys() or view_a.shape(key) != view_b.shape(key):
+            continue
+        size = view_a.size(key)
+        if size == 0:
+            continue
+        samples = sample_count(size, fraction)
+        index = _sample_index(key, size, samples)
+        a = view_a.gather(key, index)
+        b = view_b.gather(key, index)
+        delta = b - a
+        columns = np.stack([a * b, a * a, b * b, delta * delta, (delta != 0).astype(np.float64)])
+        yield SampledTensor(
+            name=key,
+            shape=view_a.shape(key),
+            size=size,
+            samples=int(a.size),
+            mean=columns.mean(axis=1),
+            cov=np.cov(columns) if a.size > 1 else np.zeros((5, 5)),
+            max_abs_sampled=float(np.abs(delta).max()),
+        )
+
+
+def _interval(estimate: float, stderr: float, low: float | None = None, high: float | None = None) -> list[float]:
+    lo, hi = estimate - APPROX_Z * stderr, estimate + APPROX_Z * stderr
+    if low is not None:
+        lo = max(low, lo)
+    if high is not None:
+        hi = min(high, hi)
+    return [lo, hi]
+
+
+def _norm_interval(total_sq: float, variance: float) -> tuple[float, list[float]]:
+    """A norm and its interval from an estimate of its square (the interval of the square, rooted)."""
+    lo, hi = _interval(total_sq, math.sqrt(max(variance, 0.0)), low=0.0)
+    return math.sqrt(max(total_sq, 0.0)), [math.sqrt(lo), math.sqrt(max(hi, 0.0))]
+
+
+def _percent_interval(changed: float, variance: float, size: int) -> tuple[float, list[float]]:
+    percent = 100.0 * changed / size
+    return percent, _interval(percent, 100.0 * math.sqrt(max(variance, 0.0)) / size, low=0.0, high=100.0)
+
+
+def summarize_samples(tensors: list[SampledTensor], fraction: float) -> dict[str, Any]:
+    """Overall and per-layer estimates with APPROX_CONFIDENCE intervals.
+
+    Tensors are sampled independently, so totals and their covariances add across
+    tensors. Cosine similarity is a ratio of totals; its interval uses the delta
+    method on a·b, |a|² and |b|², which stays tight for nearly identical models
+    because their errors are strongly correlated.
+    """
+    totals = np.zeros(5)
+    cov = np.zeros((5, 5))
+    layers = []
+    for tensor in tensors:
+        tensor_totals, tensor_cov = tensor.totals, tensor.totals_cov
+        totals += tensor_totals
+        cov += tensor_cov
+        delta_norm, delta_norm_ci = _norm_interval(tensor_totals[_DELTA_SQ], tensor_cov[_DELTA_SQ, _DELTA_SQ])
+        percent, percent_ci = _percent_interval(tensor_totals[_CHANGED], tensor_cov[_CHANGED, _CHANGED], tensor.size)
+        layers.append(
+            {
+                "name": tensor.name,
+                "shape": list(tensor.shape),
+                "samples": tensor.samples,
+                "delta_norm": delta_norm,
+                "delta_norm_ci": delta_norm_ci,
+                "percent_changed": percent,
+                "percent_changed_ci": percent_ci,
+                "max_abs_difference_sampled": tensor.max_abs_sampled,
+            }
+        )
+
+    total_parameters = sum(tensor.size for tensor in tensors)
+    samples = sum(tensor.samples for tensor in tensors)
+    delta_norm, delta_norm_ci = _norm_interval(totals[_DELTA_SQ], cov[_DELTA_SQ, _DELTA_SQ])
+    percent, percent_ci = (
+        _percent_interval(totals[_CHANGED], cov[_CHANGED, _CHANGED], total_parameters) if total_parameters else (0.0, [0.0, 0.0])
+    )
+
+    norm_product = math.sqrt(max(totals[_NORM_A], 0.0) * max(totals[_NORM_B], 0.0))
+    if norm_product > 0:
+        cosine = float(totals[_DOT] / norm_product)
+        gradient = np.zeros(5)
+        gradient[_DOT] = 1.0 / norm_product
+        gradient[_NORM_A] = -cosine / (2.0 * totals[_NORM_A])
+        gradient[_NORM_B] = -cosine / (2.0 * totals[_NORM_B])
+        cosine_ci = _interval(cosine, math.sqrt(max(float(gradient @ cov @ gradient), 0.0)), low=-1.0, high=1.0)
+    else:
+        # Zero vectors are taken as identical, as in the exact diff (DiffTotals.cosine_similarity)
+        cosine, cosine_ci = 1.0, [1.0, 1.0]
+
+    return {
+        "fraction": fraction,
+        "confidence": APPROX_CONFIDENCE,
+        "samples": samples,
+        "total_parameters": total_parameters,
+        "estimated_changed_parameters": int(round(totals[_CHANGED])),
+        "percent_changed": percent,
+        "percent_changed_ci": percent_ci,
+        "delta_norm": delta_norm,
+        "delta_norm_ci": delta_norm_ci,
+        "cosine_similarity": cosine,
+        "cosine_similarity_ci": cosine_ci,
+        "layers": layers,
+    }
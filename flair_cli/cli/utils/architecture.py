@@ -5,6 +5,8 @@ import json
 from collections.abc import Mapping
 from typing import Any
 
+from ...core.profiling import profiled
+
 
 class ArchitectureMismatch(Exception):
     """Raised when two parameter architectures do not match."""
@@ -79,6 +81,7 @@ def compute_architecture_signature(
     return payload
 
 
+@profiled("hash.architecture")
 def compute_architecture_hash(
     params: Mapping[str, Any],
     framework: str | None = None,
@@ -0,0 +1,233 @@
+"""Content-addressed branch artifact cache.
+
+Branch artifacts (params and zkml files) are stored once under
+``.flair/.cache/objects/<sha256>`` and referenced from ``.flair/.cache/index.json``.
+Saving and restoring a branch hardlinks files between the working directories and
+the object store, so switching branches does not copy model weights around.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from ...core.profiling import profiled
+
+INDEX_FILE = "index.json"
+OBJECTS_DIR = "objects"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@profiled("hash.file")
+def _hash_file(file_path: Path) -> str:
+    """Compute SHA256 digest of a file."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _objects_dir(cache_dir: Path) -> Path:
+    objects_dir = cache_dir / OBJECTS_DIR
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    return objects_dir
+
+
+def _load_index(cache_dir: Path) -> dict:
+    """Load the cache index, returning an empty index when missing or unreadable."""
+    index_file = cache_dir / INDEX_FILE
+    if index_file.exists():
+        try:
+            with open(index_file, "r") as f:
+                index = json.load(f)
+            if isinstance(index, dict):
+                index.setdefault("objects", {})
+                index.setdefault("branches", {})
+                return index
+        except Exception:
+            pass
+    return {"objects": {}, "branches": {}}
+
+
+def _save_index(cache_dir: Path, index: dict) -> None:
+    """Atomically write the cache index."""
+    index_file = cache_dir / INDEX_FILE
+    tmp_file = index_file.with_suffix(".json.tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_file, index_file)
+
+
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Hardlink src to dest, falling back to a copy across filesystems."""
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def _stat_record(file_path: Path) -> dict:
+    st = file_path.stat()
+    return {"size": st.st_size, "mtimeNs": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def _object_is_intact(object_path: Path, digest: str, record: dict, verify: bool = False) -> bool:
+    """Check an object against its recorded digest.
+
+    The stat record is trusted unless it changed (or ``verify`` is set), in which
+    case the file is rehashed.
+    """
+    if not object_path.exists():
+        return False
+
+    st = object_path.stat()
+    if st.st_size != record.get("size"):
+        return False
+    if not verify and st.st_mtime_ns == record.get("mtimeNs"):
+        return True
+    return _hash_file(object_path) == digest
+
+
+def _store_artifact(cache_dir: Path, index: dict, file_path: Path) -> dict:
+    """Add a working file to the object store and return its branch entry."""
+    objects = index["objects"]
+    st = file_path.stat()
+
+    # A file restored from the cache is a hardlink to its object, so its digest
+    # can be recovered from the index without reading the file.
+    digest = None
+    for known_digest, record in objects.items():
+        if (
+            record.get("inode") == st.st_ino
+            and record.get("size") == st.st_size
+            and record.get("mtimeNs") == st.st_mtime_ns
+        ):
+            digest = known_digest
+            break
+
+    if digest is None:
+        digest = _hash_file(file_path)
+
+    object_path = _objects_dir(cache_dir) / digest
+    record = objects.get(digest)
+    if record is None or not _object_is_intact(object_path, digest, record):
+        if object_path.exists():
+            object_path.unlink()
+        tmp_path = object_path.with_name(f"{digest}.tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        _link_or_copy(file_path, tmp_path)
+        os.replace(tmp_path, object_path)
+        objects[digest] = _stat_record(object_path)
+
+    return {"name": file_path.name, "digest": digest, "size": st.st_size}
+
+
+def _save_branch(cache_dir: Path, branch_name: str, files: Iterable[Path]) -> int:
+    """Record the given working files as the cached artifacts of a branch.
+
+    Returns: Number of artifacts recorded
+    """
+    index = _load_index(cache_dir)
+    entries = [_store_artifact(cache_dir, index, file_path) for file_path in files if file_path.is_file()]
+    index["branches"][branch_name] = {"files": entries, "lastUsed": time.time()}
+    _save_index(cache_dir, index)
+    return len(entries)
+
+
+def _restore_branch(
+    cache_dir: Path,
+    branch_name: str,
+    resolve_target: Callable[[str], Path],
+    verify: bool = False,
+    warn: Callable[[str], None] | None = None,
+) -> bool:
+    """Relink a branch's cached artifacts into the working directories.
+
+    ``resolve_target`` maps an artifact file name to its destination path.
+    Returns False (and drops the branch entry) when the branch is not cached or
+    any of its objects fails the integrity check.
+    """
+    index = _load_index(cache_dir)
+    branch_entry = index["branches"].get(branch_name)
+    if not branch_entry or not branch_entry.get("files"):
+        return False
+
+    objects_dir = _objects_dir(cache_dir)
+    for entry in branch_entry["files"]:
+        digest = entry["digest"]
+        record = index["objects"].get(digest)
+        object_path = objects_dir / digest
+        if record is None or not _object_is_intact(object_path, digest, record, verify=verify):
+            if warn:
+                warn(f"Cached artifact {entry['name']} for '{branch_name}' failed integrity check")
+            index["branches"].pop(branch_name, None)
+            if object_path.exists():
+                object_path.unlink()
+            index["objects"].pop(digest, None)
+            _save_index(cache_dir, index)
+            return False
+
+    for entry in branch_entry["files"]:
+        dest = resolve_target(entry["name"])
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+        _link_or_copy(objects_dir / entry["digest"], dest)
+
+    branch_entry["lastUsed"] = time.time()
+    _save_index(cache_dir, index)
+    return True
+
+
+def _evict(cache_dir: Path, max_bytes: int, keep: Iterable[str] = ()) -> list[str]:
+    """Evict least recently used branches until cached objects fit in max_bytes.
+
+    Branches in ``keep`` are never evicted. Objects no longer referenced by any
+    branch are deleted. Returns: Names of evicted branches
+    """
+    index = _load_index(cache_dir)
+    branches = index["branches"]
+    objects = index["objects"]
+    keep = set(keep)
+
+    def _referenced() -> set[str]:
+        return {entry["digest"] for branch in branches.values() for entry in branch.get("files", [])}
+
+    def _total_bytes(digests: set[str]) -> int:
+        return sum(objects.get(digest, {}).get("size", 0) for digest in digests)
+
+    evicted: list[str] = []
+    candidates = sorted(
+        (name for name in branches if name not in keep),
+        key=lambda name: branches[name].get("lastUsed", 0),
+    )
+    while candidates and _total_bytes(_referenced()) > max_bytes:
+        name = candidates.pop(0)
+        branches.pop(name, None)
+        evicted.append(name)
+
+    referenced = _referenced()
+    objects_dir = _objects_dir(cache_dir)
+    for digest in list(objects.keys()):
+        if digest in referenced:
+            continue
+        object_path = objects_dir / digest
+        if object_path.exists():
+            object_path.unlink()
+        objects.pop(digest, None)
+
+    _save_index(cache_dir, index)
+    return evicted
+
+
+def _remove_legacy_branch_dirs(cache_dir: Path) -> None:
+    """Remove per-branch copy directories left by the previous cache layout."""
+    for child in cache_dir.iterdir():
+        if child.is_dir() and child.name != OBJECTS_DIR:
+            shutil.rmtree(child, ignore_errors=True)
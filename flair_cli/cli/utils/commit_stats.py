@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+import math
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from ...core.profiling import profiled
+from .diff_kernel import DEFAULT_CHUNK_ELEMENTS, _as_array
+
+STATS_FILE = "stats.json"
+STATS_VERSION = 1
+# Count-sketch width and seed; every commit must use the same values for sketches to compare
+SKETCH_DIM = 512
+SKETCH_SEED = 0x5EED_F1A1
+# Fixed draw size, so the bucket/sign stream of a tensor does not depend on how it is chunked
+_SKETCH_CHUNK = 1 << 16
+
+
+def _tensor_rng(name: str) -> np.random.Generator:
+    return np.random.default_rng([SKETCH_SEED, zlib.crc32(name.encode("utf-8"))])
+
+
+class _Accumulator:
+    """Float64 moments, extremes and nonzero count of one tensor, filled chunk by chunk."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.nonzero = 0
+
+    def add(self, chunk: np.ndarray) -> None:
+        self.total += float(chunk.sum())
+        self.total_sq += float(np.dot(chunk, chunk))
+        self.minimum = min(self.minimum, float(chunk.min()))
+        self.maximum = max(self.maximum, float(chunk.max()))
+        self.nonzero += int(np.count_nonzero(chunk))
+
+
+def _tensor_entry(name: str, shape: tuple[int, ...], size: int, acc: _Accumulator) -> dict[str, Any]:
+    mean = acc.total / size if size else 0.0
+    variance = max(acc.total_sq / size - mean * mean, 0.0) if size else 0.0
+    return {
+        "name": name,
+        "shape": list(shape),
+        "size": size,
+        "norm": math.sqrt(acc.total_sq),
+        "mean": mean,
+        "std": math.sqrt(variance),
+        "min": acc.minimum if size else 0.0,
+        "max": acc.maximum if size else 0.0,
+        "nonzero": acc.nonzero,
+    }
+
+
+@profiled("stats.compute")
+def compute_commit_stats(
+    params: Mapping[str, Any],
+    delta: Mapping[str, Any] | None = None,
+    delta_base: str | None = None,
+) -> dict[str, Any]:
+    """Per-tensor statistics and count sketches of a commit's params and delta.
+
+    Every element is hashed to one of SKETCH_DIM buckets with a random sign, drawn
+    from a generator seeded by the tensor name, so the sketch is a fixed linear map:
+    sketch(a) - sketch(b) == sketch(a - b) across commits with the same layout, and
+    ||sketch(x)||² is an unbiased estimate of ||x||². One float64 pass per tensor.
+    """
+    tensors: list[dict[str, Any]] = []
+    params_sketch = np.zeros(SKETCH_DIM, dtype=np.float64)
+    delta_sketch = np.zeros(SKETCH_DIM, dtype=np.float64) if delta is not None else None
+
+    for name in sorted(params.keys()):
+        flat = _as_array(params[name])
+        flat_delta = _as_array(delta[name]) if delta is not None and name in delta else None
+        if flat_delta is not None and flat_delta.size != flat.size:
+            flat_delta = None
+        rng = _tensor_rng(name)
+        acc, delta_acc = _Accumulator(), _Accumulator()
+        max_abs = 0.0
+
+        for start in range(0, flat.size, _SKETCH_CHUNK):
+            stop = min(start + _SKETCH_CHUNK, flat.size)
+            draws = rng.integers(0, 2 * SKETCH_DIM, size=stop - start)
+            buckets = draws >> 1
+            signs = 1.0 - 2.0 * (draws & 1)
+
+            chunk = flat[start:stop].astype(np.float64)
+            acc.add(chunk)
+            params_sketch += np.bincount(buckets, weights=chunk * signs, minlength=SKETCH_DIM)
+
+            if flat_delta is not None:
+                chunk = flat_delta[start:stop].astype(np.float64)
+                delta_acc.add(chunk)
+                max_abs = max(max_abs, float(np.abs(chunk).max()))
+                delta_sketch += np.bincount(buckets, weights=chunk * signs, minlength=SKETCH_DIM)
+
+        entry = _tensor_entry(name, tuple(np.shape(params[name])), int(flat.size), acc)
+        if flat_delta is not None:
+            entry["delta"] = {"norm": math.sqrt(delta_acc.total_sq), "nonzero": delta_acc.nonzero, "maxAbs": max_abs}
+        tensors.append(entry)
+
+    return {
+        "version": STATS_VERSION,
+        "sketch": {"method": "count-sketch", "dim": SKETCH_DIM, "seed": SKETCH_SEED},
+        "tensors": tensors,
+        "paramsSketch": params_sketch.tolist(),
+        "deltaSketch": delta_sketch.tolist() if delta_sketch is not None else None,
+        "deltaBase": delta_base if delta is not None else None,
+    }
+
+
+def _write_commit_stats(commit_dir: Path, stats: dict[str, Any]) -> Path:
+    stats_file = Path(commit_dir) / STATS_FILE
+    with open(stats_file, "w") as f:
+        json.dump(stats, f)
+    return stats_file
+
+
+def _load_commit_stats(commit_dir: Path, warn: Callable[[str], None] | None = None) -> dict[str, Any] | None:
+    """Stats sidecar of a commit, or None when absent or written with another sketch."""
+    stats_file = Path(commit_dir) / STATS_FILE
+    if not stats_file.exists():
+        return None
+    try:
+        with open(stats_file, "r") as f:
+            stats = json.load(f)
+    except Exception as e:
+        if warn:
+            warn(f"Failed to read {stats_file}: {e}")
+        return None
+    sketch = stats.get("sketch") or {}
+    if sketch.get("dim") != SKETCH_DIM or sketch.get("seed") != SKETCH_SEED:
+        if warn:
+            warn(f"Ignoring {stats_file}: written with a different sketch")
+        return None
+    return stats
+
+
+def _layout(stats: Mapping[str, Any]) -> list[tuple[str, tuple[int, ...]]]:
+    return [(t["name"], tuple(t["shape"])) for t in stats["tensors"]]
+
+
+def _total_norm(stats: Mapping[str, Any]) -> float:
+    return math.sqrt(sum(t["norm"] ** 2 for t in stats["tensors"]))
+
+
+def _cosine_from_norms(norm_a: float, norm_b: float, distance: float) -> float:
+    if norm_a == 0.0 or norm_b == 0.0:
+        return 1.0 if norm_a == norm_b else 0.0
+    cosine = (norm_a * norm_a + norm_b * norm_b - distance * distance) / (2.0 * norm_a * norm_b)
+    return min(1.0, max(-1.0, cosine))
+
+
+def sketch_cosine(sketch_a: list[float] | None, sketch_b: list[float] | None) -> float | None:
+    """Cosine of two sketches; estimates the cosine of the sketched vectors."""
+    if sketch_a is None or sketch_b is None:
+        return None
+    a, b = np.asarray(sketch_a), np.asarray(sketch_b)
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b / denom) if denom > 0 else None
+
+
+def estimate_diff(
+    stats_a: Mapping[str, Any],
+    stats_b: Mapping[str, Any],
+    commit_a: str | None = None,
+    commit_b: str | None = None,
+) -> dict[str, Any]:
+    """Diff statistics of two commits from their stats sidecars alone.
+
+    Norms are exact. When one commit's stored delta is taken against the other, the
+    delta norms are exact too; otherwise the model-level delta norm comes from the
+    sketch difference (relative standard error about 1/sqrt(2 * SKETCH_DIM)) and the
+    per-layer delta norms are unknown. Cosine similarity follows from the norms and
+    the delta norm.
+
+    Raises:
+        ValueError: If the commits have different tensor layouts
+    """
+    if _layout(stats_a) != _layout(stats_b):
+        raise ValueError("Cannot estimate a diff between commits with different tensor layouts.")
+
+    if commit_a is not None and stats_b.get("deltaBase") == commit_a:
+        exact_from = stats_b
+    elif commit_b is not None and stats_a.get("deltaBase") == commit_b:
+        exact_from = stats_a
+    else:
+        exact_from = None
+
+    layers = []
+    for tensor_a, tensor_b, tensor_delta in zip(stats_a["tensors"], stats_b["tensors"], (exact_from or stats_b)["tensors"]):
+        delta = tensor_delta.get("delta") if exact_from else None
+        layers.append(
+            {
+                "name": tensor_a["name"],
+                "shape": tensor_a["shape"],
+                "norm_a": tensor_a["norm"],
+                "norm_b": tensor_b["norm"],
+                "norm_change": tensor_b["norm"] - tensor_a["norm"],
+                "mean_change": tensor_b["mean"] - tensor_a["mean"],
+                "delta_norm": delta["norm"] if delta else None,
+            }
+        )
+
+    norm_a, norm_b = _total_norm(stats_a), _total_norm(stats_b)
+    exact = exact_from is not None and all(layer["delta_norm"] is not None for layer in layers)
+    if exact:
+        delta_norm = math.sqrt(sum(layer["delta_norm"] ** 2 for layer in layers))
+        delta_norm_stderr = 0.0
+    else:
+        difference = np.asarray(stats_b["paramsSketch"]) - np.asarray(stats_a["paramsSketch"])
+        delta_norm = float(np.linalg.norm(difference))
+        delta_norm_stderr = delta_norm / math.sqrt(2 * SKETCH_DIM)
+
+    return {
+        "exact": exact,
+        "sketch_dim": SKETCH_DIM,
+        "total_parameters": sum(t["size"] for t in stats_a["tensors"]),
+        "tensor_count": len(layers),
+        "norm_a": norm_a,
+        "norm_b": norm_b,
+        "delta_norm": delta_norm,
+        "delta_norm_stderr": delta_norm_stderr,
+        "cosine_similarity": _cosine_from_norms(norm_a, norm_b, delta_norm),
+        "layers": layers,
+    }
@@ -0,0 +1,121 @@
+"""Cache of computed diff payloads.
+
+Finalized commits are immutable, so the statistics of a diff between two commits
+only change if a commit's recorded params change. Payloads are stored as
+``.flair/cache/diff/<hashA>_<hashB>_<opts>.json`` together with a fingerprint of the
+params hashes each commit's reconstruction depends on; an entry whose fingerprint no
+longer matches is dropped on read. File mtimes track use, and the least recently
+used entries are evicted beyond a fixed entry budget.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .local_commits import _get_commit_by_hash
+
+DIFF_CACHE_DIR = Path("cache") / "diff"
+CACHE_VERSION = 1
+
+
+def _options_key(options: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def _entry_path(cache_dir: Path, commit_a: str, commit_b: str, options: dict[str, Any]) -> Path:
+    return cache_dir / f"{commit_a}_{commit_b}_{_options_key(options)}.json"
+
+
+def _params_fingerprint(commit_hash: str) -> list[list[str | None]] | None:
+    """Recorded params/delta hashes from the commit back to its CHECKPOINT.
+
+    These are exactly the files reconstruction reads, so the fingerprint changes
+    whenever the commit's params could. None when the chain is incomplete locally.
+    """
+    fingerprint: list[list[str | None]] = []
+    current_hash = commit_hash
+    while current_hash and current_hash != "_GENESIS_COMMIT_":
+        commit_result = _get_commit_by_hash(current_hash)
+        if not commit_result:
+            return None
+        commit_data = commit_result[0]
+        fingerprint.append(
+            [
+                current_hash,
+                (commit_data.get("params") or {}).get("hash"),
+                (commit_data.get("deltaParams") or {}).get("hash"),
+            ]
+        )
+        if commit_data.get("commitType") == "CHECKPOINT":
+            return fingerprint
+        current_hash = commit_data.get("previousCommitHash")
+    return None
+
+
+def _load_diff(cache_dir: Path, commit_a: str, commit_b: str, options: dict[str, Any]) -> dict[str, Any] | None:
+    """Cached payload for the pair and options, or None on a miss or stale entry."""
+    entry_path = _entry_path(cache_dir, commit_a, commit_b, options)
+    if not entry_path.exists():
+        return None
+    try:
+        with open(entry_path, "r") as f:
+            entry = json.load(f)
+    except Exception:
+        entry = None
+
+    if (
+        not isinstance(entry, dict)
+        or entry.get("version") != CACHE_VERSION
+        or entry.get("fingerprintA") != _params_fingerprint(commit_a)
+        or entry.get("fingerprintB") != _params_fingerprint(commit_b)
+    ):
+        entry_path.unlink(missing_ok=True)
+        return None
+
+    os.utime(entry_path)
+    return entry["payload"]
+
+
+def _store_diff(
+    cache_dir: Path,
+    commit_a: str,
+    commit_b: str,
+    options: dict[str, Any],
+    payload: dict[str, Any],
+    max_entries: int | None = None,
+) -> None:
+    """Atomically write a payload; uncacheable when a commit's chain is incomplete."""
+    fingerprint_a, fingerprint_b = _params_fingerprint(commit_a), _params_fingerprint(commit_b)
+    if fingerprint_a is None or fingerprint_b is None:
+        return
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry_path = _entry_path(cache_dir, commit_a, commit_b, options)
+    tmp_path = entry_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {
+                "version": CACHE_VERSION,
+                "options": options,
+                "fingerprintA": fingerprint_a,
+                "fingerprintB": fingerprint_b,
+                "payload": payload,
+            },
+            f,
+        )
+    os.replace(tmp_path, entry_path)
+
+    if max_entries is not None and max_entries >= 0:
+        _evict(cache_dir, max_entries)
+
+
+def _evict(cache_dir: Path, max_entries: int) -> int:
+    """Delete the least recently used entries beyond max_entries. Returns: Entries deleted"""
+    entries = sorted(cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime_ns)
+    excess = entries[: max(0, len(entries) - max_entries)]
+    for entry_path in excess:
+        entry_path.unlink(missing_ok=True)
+    return len(excess)
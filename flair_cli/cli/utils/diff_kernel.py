@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+# Elements per chunk; each worker's three float64 scratch buffers of this size bound its memory (6 MB)
+DEFAULT_CHUNK_ELEMENTS = 1 << 18
+# Tensors larger than this are split into row blocks that workers process independently.
+# The partition depends only on the tensor shape, so results are identical at any job count.
+DEFAULT_BLOCK_ELEMENTS = 1 << 22
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+@dataclass
+class TensorDiff:
+    """Float64 accumulators for one tensor pair, filled in a single chunked pass."""
+
+    name: str
+    shape: tuple[int, ...]
+    size: int
+    delta_sq: float = 0.0
+    nonzero: int = 0
+    max_abs: float = 0.0
+    dot_ab: float = 0.0
+    norm_a_sq: float = 0.0
+    norm_b_sq: float = 0.0
+
+    @property
+    def delta_norm(self) -> float:
+        return math.sqrt(self.delta_sq)
+
+    @property
+    def percent_changed(self) -> float:
+        return 100.0 * self.nonzero / self.size if self.size > 0 else 0.0
+
+    def merge(self, other: "TensorDiff") -> None:
+        """Fold in the partial result of a later block of the same tensor."""
+        self.delta_sq += other.delta_sq
+        self.nonzero += other.nonzero
+        self.max_abs = max(self.max_abs, other.max_abs)
+        self.dot_ab += other.dot_ab
+        self.norm_a_sq += other.norm_a_sq
+        self.norm_b_sq += other.norm_b_sq
+
+    def to_layer_stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "shape": list(self.shape),
+            "delta_norm": self.delta_norm,
+            "percent_changed": self.percent_changed,
+            "max_abs_difference": self.max_abs,
+        }
+
+
+@dataclass
+class DiffTotals:
+    """Running model-level totals over TensorDiffs, so layers can be streamed and dropped."""
+
+    total_parameters: int = 0
+    changed_parameters: int = 0
+    tensor_count: int = 0
+    delta_norm_sum: float = 0.0
+    max_delta_norm: float = 0.0
+    dot_ab: float = 0.0
+    norm_a_sq: float = 0.0
+    norm_b_sq: float = 0.0
+
+    def add(self, tensor: TensorDiff) -> None:
+        delta_norm = tensor.delta_norm
+        self.total_parameters += tensor.size
+        self.changed_parameters += tensor.nonzero
+        self.tensor_count += 1
+        self.delta_norm_sum += delta_norm
+        self.max_delta_norm = max(self.max_delta_norm, delta_norm)
+        self.dot_ab += tensor.dot_ab
+        self.norm_a_sq += tensor.norm_a_sq
+        self.norm_b_sq += tensor.norm_b_sq
+
+    def cosine_similarity(self) -> float:
+        if self.norm_a_sq > 0 and self.norm_b_sq > 0:
+            return float(self.dot_ab / math.sqrt(self.norm_a_sq * self.norm_b_sq))
+        return 1.0
+
+    def overall_stats(self) -> dict[str, Any]:
+        total = self.total_parameters
+        return {
+            "architecture_compatible": True,
+            "total_parameters": int(total),
+            "changed_parameters": int(self.changed_parameters),
+            "percent_changed": float(100.0 * self.changed_parameters / total) if total > 0 else 0.0,
+            "mean_delta_norm": self.delta_norm_sum / self.tensor_count if self.tensor_count else 0.0,
+            "max_delta_norm": self.max_delta_norm,
+            "cosine_similarity": self.cosine_similarity(),
+        }
+
+
+class _Scratch:
+    """Reusable float64 buffers for the chunk loop, sized to the largest chunk seen."""
+
+    def __init__(self, chunk_elements: int):
+        self.chunk_elements = max(1, int(chunk_elements))
+        self._buffers = [np.empty(0, dtype=np.float64) for _ in range(3)]
+
+    def views(self, count: int) -> list[np.ndarray]:
+        if self._buffers[0].size < count:
+            self._buffers = [np.empty(count, dtype=np.float64) for _ in range(3)]
+        return [buffer[:count] for buffer in self._buffers]
+
+
+class _BFloat16Flat:
+    """A flat bfloat16 tensor, upcast to float32 one slice at a time.
+
+    NumPy has no bfloat16, so the tensor's bits are viewed as uint16 and each slice
+    is widened on read (bfloat16 is the top half of a float32). Supports the slicing
+    and fancy indexing the kernels use; the whole tensor is never converted.
+    """
+
+    def __init__(self, bits: np.ndarray):
+        self._bits = bits
+        self.size = bits.size
+        self.shape = bits.shape
+        self.dtype = np.dtype(np.float32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index) -> np.ndarray:
+        return (self._bits[index].astype(np.uint32) << 16).view(np.float32)
+
+
+def _is_torch_tensor(value: Any) -> bool:
+    return type(value).__module__.startswith("torch") and hasattr(value, "detach")
+
+
+def _as_array(value: Any) -> np.ndarray:
+    """A flat view of a tensor without copying when it is contiguous.
+
+    Torch tensors are bridged with Tensor.numpy(), which shares memory (tensors on
+    another device are copied to the CPU first); bfloat16 tensors come back as a
+    _BFloat16Flat that upcasts per slice.
+    """
+    if _is_torch_tensor(value):
+        tensor = value.detach()
+        if tensor.device.type != "cpu":
+            tensor = tensor.cpu()
+        tensor = tensor.reshape(-1)
+        if str(tensor.dtype) == "torch.bfloat16":
+            import torch
+
+            return _BFloat16Flat(tensor.view(torch.int16).numpy().view(np.uint16))
+        return tensor.numpy()
+    return np.asarray(value).reshape(-1)
+
+
+def _row_blocks(shape: tuple[int, ...], size: int, block_elements: int) -> list[tuple[int, int]]:
+    """Flat [start, stop) ranges covering whole rows, at most ~block_elements each."""
+    if size <= block_elements:
+        return [(0, size)]
+    row = size // shape[0] if shape and shape[0] else size
+    step = max(row, block_elements // row * row)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _diff_block(
+    flat_a: np.ndarray,
+    flat_b: np.ndarray,
+    start: int,
+    stop: int,
+    scratch: _Scratch,
+    b_is_delta: bool = False,
+) -> TensorDiff:
+    """Accumulate one block; name/shape/size are filled in by the caller.
+
+    With b_is_delta, flat_b holds Δ = b - a and b's norms are derived from a and Δ.
+    """
+    result = TensorDiff(name="", shape=(), size=stop - start)
+    for chunk_start in range(start, stop, scratch.chunk_elements):
+        chunk_stop = min(chunk_start + scratch.chunk_elements, stop)
+        a, b, delta = scratch.views(chunk_stop - chunk_start)
+        a[...] = flat_a[chunk_start:chunk_stop]
+        b[...] = flat_b[chunk_start:chunk_stop]
+        a_sq = float(np.dot(a, a))
+        a_dot_b = float(np.dot(a, b))
+        result.norm_a_sq += a_sq
+
+        if b_is_delta:
+            delta_sq = float(np.dot(b, b))
+            result.dot_ab += a_sq + a_dot_b
+            result.norm_b_sq += a_sq + 2 * a_dot_b + delta_sq
+            result.delta_sq += delta_sq
+            delta = b
+        else:
+            result.dot_ab += a_dot_b
+            result.norm_b_sq += float(np.dot(b, b))
+            np.subtract(b, a, out=delta)
+            result.delta_sq += float(np.dot(delta, delta))
+
+        result.nonzero += int(np.count_nonzero(delta))
+        np.abs(delta, out=delta)
+        result.max_abs = max(result.max_abs, float(delta.max()))
+    return result
+
+
+def _shared_tensors(params_a: Mapping[str, Any], params_b: Mapping[str, Any]) -> Iterator[str]:
+    for key in sorted(params_a.keys()):
+        if key in params_b and np.shape(params_a[key]) == np.shape(params_b[key]):
+            yield key
+
+
+def _zero_delta(value: Any) -> np.ndarray:
+    """A zero Δ for a tensor the summed deltas do not touch, without allocating it."""
+    return np.broadcast_to(np.zeros((), dtype=np.float32), np.shape(value))
+
+
+def iter_tensor_diffs(
+    params_a: Mapping[str, Any],
+    params_b: Mapping[str, Any],
+    chunk_elements: int = DEFAULT_CHUNK_ELEMENTS,
+    jobs: int = 1,
+    block_elements: int = DEFAULT_BLOCK_ELEMENTS,
+    b_is_delta: bool = False,
+    swap_sides: bool = False,
+) -> Iterator[TensorDiff]:
+    """Yield one TensorDiff per shared, same-shape tensor, in sorted key order.
+
+    Each tensor is read once in chunks of `chunk_elements`, upcast into float64
+    scratch buffers; no flattened copy of either model is made. With jobs > 1, tensors
+    and the row blocks of large tensors are spread over a thread pool (NumPy releases
+    the GIL in the copy and reduction loops). Block partials are merged in block order,
+    so the output does not depend on `jobs`.
+
+    With b_is_delta, params_b is the summed delta from params_a to the other commit
+    (tensors it lacks are unchanged); swap_sides reports params_a as side B, for when
+    params_a is the later commit's ancestor but was given second.
+    """
+    local = threading.local()
+
+    def run(task: tuple[str, np.ndarray, np.ndarray, int, int]) -> TensorDiff:
+        scratch = getattr(local, "scratch", None)
+        if scratch is None:
+            scratch = local.scratch = _Scratch(chunk_elements)
+        _, flat_a, flat_b, start, stop = task
+        result = _diff_block(flat_a, flat_b, start, stop, scratch, b_is_delta=b_is_delta)
+        if swap_sides:
+            result.norm_a_sq, result.norm_b_sq = result.norm_b_sq, result.norm_a_sq
+        return result
+
+    def tasks() -> Iterator[tuple[str, np.ndarray, np.ndarray, int, int]]:
+        if b_is_delta:
+            keys = sorted(
+                key for key in params_a.keys() if key not in params_b or np.shape(params_a[key]) == np.shape(params_b[key])
+            )
+        else:
+            keys = _shared_tensors(params_a, params_b)
+        for key in keys:
+            value_b = params_b[key] if key in params_b else _zero_delta(params_a[key])
+            flat_a, flat_b = _as_array(params_a[key]), _as_array(value_b)
+            for start, stop in _row_blocks(np.shape(params_a[key]), flat_a.size, block_elements):
+                yield key, flat_a, flat_b, start, stop
+
+    def merged(partials: Iterator[tuple[tuple, TensorDiff]]) -> Iterator[TensorDiff]:
+        current: TensorDiff | None = None
+        for (key, flat_a, _, start, _), partial in partials:
+            if start == 0:
+                if current is not None:
+                    yield current
+                partial.name, partial.shape = key, tuple(np.shape(params_a[key]))
+                partial.size = int(flat_a.size)
+                current = partial
+            else:
+                current.merge(partial)
+        if current is not None:
+            yield current
+
+    if jobs <= 1:
+        yield from merged((task, run(task)) for task in tasks())
+        return
+
+    all_tasks = list(tasks())
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        yield from merged(zip(all_tasks, pool.map(run, all_tasks)))
+
+
+# Upper bound on the float64 block (commits x columns) held while accumulating a Gram matrix
+GRAM_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+class ParamSpool:
+    """Flattened params of many commits as rows of an on-disk float32 matrix.
+
+    Each commit is written once (optionally centred on a base commit), so a Gram
+    matrix over n commits costs n loads; the matrix is then reduced in column
+    blocks, keeping memory at one model plus one block.
+    """
+
+    def __init__(self, path, layout: list[tuple[str, tuple[int, ...]]], rows: int):
+        self.layout = layout
+        self.columns = sum(math.prod(shape) for _, shape in layout)
+        self.matrix = np.memmap(path, dtype=np.float32, mode="w+", shape=(rows, max(1, self.columns)))
+
+    @staticmethod
+    def layout_of(params: Mapping[str, Any]) -> list[tuple[str, tuple[int, ...]]]:
+        return [(key, tuple(np.shape(params[key]))) for key in sorted(params.keys())]
+
+    def write_row(
+        self,
+        row: int,
+        params: Mapping[str, Any],
+        base: Mapping[str, Any] | None = None,
+        chunk_elements: int = DEFAULT_CHUNK_ELEMENTS,
+    ) -> None:
+        if self.layout_of(params) != self.layout:
+            raise ValueError("Cannot compare commits with different parameter layouts.")
+
+        offset = 0
+        for key, _ in self.layout:
+            flat = _as_array(params[key])
+            flat_base = _as_array(base[key]) if base is not None else None
+            for start in range(0, flat.size, chunk_elements):
+                stop = min(start + chunk_elements, flat.size)
+                target = self.matrix[row, offset + start:offset + stop]
+                if flat_base is None:
+                    target[...] = flat[start:stop]
+                else:
+                    np.subtract(flat[start:stop], flat_base[start:stop], out=target, dtype=np.float64, casting="unsafe")
+            offset += flat.size
+        self.matrix.flush()
+
+    def gram(self) -> np.ndarray:
+        """X Xᵀ in float64, accumulated over column blocks with one BLAS call per block."""
+        rows = self.matrix.shape[0]
+        block = max(1024, GRAM_BLOCK_BYTES // (8 * max(1, rows)))
+        gram = np.zeros((rows, rows), dtype=np.float64)
+        for start in range(0, self.columns, block):
+            x = np.asarray(self.matrix[:, start:start + block], dtype=np.float64)
+            gram += x @ x.T
+        return gram
+
+
+def similarity_from_gram(gram: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Cosine similarity and L2 distance matrices from a Gram matrix."""
+    sq_norms = np.diag(gram)
+    norms = np.sqrt(sq_norms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = gram / np.outer(norms, norms)
+    # Zero vectors are taken as identical to each other, as in compute_overall_stats
+    cosine[~np.isfinite(cosine)] = 1.0
+    np.fill_diagonal(cosine, 1.0)
+    distance = np.sqrt(np.maximum(sq_norms[:, None] + sq_norms[None, :] - 2 * gram, 0.0))
+    np.fill_diagonal(distance, 0.0)
+    return cosine, distance
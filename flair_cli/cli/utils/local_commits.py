@@ -5,6 +5,9 @@ from pathlib import Path
 
 import typer
 
+# Metadata of remote commits recorded by partial clones (see remote_commits.py)
+REMOTE_COMMITS_DIR = ".remote_commits"
+
 
 def _get_flair_dir() -> Path:
     """Get .flair directory in current repo."""
@@ -30,19 +33,20 @@ def _get_head_info() -> dict | None:
 
 
 def _get_commit_by_hash(commit_hash: str) -> tuple[dict, Path] | None:
-    """Get commit data and directory by hash."""
-    flair_dir = Path.cwd() / ".flair"
-    local_commits_dir = flair_dir / ".local_commits"
+    """Get commit data and directory by hash.
 
-    if not local_commits_dir.exists():
-        return None
+    Local commits take precedence; remote commits recorded by a partial clone
+    are used as a fallback.
+    """
+    flair_dir = Path.cwd() / ".flair"
 
-    commit_dir = local_commits_dir / commit_hash
-    commit_file = commit_dir / "commit.json"
+    for commits_dir in (flair_dir / ".local_commits", flair_dir / REMOTE_COMMITS_DIR):
+        commit_dir = commits_dir / commit_hash
+        commit_file = commit_dir / "commit.json"
 
-    if commit_file.exists():
-        with open(commit_file, "r") as f:
-            return json.load(f), commit_dir
+        if commit_file.exists():
+            with open(commit_file, "r") as f:
+                return json.load(f), commit_dir
 
     return None
 
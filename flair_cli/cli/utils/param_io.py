@@ -3,13 +3,16 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Callable
 
+from ...core.profiling import span
+
 
 def _load_pytorch_params(file_path: Path, warn: Callable[[str], None] | None = None):
     """Load PyTorch parameters from file."""
     try:
         import torch
 
-        return torch.load(file_path, map_location="cpu")
+        with span("params.load", file=Path(file_path).name):
+            return torch.load(file_path, map_location="cpu")
     except Exception as e:
         if warn:
             warn(f"Failed to load PyTorch params from {file_path}: {e}")
@@ -21,8 +24,9 @@ def _load_numpy_params(file_path: Path, warn: Callable[[str], None] | None = Non
     try:
         import numpy as np
 
-        data = np.load(file_path)
-        return {key: data[key] for key in data.files}
+        with span("params.load", file=Path(file_path).name):
+            data = np.load(file_path)
+            return {key: data[key] for key in data.files}
     except Exception as e:
         if warn:
             warn(f"Failed to load NumPy params from {file_path}: {e}")
@@ -34,7 +38,8 @@ def _save_pytorch_params(params, file_path: Path, warn: Callable[[str], None] |
     try:
         import torch
 
-        torch.save(params, file_path)
+        with span("params.save", file=Path(file_path).name):
+            torch.save(params, file_path)
         return True
     except Exception as e:
         if warn:
@@ -47,9 +52,82 @@ def _save_numpy_params(params: dict, file_path: Path, warn: Callable[[str], None
     try:
         import numpy as np
 
-        np.savez(file_path, **params)
+        with span("params.save", file=Path(file_path).name):
+            np.savez(file_path, **params)
         return True
     except Exception as e:
         if warn:
             warn(f"Failed to save NumPy params: {e}")
         return False
+
+
+def _map_npz_member(file_path: Path, info):
+    """Memory-map one stored (uncompressed) .npy member of an .npz, or None if it cannot be."""
+    import struct
+
+    import numpy as np
+
+    if info.compress_type != 0:  # zipfile.ZIP_STORED
+        return None
+    with open(file_path, "rb") as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", local_header[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if dtype.hasobject or not shape:
+        # Scalars are read (np.memmap needs at least one dimension)
+        return None
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(file_path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+
+
+def _open_numpy_params(file_path: Path, warn: Callable[[str], None] | None = None):
+    """Open NumPy parameters without reading them: stored .npz members are memory-mapped.
+
+    Compressed members (np.savez_compressed) cannot be mapped and are read whole.
+    """
+    try:
+        import zipfile
+
+        import numpy as np
+
+        with span("params.open", file=Path(file_path).name), zipfile.ZipFile(file_path) as archive:
+            params = {}
+            for info in archive.infolist():
+                key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+                mapped = _map_npz_member(Path(file_path), info)
+                if mapped is None:
+                    with archive.open(info) as member:
+                        mapped = np.lib.format.read_array(member, allow_pickle=False)
+                params[key] = mapped
+            return params
+    except Exception as e:
+        if warn:
+            warn(f"Failed to open NumPy params from {file_path}: {e}")
+        return None
+
+
+def _open_pytorch_params(file_path: Path, warn: Callable[[str], None] | None = None):
+    """Open PyTorch parameters with storages memory-mapped (zip format), else load them."""
+    try:
+        import torch
+
+        with span("params.open", file=Path(file_path).name):
+            try:
+                return torch.load(file_path, map_location="cpu", mmap=True)
+            except RuntimeError:
+                # Legacy (non-zip) serialization cannot be mapped
+                return torch.load(file_path, map_location="cpu")
+    except Exception as e:
+        if warn:
+            warn(f"Failed to open PyTorch params from {file_path}: {e}")
+        return None
@@ -1,25 +1,118 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Callable
 
+import numpy as np
+
+from ...core.profiling import profiled
+
+from .diff_kernel import _as_array
 from .local_commits import _get_commit_by_hash
-from .param_io import _load_numpy_params, _load_pytorch_params
+from .param_io import _load_numpy_params, _load_pytorch_params, _open_numpy_params, _open_pytorch_params
 
 
-def _reconstruct_params_from_checkpoint(
-    target_commit_hash: str,
+@profiled("delta.apply")
+def _apply_delta(current_params, delta_params) -> None:
+    """Add a delta to params in place; keys missing from params are taken as-is."""
+    for key in delta_params.keys():
+        if key in current_params:
+            current_params[key] = current_params[key] + delta_params[key]
+        else:
+            current_params[key] = delta_params[key]
+
+
+def _load_delta_params(
+    commit_hash: str,
+    commit_data: dict,
+    commit_dir: Path,
+    framework: str,
+    warn: Callable[[str], None] | None = None,
+):
+    """Load the delta a DELTA commit stores under .delta_params/."""
+    delta_info = commit_data.get("deltaParams")
+    if not delta_info or not delta_info.get("file"):
+        if warn:
+            warn(f"No delta found for {commit_hash[:16]}..., cannot reconstruct")
+        return None
+
+    delta_file = commit_dir / ".delta_params" / delta_info["file"]
+    if not delta_file.exists():
+        if warn:
+            warn(f"Delta file not found: {delta_file}")
+        return None
+
+    if framework == "pytorch":
+        return _load_pytorch_params(delta_file, warn=warn)
+    return _load_numpy_params(delta_file, warn=warn)
+
+
+def _delta_path(ancestor_hash: str, descendant_hash: str) -> list[tuple[str, dict, Path]] | None:
+    """DELTA commits after ancestor up to and including descendant, oldest first.
+
+    Returns None when ancestor is not reachable from descendant through DELTA commits
+    only (a CHECKPOINT in between has no delta to sum), or when the hashes are equal.
+    """
+    path: list[tuple[str, dict, Path]] = []
+    current_hash = descendant_hash
+    while current_hash and current_hash != "_GENESIS_COMMIT_":
+        if current_hash == ancestor_hash:
+            path.reverse()
+            return path or None
+
+        commit_result = _get_commit_by_hash(current_hash)
+        if not commit_result:
+            return None
+        commit_data, commit_dir = commit_result
+        if commit_data.get("commitType") != "DELTA" or not (commit_data.get("deltaParams") or {}).get("file"):
+            return None
+
+        path.append((current_hash, commit_data, commit_dir))
+        current_hash = commit_data.get("previousCommitHash")
+    return None
+
+
+@profiled("delta.sum")
+def _sum_deltas(
+    path: list[tuple[str, dict, Path]],
     framework: str,
     info: Callable[[str], None] | None = None,
     warn: Callable[[str], None] | None = None,
-    include_checkpoint_hash: bool = False,
 ):
-    """Reconstruct parameters by traversing back to CHECKPOINT and replaying deltas."""
-    if info:
-        info("Reconstructing parameters from checkpoint...")
+    """Sum the deltas along a _delta_path: the total change from ancestor to descendant."""
+    if any(commit_data.get("remote") for _, commit_data, _ in path):
+        from .remote_commits import _fetch_missing_blobs
+
+        if not _fetch_missing_blobs([(commit_data, commit_dir) for _, commit_data, commit_dir in path], info=info, warn=warn):
+            return None
+
+    total = None
+    for commit_hash, commit_data, commit_dir in path:
+        delta_params = _load_delta_params(commit_hash, commit_data, commit_dir, framework, warn=warn)
+        if delta_params is None:
+            return None
+        if total is None:
+            total = delta_params
+        else:
+            _apply_delta(total, delta_params)
+        if info:
+            info(f"Added delta from {commit_hash[:16]}...")
+    return total
+
 
+def _checkpoint_chain(
+    target_commit_hash: str,
+    info: Callable[[str], None] | None = None,
+    warn: Callable[[str], None] | None = None,
+) -> list[tuple[str, dict, Path]] | None:
+    """Commits from the nearest CHECKPOINT up to the target, oldest first.
+
+    Blobs of remote commits on the chain are fetched first, so every entry has its
+    params (the CHECKPOINT) or delta (the rest) on disk.
+    """
     current_hash = target_commit_hash
     checkpoint_hash = None
-    traversal_stack: list[tuple[str, dict]] = []
+    traversal_stack: list[tuple[str, dict, Path]] = []
 
     while current_hash and current_hash != "_GENESIS_COMMIT_":
         commit_result = _get_commit_by_hash(current_hash)
@@ -28,8 +121,8 @@ def _reconstruct_params_from_checkpoint(
                 warn(f"Commit {current_hash[:16]}... not found during traversal")
             break
 
-        commit_data, _ = commit_result
-        traversal_stack.append((current_hash, commit_data))
+        commit_data, commit_dir = commit_result
+        traversal_stack.append((current_hash, commit_data, commit_dir))
 
         if commit_data.get("commitType") == "CHECKPOINT":
             checkpoint_hash = current_hash
@@ -45,6 +138,21 @@ def _reconstruct_params_from_checkpoint(
     if info:
         info(f"Found CHECKPOINT at: {checkpoint_hash[:16]}...")
 
+    # Partial clones record remote commits without blobs: fetch only the
+    # CHECKPOINT params and the deltas on the path to the target.
+    if any(commit_data.get("remote") for _, commit_data, _ in traversal_stack):
+        from .remote_commits import _fetch_missing_blobs
+
+        path_commits = [(commit_data, commit_dir) for _, commit_data, commit_dir in traversal_stack]
+        if not _fetch_missing_blobs(path_commits, info=info, warn=warn):
+            return None
+
+    traversal_stack.reverse()
+    return traversal_stack
+
+
+def _checkpoint_params_file(chain: list[tuple[str, dict, Path]], warn: Callable[[str], None] | None = None) -> Path | None:
+    checkpoint_hash = chain[0][0]
     checkpoint_commit_result = _get_commit_by_hash(checkpoint_hash)
     if not checkpoint_commit_result:
         if warn:
@@ -64,6 +172,28 @@ def _reconstruct_params_from_checkpoint(
         if warn:
             warn(f"CHECKPOINT params file not found: {params_file}")
         return None
+    return params_file
+
+
+@profiled("params.reconstruct")
+def _reconstruct_params_from_checkpoint(
+    target_commit_hash: str,
+    framework: str,
+    info: Callable[[str], None] | None = None,
+    warn: Callable[[str], None] | None = None,
+    include_checkpoint_hash: bool = False,
+):
+    """Reconstruct parameters by traversing back to CHECKPOINT and replaying deltas."""
+    if info:
+        info("Reconstructing parameters from checkpoint...")
+
+    chain = _checkpoint_chain(target_commit_hash, info=info, warn=warn)
+    if chain is None:
+        return None
+
+    params_file = _checkpoint_params_file(chain, warn=warn)
+    if params_file is None:
+        return None
 
     if framework == "pytorch":
         current_params = _load_pytorch_params(params_file, warn=warn)
@@ -76,40 +206,12 @@ def _reconstruct_params_from_checkpoint(
     if info:
         info("Loaded CHECKPOINT params")
 
-    traversal_stack.reverse()
-
-    for commit_hash, commit_data in traversal_stack[1:]:
-        delta_info = commit_data.get("deltaParams")
-        if not delta_info or not delta_info.get("file"):
-            if warn:
-                warn(f"No delta found for {commit_hash[:16]}..., cannot reconstruct")
-            return None
-
-        commit_result = _get_commit_by_hash(commit_hash)
-        if not commit_result:
-            continue
-
-        _, commit_dir = commit_result
-        delta_file = commit_dir / ".delta_params" / delta_info["file"]
-
-        if not delta_file.exists():
-            if warn:
-                warn(f"Delta file not found: {delta_file}")
-            return None
-
-        if framework == "pytorch":
-            delta_params = _load_pytorch_params(delta_file, warn=warn)
-        else:
-            delta_params = _load_numpy_params(delta_file, warn=warn)
-
+    for commit_hash, commit_data, commit_dir in chain[1:]:
+        delta_params = _load_delta_params(commit_hash, commit_data, commit_dir, framework, warn=warn)
         if delta_params is None:
             return None
 
-        for key in delta_params.keys():
-            if key in current_params:
-                current_params[key] = current_params[key] + delta_params[key]
-            else:
-                current_params[key] = delta_params[key]
+        _apply_delta(current_params, delta_params)
 
         if info:
             info(f"Applied delta from {commit_hash[:16]}...")
@@ -118,5 +220,75 @@ def _reconstruct_params_from_checkpoint(
         info("✓ Parameters reconstructed from CHECKPOINT")
 
     if include_checkpoint_hash:
-        return current_params, checkpoint_hash
+        return current_params, chain[0][0]
     return current_params
+
+
+class ParamView:
+    """Read-only params of a commit as its memory-mapped CHECKPOINT plus deltas.
+
+    Nothing is reconstructed: gather() reads only the requested elements from each
+    file on the chain and sums them, so its cost scales with the number of elements
+    read rather than the model size.
+    """
+
+    def __init__(self, sources: list):
+        self._sources = sources
+        self._shapes: dict[str, tuple[int, ...]] = {}
+        for source in sources:
+            for key in source.keys():
+                self._shapes.setdefault(key, tuple(source[key].shape))
+
+    def keys(self):
+        return self._shapes.keys()
+
+    def shape(self, key: str) -> tuple[int, ...]:
+        return self._shapes[key]
+
+    def size(self, key: str) -> int:
+        size = 1
+        for dim in self._shapes[key]:
+            size *= dim
+        return size
+
+    def gather(self, key: str, index) -> np.ndarray:
+        """Float64 values of the flattened tensor at index (an index array or slice)."""
+        total = None
+        for source in self._sources:
+            if key not in source:
+                continue
+            values = _as_array(source[key])[index].astype(np.float64)
+            total = values if total is None else total + values
+        return total
+
+
+@profiled("params.view")
+def _open_param_view(
+    target_commit_hash: str,
+    framework: str,
+    info: Callable[[str], None] | None = None,
+    warn: Callable[[str], None] | None = None,
+) -> ParamView | None:
+    """Open a commit's params as a ParamView over memory-mapped files."""
+    chain = _checkpoint_chain(target_commit_hash, info=info, warn=warn)
+    if chain is None:
+        return None
+
+    params_file = _checkpoint_params_file(chain, warn=warn)
+    if params_file is None:
+        return None
+
+    open_params = _open_pytorch_params if framework == "pytorch" else _open_numpy_params
+    sources = [open_params(params_file, warn=warn)]
+    for commit_hash, commit_data, commit_dir in chain[1:]:
+        delta_info = commit_data.get("deltaParams") or {}
+        delta_file = commit_dir / ".delta_params" / delta_info.get("file", "")
+        if not delta_info.get("file") or not delta_file.exists():
+            if warn:
+                warn(f"No delta found for {commit_hash[:16]}..., cannot reconstruct")
+            return None
+        sources.append(open_params(delta_file, warn=warn))
+
+    if any(source is None for source in sources):
+        return None
+    return ParamView(sources)
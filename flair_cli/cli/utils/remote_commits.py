@@ -0,0 +1,273 @@
+"""Remote commit history recorded by partial clones.
+
+`flair clone --depth N` and `flair clone --filter=lazy` store the metadata of remote
+commits under ``.flair/.remote_commits/<hash>/commit.json`` using the same layout as
+local commits. Params (CHECKPOINT) and delta (DELTA) blobs are only downloaded when
+reconstruction needs them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+import httpx
+
+from ...api import client as api_client
+from ...core.config import load_config
+from ...core.profiling import span
+from .local_commits import REMOTE_COMMITS_DIR
+
+DEFAULT_FETCH_WORKERS = 8
+# Commits per page of the incremental branch listing
+COMMIT_PAGE_SIZE = 200
+
+
+@lru_cache(maxsize=1)
+def _merger_address() -> str | None:
+    """Wallet the merger service commits with: FLAIR_MERGER_ADDRESS, else merger_address in the config."""
+    return os.environ.get("FLAIR_MERGER_ADDRESS") or load_config().merger_address
+
+
+def _remote_commit_type(remote_commit: dict) -> str:
+    """CHECKPOINT or DELTA for a backend commit.
+
+    The backend stores a missing type as DELTA, so the recorded type is not trusted for
+    commits that always hold full params: a branch's first commit, and merge commits
+    from mergers that did not send a type, recognized by the merger's committer address.
+    """
+    if (remote_commit.get("previousCommitHash") or "_GENESIS_COMMIT_") == "_GENESIS_COMMIT_":
+        return "CHECKPOINT"
+    merger_address = _merger_address()
+    if merger_address and remote_commit.get("committerAddress") == merger_address:
+        return "CHECKPOINT"
+    return (remote_commit.get("commitType") or "CHECKPOINT").upper()
+
+
+def _params_extension(framework: str | None) -> str:
+    """Params blobs are pushed as .pt for PyTorch and .npz for everything else."""
+    return ".pt" if (framework or "").lower() == "pytorch" else ".npz"
+
+
+def _to_local_commit(remote_commit: dict, repo_hash: str, branch_hash: str) -> dict:
+    """Convert backend commit metadata into the local commit.json layout."""
+    commit_hash = remote_commit["commitHash"]
+    previous_commit_hash = remote_commit.get("previousCommitHash") or "_GENESIS_COMMIT_"
+    commit_type = _remote_commit_type(remote_commit)
+    framework = remote_commit.get("architecture")
+    ext = _params_extension(framework)
+
+    commit_data = {
+        "commitHash": commit_hash,
+        "previousCommitHash": previous_commit_hash,
+        "commitType": commit_type,
+        "message": remote_commit.get("message"),
+        "architecture": framework,
+        "status": "REMOTE",
+        "params": None,
+        "deltaParams": None,
+        "remote": {
+            "repoHash": repo_hash,
+            "branchHash": branch_hash,
+            "paramHash": remote_commit.get("paramHash"),
+            "committerAddress": remote_commit.get("committerAddress"),
+            "createdAt": remote_commit.get("createdAt"),
+        },
+    }
+
+    # The pushed params blob is the delta for DELTA commits and the full params otherwise.
+    if commit_type == "DELTA":
+        commit_data["deltaParams"] = {
+            "file": f"delta{ext}",
+            "hash": remote_commit.get("paramHash"),
+            "previousCommitHash": previous_commit_hash,
+        }
+    else:
+        commit_data["params"] = {
+            "file": f"params{ext}",
+            "hash": remote_commit.get("paramHash"),
+            "framework": framework,
+        }
+
+    return commit_data
+
+
+def _select_history(commits: list[dict], head_hash: str | None, depth: int | None = None) -> list[dict]:
+    """Walk the parent chain from head_hash, newest first.
+
+    With a depth, the walk stops once `depth` commits are collected and the last one
+    is a CHECKPOINT, so every recorded commit stays reconstructable.
+    """
+    by_hash = {c["commitHash"]: c for c in commits if c.get("commitHash")}
+    chain: list[dict] = []
+    seen: set[str] = set()
+    current_hash = head_hash
+
+    while current_hash and current_hash != "_GENESIS_COMMIT_" and current_hash in by_hash and current_hash not in seen:
+        seen.add(current_hash)
+        commit = by_hash[current_hash]
+        chain.append(commit)
+        if depth is not None and len(chain) >= depth and _remote_commit_type(commit) == "CHECKPOINT":
+            break
+        current_hash = commit.get("previousCommitHash")
+
+    return chain
+
+
+def _list_commits_since(repo_hash: str, branch_hash: str, since: str, page_size: int = COMMIT_PAGE_SIZE) -> list[dict]:
+    """Commits created at or after `since` (inclusive), oldest first, fetched page by page."""
+    commits: list[dict] = []
+    while True:
+        page = api_client.list_branch_commits(repo_hash, branch_hash, since=since, skip=len(commits), limit=page_size)
+        commits.extend(page)
+        if len(page) < page_size:
+            return commits
+
+
+def _fetch_history(repo_hash: str, branch_hash: str, head_hash: str | None, known: dict[str, dict]) -> list[dict]:
+    """Chain from head_hash back to its nearest CHECKPOINT, newest first.
+
+    Commits missing from `known` are fetched one at a time, so only the history the
+    reconstruction needs is downloaded.
+    """
+    chain: list[dict] = []
+    seen: set[str] = set()
+    current_hash = head_hash
+    while current_hash and current_hash != "_GENESIS_COMMIT_" and current_hash not in seen:
+        seen.add(current_hash)
+        commit = known.get(current_hash) or api_client.get_commit_for_pull(repo_hash, branch_hash, current_hash)
+        if not commit:
+            break
+        chain.append(commit)
+        if _remote_commit_type(commit) == "CHECKPOINT":
+            break
+        current_hash = commit.get("previousCommitHash")
+    return chain
+
+
+def _branch_tip(commits: list[dict]) -> dict | None:
+    """Newest commit of a branch: the one no other commit points to as its parent."""
+    parents = {c.get("previousCommitHash") for c in commits}
+    tips = [c for c in commits if c.get("commitHash") and c["commitHash"] not in parents]
+    if not tips:
+        return None
+    return max(tips, key=lambda c: c.get("createdAt") or "")
+
+
+def _commits_since(commits: list[dict], tip_hash: str, base_hash: str | None) -> list[dict] | None:
+    """Commits after base_hash up to tip_hash, oldest first.
+
+    Returns None when base_hash is not an ancestor of tip_hash (diverged history).
+    """
+    chain = _select_history(commits, tip_hash)
+    if not base_hash or base_hash == "_GENESIS_COMMIT_":
+        if chain and (chain[-1].get("previousCommitHash") or "_GENESIS_COMMIT_") != "_GENESIS_COMMIT_":
+            return None
+        return list(reversed(chain))
+
+    for idx, commit in enumerate(chain):
+        if commit["commitHash"] == base_hash:
+            return list(reversed(chain[:idx]))
+    return None
+
+
+def _record_remote_history(flair_dir: Path, commits: Iterable[dict], repo_hash: str, branch_hash: str) -> int:
+    """Write remote commit metadata without downloading any blobs.
+
+    Returns: Number of commits recorded
+    """
+    remote_dir = flair_dir / REMOTE_COMMITS_DIR
+    recorded = 0
+    for remote_commit in commits:
+        commit_data = _to_local_commit(remote_commit, repo_hash, branch_hash)
+        commit_dir = remote_dir / commit_data["commitHash"]
+        commit_dir.mkdir(parents=True, exist_ok=True)
+        with open(commit_dir / "commit.json", "w") as f:
+            json.dump(commit_data, f, indent=2)
+        recorded += 1
+    return recorded
+
+
+def _blob_path(commit_data: dict, commit_dir: Path) -> Path | None:
+    """Path of the blob reconstruction reads for this commit."""
+    if commit_data.get("commitType") == "DELTA":
+        delta_info = commit_data.get("deltaParams") or {}
+        return commit_dir / ".delta_params" / delta_info["file"] if delta_info.get("file") else None
+
+    params_info = commit_data.get("params") or {}
+    return commit_dir / params_info["file"] if params_info.get("file") else None
+
+
+def _missing_blobs(commits: Iterable[tuple[dict, Path]]) -> list[tuple[dict, Path]]:
+    """Remote commits whose blob has not been downloaded yet."""
+    missing: list[tuple[dict, Path]] = []
+    for commit_data, commit_dir in commits:
+        if not commit_data.get("remote"):
+            continue
+        blob_path = _blob_path(commit_data, commit_dir)
+        if blob_path is not None and not blob_path.exists():
+            missing.append((commit_data, blob_path))
+    return missing
+
+
+def _fetch_blob(commit_data: dict, target_path: Path) -> None:
+    """Download one commit's params blob and verify it against the recorded param hash."""
+    remote = commit_data["remote"]
+    detail = api_client.get_commit_for_pull(remote["repoHash"], remote["branchHash"], commit_data["commitHash"])
+    ipfs_object = (detail.get("params") or {}).get("ipfsObject") or {}
+    uri = ipfs_object.get("uri")
+    if not uri:
+        raise ValueError(f"No params blob available for {commit_data['commitHash'][:16]}...")
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = target_path.with_name(f"{target_path.name}.part")
+    sha256 = hashlib.sha256()
+    with span("fetch.blob", commit=commit_data["commitHash"][:16]) as fetch_span, httpx.stream("GET", uri, timeout=120) as resp:
+        resp.raise_for_status()
+        with open(part_path, "wb") as f:
+            for chunk in resp.iter_bytes(chunk_size=1024 * 1024):
+                sha256.update(chunk)
+                f.write(chunk)
+        fetch_span.set(bytes=f.tell())
+
+    expected_hash = remote.get("paramHash")
+    if expected_hash and sha256.hexdigest() != expected_hash:
+        part_path.unlink()
+        raise ValueError(f"Hash mismatch for {commit_data['commitHash'][:16]}...")
+
+    os.replace(part_path, target_path)
+
+
+def _fetch_missing_blobs(
+    commits: Iterable[tuple[dict, Path]],
+    max_workers: int = DEFAULT_FETCH_WORKERS,
+    info: Callable[[str], None] | None = None,
+    warn: Callable[[str], None] | None = None,
+) -> bool:
+    """Download the missing blobs of the given remote commits in parallel.
+
+    Returns: True when every blob is available locally
+    """
+    missing = _missing_blobs(commits)
+    if not missing:
+        return True
+
+    if info:
+        info(f"Fetching {len(missing)} missing blob(s) from remote...")
+
+    ok = True
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+        futures = {pool.submit(_fetch_blob, commit_data, blob_path): commit_data for commit_data, blob_path in missing}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                ok = False
+                if warn:
+                    warn(f"Failed to fetch blob for {futures[future]['commitHash'][:16]}...: {e}")
+
+    return ok
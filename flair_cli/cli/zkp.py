@@ -23,9 +23,9 @@ from datetime import datetime
 from typing import Optional
 import os
 import asyncio
-import numpy as np
 
 from ..core import config as config_mod
+from ..core.profiling import profiled, span
 from .utils.local_commits import _get_flair_dir, _get_latest_local_commit
 
 app = typer.Typer()
@@ -84,6 +84,7 @@ def _find_model_file(framework: str) -> Optional[Path]:
     return None
 
 
+@profiled("ezkl.onnx_export")
 def _convert_to_onnx(model_path: Path, framework: str) -> Path:
     """Convert a model to ONNX format if needed."""
     if model_path.suffix == ".onnx":
@@ -184,6 +185,8 @@ def _compute_cid_v1_raw(file_path: Path) -> str:
 
 def _make_random_array(dims):
     """Generate a NumPy array of shape dims, float32 in [0,1)."""
+    import numpy as np
+
     return np.random.rand(*dims).astype(np.float32)
 
 
@@ -255,40 +258,54 @@ async def _process_model_with_ezkl(model_path: Path, input_dims: list, backend:
         py_args.input_visibility = "public"
         py_args.output_visibility = "public"
         py_args.param_visibility = "private"
-        if not ezkl.gen_settings(str(model_path), str(settings_path), py_run_args=py_args):
+        with span("ezkl.gen_settings"):
+            settings_ok = ezkl.gen_settings(str(model_path), str(settings_path), py_run_args=py_args)
+        if not settings_ok:
             raise RuntimeError("gen_settings failed")
         
         console.print("[cyan]Step 4/10: Calibrating settings...[/cyan]")
         # 4) calibrate
-        await ezkl.calibrate_settings(str(cal_path), str(model_path), str(settings_path), "resources")
+        with span("ezkl.calibrate_settings"):
+            await ezkl.calibrate_settings(str(cal_path), str(model_path), str(settings_path), "resources")
         
         console.print("[cyan]Step 5/10: Compiling circuit...[/cyan]")
         # 5) compile
-        if not ezkl.compile_circuit(str(model_path), str(compiled_path), str(settings_path)):
+        with span("ezkl.compile_circuit"):
+            compiled_ok = ezkl.compile_circuit(str(model_path), str(compiled_path), str(settings_path))
+        if not compiled_ok:
             raise RuntimeError("compile_circuit failed")
         
         console.print("[cyan]Step 6/10: Getting SRS (Structured Reference String)...[/cyan]")
         # 6) get SRS
-        await ezkl.get_srs(str(settings_path))
+        with span("ezkl.get_srs"):
+            await ezkl.get_srs(str(settings_path))
         
         console.print("[cyan]Step 7/10: Generating witness...[/cyan]")
         # 7) witness
-        if not await ezkl.gen_witness(str(data_path), str(compiled_path), str(witness_path)):
+        with span("ezkl.gen_witness"):
+            witness_ok = await ezkl.gen_witness(str(data_path), str(compiled_path), str(witness_path))
+        if not witness_ok:
             raise RuntimeError("gen_witness failed")
         
         console.print("[cyan]Step 8/10: Setting up proving and verification keys...[/cyan]")
         # 8) setup keys
-        if not ezkl.setup(str(compiled_path), str(vk_path), str(pk_path)):
+        with span("ezkl.setup"):
+            setup_ok = ezkl.setup(str(compiled_path), str(vk_path), str(pk_path))
+        if not setup_ok:
             raise RuntimeError("setup failed")
         
         console.print("[cyan]Step 9/10: Generating proof...[/cyan]")
         # 9) prove
-        if not ezkl.prove(str(witness_path), str(compiled_path), str(pk_path), str(proof_path), "single"):
+        with span("ezkl.prove"):
+            prove_ok = ezkl.prove(str(witness_path), str(compiled_path), str(pk_path), str(proof_path), "single")
+        if not prove_ok:
             raise RuntimeError("prove failed")
         
         console.print("[cyan]Step 10/10: Verifying proof...[/cyan]")
         # 10) verify
-        if not ezkl.verify(str(proof_path), str(settings_path), str(vk_path)):
+        with span("ezkl.verify"):
+            verify_ok = ezkl.verify(str(proof_path), str(settings_path), str(vk_path))
+        if not verify_ok:
             raise RuntimeError("verify failed")
         
         console.print("[green]✓ All EZKL steps completed successfully![/green]")
@@ -371,7 +388,8 @@ async def _verify_proof_with_ezkl(proof_files: dict, zkp_dir: Path) -> bool:
         
         console.print("[cyan]Running EZKL verification...[/cyan]")
         # Verify
-        verified = ezkl.verify(str(pf_p), str(st_p), str(vk_p))
+        with span("ezkl.verify"):
+            verified = ezkl.verify(str(pf_p), str(st_p), str(vk_p))
         
         console.print("[dim]Cleaning up verification files...[/dim]")
         # Cleanup
@@ -31,6 +31,12 @@ class FlairConfig(BaseModel):
     auth_url: Optional[str] = "http://localhost:5173"
     # Session timeout in hours (default 7 days)
     session_timeout_hours: Optional[int] = 168
+    # Byte budget for the branch artifact cache in MB (least recently used branches are evicted)
+    branch_cache_max_mb: Optional[int] = 10240
+    # Entry budget for the diff result cache in .flair/cache/diff (least recently used entries are evicted)
+    diff_cache_max_entries: Optional[int] = 256
+    # Wallet the merger service commits with (its FLAIR_WALLET); merge commits hold full params
+    merger_address: Optional[str] = None
 
 CONFIG_PATH = Path.home() / ".flair" / "config.yaml"
 CONFIG_DIR = CONFIG_PATH.parent
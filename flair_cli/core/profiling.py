@@ -0,0 +1,203 @@
+"""
+Lightweight span profiler for the Flair CLI.
+
+Hot paths wrap their work in `span("name")` (or decorate with `@profiled("name")`).
+Spans are only recorded after `enable()` is called by the global `flair --profile`
+flag; while disabled, `span()` returns a shared no-op context manager, so the cost
+is one global lookup and a function call.
+
+Recorded spans can be printed as a per-phase summary table or exported as a Chrome
+trace (open in chrome://tracing or https://ui.perfetto.dev).
+"""
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+_enabled = False
+_started_ns = 0
+_events: list[dict] = []
+_events_lock = threading.Lock()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start_ns")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {
+            "name": self.name,
+            "start": self.start_ns,
+            "dur": end_ns - self.start_ns,
+            "tid": threading.get_ident(),
+            "args": self.args,
+        }
+        with _events_lock:
+            _events.append(event)
+        return False
+
+    def set(self, **args: Any) -> None:
+        """Attach extra attributes (e.g. byte counts) to the span."""
+        self.args.update(args)
+
+
+def enable() -> None:
+    """Start recording spans for this process."""
+    global _enabled, _started_ns
+    _enabled = True
+    _started_ns = time.perf_counter_ns()
+    with _events_lock:
+        _events.clear()
+
+
+def disable() -> None:
+    """Stop recording spans; already recorded spans are kept."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **args: Any):
+    """Context manager timing one phase. No-op unless profiling is enabled."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name, args)
+
+
+def profiled(name: str) -> Callable:
+    """Decorator form of `span()`."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def events() -> list[dict]:
+    """Recorded spans, in completion order."""
+    with _events_lock:
+        return list(_events)
+
+
+def summarize() -> list[dict]:
+    """Aggregate spans by name: count, total/mean/max milliseconds, share of wall time."""
+    wall_ns = max(time.perf_counter_ns() - _started_ns, 1)
+    totals: dict[str, dict] = {}
+    for event in events():
+        row = totals.setdefault(event["name"], {"name": event["name"], "count": 0, "totalMs": 0.0, "maxMs": 0.0})
+        dur_ms = event["dur"] / 1e6
+        row["count"] += 1
+        row["totalMs"] += dur_ms
+        row["maxMs"] = max(row["maxMs"], dur_ms)
+
+    rows = sorted(totals.values(), key=lambda r: r["totalMs"], reverse=True)
+    for row in rows:
+        row["meanMs"] = row["totalMs"] / row["count"]
+        row["wallPct"] = 100.0 * row["totalMs"] * 1e6 / wall_ns
+    return rows
+
+
+def chrome_trace() -> dict:
+    """Recorded spans in Chrome trace event format (complete events, microseconds)."""
+    pid = os.getpid()
+    trace_events = [
+        {
+            "name": event["name"],
+            "cat": event["name"].split(".", 1)[0],
+            "ph": "X",
+            "ts": (event["start"] - _started_ns) / 1000,
+            "dur": event["dur"] / 1000,
+            "pid": pid,
+            "tid": event["tid"],
+            "args": event["args"],
+        }
+        for event in events()
+    ]
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: Path) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+
+
+def print_summary(console=None) -> None:
+    """Print the per-phase summary table."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = console or Console(stderr=True)
+    rows = summarize()
+    wall_ms = (time.perf_counter_ns() - _started_ns) / 1e6
+
+    table = Table(title=f"Profile ({wall_ms:.1f} ms wall)")
+    table.add_column("Phase")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("Max ms", justify="right")
+    table.add_column("% wall", justify="right")
+    for row in rows:
+        table.add_row(
+            row["name"],
+            str(row["count"]),
+            f"{row['totalMs']:.2f}",
+            f"{row['meanMs']:.2f}",
+            f"{row['maxMs']:.2f}",
+            f"{row['wallPct']:.1f}",
+        )
+    if not rows:
+        table.add_row("(no instrumented phases ran)", "", "", "", "", "")
+    console.print(table)
+
+
+def report(trace_path: Optional[Path] = None) -> None:
+    """Print the summary and write the Chrome trace if a path was given."""
+    print_summary()
+    if trace_path:
+        write_chrome_trace(trace_path)
+        from rich.console import Console
+
+        Console(stderr=True).print(f"[dim]Chrome trace written to {trace_path}[/dim]")
@@ -1,63 +1,127 @@
 """
 Entry point for the Flair CLI.
 This creates a Typer app and mounts subcommand groups from the `cli` package.
+
+Subcommand modules are imported only when their command is invoked, so `flair --help`
+and light commands do not pay for numpy, httpx or the API layer.
 """
-from typing import Optional
+import importlib
+from pathlib import Path
+from typing import List, Optional
 import typer
 from rich.console import Console
+from typer.core import TyperCommand, TyperGroup
 
-from flair_cli.cli import auth, config, init, clone, basemodel, branch, add, zkp, push, params, new, commit, revert, reset, metrics, status as status_cmd, log as log_cmd, diff as diff_cmd
+# Subcommand groups: name -> (module, help). Modules are imported on first use.
+LAZY_SUBCOMMANDS = {
+    "auth": ("flair_cli.cli.auth", "Authentication commands (SIWS)"),
+    "config": ("flair_cli.cli.config", "Configuration management"),
+    "init": ("flair_cli.cli.init", "Initialize repository in current directory"),
+    "clone": ("flair_cli.cli.clone", "Clone a remote repository"),
+    "basemodel": ("flair_cli.cli.basemodel", "Manage base models"),
+    "branch": ("flair_cli.cli.branch", "Branch management"),
+    "new": ("flair_cli.cli.new", "Create sample model files"),
+    "add": ("flair_cli.cli.add", "Create a new local commit"),
+    "params": ("flair_cli.cli.params", "Extract and create model parameters"),
+    "metrics": ("flair_cli.cli.metrics", "Stage and manage commit metrics"),
+    "zkp": ("flair_cli.cli.zkp", "Zero-Knowledge Proof operations"),
+    "commit": ("flair_cli.cli.commit", "Finalize commit with message and determine type"),
+    "push": ("flair_cli.cli.push", "Push commits to remote repository"),
+    "revert": ("flair_cli.cli.revert", "Revert to previous commit"),
+    "reset": ("flair_cli.cli.reset", "Reset HEAD to previous local commit"),
+}
 
-app = typer.Typer(help="Flair — model repository ledger CLI")
-console = Console()
 
-# Mount subcommands
-app.add_typer(auth.app, name="auth", help="Authentication commands (SIWS)")
-app.add_typer(config.app, name="config", help="Configuration management")
-app.add_typer(init.app, name="init", help="Initialize repository in current directory")
-app.add_typer(clone.app, name="clone", help="Clone a remote repository")
-app.add_typer(basemodel.app, name="basemodel", help="Manage base models")
-app.add_typer(branch.app, name="branch", help="Branch management")
-app.add_typer(new.app, name="new", help="Create sample model files")
-app.add_typer(add.app, name="add", help="Create a new local commit")
-app.add_typer(params.app, name="params", help="Extract and create model parameters")
-app.add_typer(metrics.app, name="metrics", help="Stage and manage commit metrics")
-app.add_typer(zkp.app, name="zkp", help="Zero-Knowledge Proof operations")
-app.add_typer(commit.app, name="commit", help="Finalize commit with message and determine type")
-app.add_typer(push.app, name="push", help="Push commits to remote repository")
-app.add_typer(revert.app, name="revert", help="Revert to previous commit")
-app.add_typer(reset.app, name="reset", help="Reset HEAD to previous local commit")
+def _load_subcommand(name: str):
+    """Import a subcommand module and build its click group, as add_typer would."""
+    module_name, help_text = LAZY_SUBCOMMANDS[name]
+    module = importlib.import_module(module_name)
+    wrapper = typer.Typer()
+    wrapper.add_typer(module.app, name=name, help=help_text)
+    return typer.main.get_command(wrapper).commands[name]
+
+
+class LazyGroup(TyperGroup):
+    """Root group that resolves registered subcommand groups on demand.
+
+    Help listings use a placeholder carrying the registered help text; the real
+    module is only imported when the command is resolved for execution or completion.
+    """
+
+    def list_commands(self, ctx):
+        return list(LAZY_SUBCOMMANDS) + [name for name in super().list_commands(ctx) if name not in LAZY_SUBCOMMANDS]
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in LAZY_SUBCOMMANDS:
+            return TyperCommand(name=cmd_name, help=LAZY_SUBCOMMANDS[cmd_name][1])
+        return command
+
+    def resolve_command(self, ctx, args):
+        if args and args[0] in LAZY_SUBCOMMANDS and args[0] not in self.commands:
+            self.add_command(_load_subcommand(args[0]), args[0])
+        return super().resolve_command(ctx, args)
+
+
+app = typer.Typer(cls=LazyGroup, help="Flair — model repository ledger CLI")
+console = Console()
 
 # Add checkout as top-level command for git-like experience
 @app.command()
-def checkout(branch_name: str = typer.Argument(..., help="Branch name to switch to")):
+def checkout(
+    branch_name: str = typer.Argument(..., help="Branch name to switch to"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Force download instead of using cache"),
+    verify: bool = typer.Option(False, "--verify", help="Rehash cached artifacts before restoring them"),
+):
     """Switch to a different branch (alias for 'branch checkout')."""
     from flair_cli.cli.branch import checkout as branch_checkout
-    branch_checkout(branch_name)
+    branch_checkout(branch_name, no_cache=no_cache, verify=verify)
 
 
 @app.command()
 def status():
     """Show branch, head, local commit completeness, and unpushed commit count."""
+    from flair_cli.cli import status as status_cmd
     status_cmd.status()
 
 
+@app.command()
+def pull(
+    jobs: int = typer.Option(8, "--jobs", "-j", help="Number of blobs to download in parallel"),
+):
+    """Fetch new remote commits and apply their deltas to the HEAD params."""
+    from flair_cli.cli import pull as pull_cmd
+    pull_cmd.pull(jobs=jobs)
+
+
 @app.command()
 def log(
     graph: bool = typer.Option(False, "--graph", help="Show a simple graph-style prefix"),
     branch: str = typer.Option(None, "--branch", help="Show history for a specific branch"),
     limit: int = typer.Option(50, "--limit", help="Maximum number of commits to display"),
+    stat: bool = typer.Option(False, "--stat", help="Show norms and change vs parent from the recorded commit stats"),
 ):
     """Show commit history, newest first."""
-    log_cmd.log(graph=graph, branch=branch, limit=limit)
+    from flair_cli.cli import log as log_cmd
+    log_cmd.log(graph=graph, branch=branch, limit=limit, stat=stat)
 
 
 @app.command()
 def diff(
     commit_a: str = typer.Argument(..., help="First commit hash to compare"),
     commit_b: str = typer.Argument(..., help="Second commit hash to compare"),
+    more_commits: List[str] = typer.Argument(None, help="Further commits to compare (with --matrix)"),
     detailed: bool = typer.Option(False, "--detailed", help="Show all layers (not just top 5)"),
     json: bool = typer.Option(False, "--json", help="Output machine-readable JSON"),
+    top: int = typer.Option(None, "--top", help="Only report the N layers with the largest change (--detailed/--json)"),
+    ndjson: bool = typer.Option(False, "--ndjson", help="Stream one JSON record per layer, then a summary record"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Worker threads for the diff kernel (default: CPU count)"),
+    matrix: bool = typer.Option(False, "--matrix", help="Pairwise cosine similarity and L2 distance across all given commits"),
+    base: str = typer.Option(None, "--base", help="With --matrix: subtract this commit's params from every commit first"),
+    csv_output: bool = typer.Option(False, "--csv", help="With --matrix: output CSV"),
+    fast: bool = typer.Option(False, "--fast", help="Estimate from the stats recorded at commit time, without loading params"),
+    approx: float = typer.Option(None, "--approx", help="Estimate from this fraction of each tensor (e.g. 0.01), with confidence intervals"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Recompute instead of reusing a cached result"),
 ):
     """Compare two model commits and produce a semantic summary of changes.
     
@@ -69,14 +133,44 @@ def diff(
         flair diff 9f2c... b71e...
         flair diff <commitA> <commitB> --detailed
         flair diff <commitA> <commitB> --json
+        flair diff <commitA> <commitB> --ndjson > diff.ndjson
+        flair diff --matrix c1 c2 c3 c4 --base <baseCommit> --csv
+        flair diff <commitA> <commitB> --fast
+        flair diff <commitA> <commitB> --approx 0.01
     """
-    diff_cmd.diff(commit_a=commit_a, commit_b=commit_b, detailed=detailed, json_output=json)
+    from flair_cli.cli import diff as diff_cmd
+    diff_cmd.diff(
+        commit_a=commit_a,
+        commit_b=commit_b,
+        more_commits=more_commits,
+        detailed=detailed,
+        json_output=json,
+        top=top,
+        ndjson=ndjson,
+        jobs=jobs,
+        matrix=matrix,
+        base=base,
+        csv_output=csv_output,
+        fast=fast,
+        approx=approx,
+        no_cache=no_cache,
+    )
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context, json: Optional[bool] = typer.Option(False, "--json", help="Output machine-friendly JSON")):
+def main(
+    ctx: typer.Context,
+    json: Optional[bool] = typer.Option(False, "--json", help="Output machine-friendly JSON"),
+    profile: bool = typer.Option(False, "--profile", help="Print per-phase timings when the command finishes"),
+    profile_trace: Optional[Path] = typer.Option(None, "--profile-trace", help="Also write a Chrome trace JSON to this path (implies --profile)"),
+):
     """Flair CLI — record-only model repository and commit ledger for ML model evolution.
     Note: Flair never performs training or stores private keys.
     """
+    if profile or profile_trace:
+        from flair_cli.core import profiling
+
+        profiling.enable()
+        ctx.call_on_close(lambda: profiling.report(profile_trace))
     if ctx.invoked_subcommand is None:
         console.print("Use 'flair --help' to see available commands.")
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec, build_synthetic_repo
+from flair_cli.cli.diff import compute_approx_diff, compute_overall_stats, load_commit_params
+from flair_cli.cli.utils.approx_diff import SampledTensor, summarize_samples
+from flair_cli.cli.utils.param_io import _open_numpy_params
+from flair_cli.cli.utils.reconstruction import _open_param_view
+
+
+class ApproxDiffTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._old_cwd = os.getcwd()
+        os.chdir(self._temp_dir.name)
+        spec = SyntheticRepoSpec(model_mb=2, tensor_count=4, chain_length=3, checkpoint_every=3, delta_scale=0.05)
+        self.hashes = build_synthetic_repo(Path(self._temp_dir.name), spec)
+
+    def tearDown(self):
+        os.chdir(self._old_cwd)
+        self._temp_dir.cleanup()
+
+    def _exact(self) -> tuple[dict, float]:
+        params_a, _ = load_commit_params(self.hashes[0])
+        params_b, _ = load_commit_params(self.hashes[2])
+        delta_norm = np.sqrt(sum(np.sum((params_b[k].astype(np.float64) - params_a[k]) ** 2) for k in params_a))
+        return compute_overall_stats(params_a, params_b, "h", "h"), float(delta_norm)
+
+    def test_view_reads_memory_mapped_chain(self):
+        view = _open_param_view(self.hashes[2], "numpy")
+        params, _ = load_commit_params(self.hashes[2])
+        index = np.array([0, 7, 4095])
+
+        for key in params:
+            np.testing.assert_allclose(view.gather(key, index), params[key].reshape(-1)[index], rtol=1e-6)
+        self.assertIsInstance(view._sources[0][key], np.memmap)
+
+    def test_open_numpy_params_keeps_scalars_and_empty_arrays(self):
+        np.savez("mixed.npz", scalar=np.array(3.5), empty=np.zeros((0, 3)), weights=np.ones((2, 2)))
+        params = _open_numpy_params(Path("mixed.npz"))
+
+        self.assertEqual(float(params["scalar"]), 3.5)
+        self.assertEqual(params["empty"].shape, (0, 3))
+        self.assertIsInstance(params["weights"], np.memmap)
+
+    def test_full_sample_is_exact(self):
+        estimate = compute_approx_diff(self.hashes[0], self.hashes[2], 1.0)
+        overall, delta_norm = self._exact()
+
+        self.assertEqual(estimate["samples"], overall["total_parameters"])
+        self.assertAlmostEqual(estimate["delta_norm"], delta_norm, places=4)
+        self.assertAlmostEqual(estimate["cosine_similarity"], overall["cosine_similarity"], places=6)
+        self.assertAlmostEqual(estimate["delta_norm_ci"][0], estimate["delta_norm_ci"][1])
+
+    def test_intervals_cover_exact_values(self):
+        estimate = compute_approx_diff(self.hashes[0], self.hashes[2], 0.02)
+        overall, delta_norm = self._exact()
+
+        self.assertLess(estimate["samples"], overall["total_parameters"] // 10)
+        for key, exact in [
+            ("delta_norm", delta_norm),
+            ("cosine_similarity", overall["cosine_similarity"]),
+            ("percent_changed", overall["percent_changed"]),
+        ]:
+            low, high = estimate[f"{key}_ci"]
+            self.assertLessEqual(low, exact + 1e-9, key)
+            self.assertGreaterEqual(high, exact - 1e-9, key)
+
+    def test_zero_norm_cosine_matches_exact_diff(self):
+        zero = SampledTensor("w", (8,), 8, 8, np.zeros(5), np.zeros((5, 5)), 0.0)
+        params = {"w": np.zeros(8, dtype=np.float32)}
+
+        estimate = summarize_samples([zero], 1.0)
+
+        self.assertEqual(estimate["cosine_similarity"], compute_overall_stats(params, params, "h", "h")["cosine_similarity"])
+        self.assertEqual(estimate["cosine_similarity_ci"], [1.0, 1.0])
+
+    def test_fraction_out_of_range(self):
+        with self.assertRaises(ValueError):
+            compute_approx_diff(self.hashes[0], self.hashes[2], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from flair_cli.benchmarks import harness
+from flair_cli.benchmarks.storage import run_storage_benchmarks
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec, build_synthetic_repo
+
+
+class SyntheticRepoTest(unittest.TestCase):
+    def test_checkpoint_spacing(self):
+        spec = SyntheticRepoSpec(model_mb=0.01, tensor_count=2, chain_length=5, checkpoint_every=2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hashes = build_synthetic_repo(Path(temp_dir), spec)
+            commits_dir = Path(temp_dir) / ".flair" / ".local_commits"
+            types = [json.loads((commits_dir / h / "commit.json").read_text())["commitType"] for h in hashes]
+
+        self.assertEqual(types, ["CHECKPOINT", "DELTA", "CHECKPOINT", "DELTA", "CHECKPOINT"])
+
+
+class StorageBenchmarkTest(unittest.TestCase):
+    def test_run_records_every_case(self):
+        spec = SyntheticRepoSpec(model_mb=0.05, tensor_count=4, chain_length=3, checkpoint_every=2)
+
+        results = run_storage_benchmarks(spec, ["numpy"], repeats=1)
+
+        self.assertEqual(
+            set(results["cases"]),
+            {
+                "reconstruct.numpy",
+                "delta.compute.numpy",
+                "param_io.load.numpy",
+                "param_io.save.numpy",
+                "hash.file.numpy",
+                "hash.push_param.numpy",
+                "hash.architecture.numpy",
+            },
+        )
+        self.assertGreater(results["cases"]["reconstruct.numpy"]["throughputMBs"], 0)
+
+    def test_baseline_comparison_flags_slowdowns(self):
+        baseline = {"cases": {"hash.file.numpy": {"medianMs": 10.0, "peakTracedMB": 2.0}}}
+        current = {"cases": {"hash.file.numpy": {"medianMs": 20.0, "peakTracedMB": 2.1}, "new.case": {"medianMs": 5.0}}}
+
+        regressions = harness.compare_to_baseline(current, baseline, tolerance=0.25)
+
+        self.assertEqual([(r["case"], r["metric"]) for r in regressions], [("hash.file.numpy", "medianMs")])
+
+
+if __name__ == "__main__":
+    unittest.main()
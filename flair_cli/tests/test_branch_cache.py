@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from flair_cli.cli.utils import branch_cache
+
+
+class BranchCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        self.cache_dir = self.root / ".cache"
+        self.cache_dir.mkdir()
+        self.work_dir = self.root / "work"
+        self.work_dir.mkdir()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _write(self, name: str, payload: bytes) -> Path:
+        path = self.work_dir / name
+        if path.exists():
+            path.unlink()
+        path.write_bytes(payload)
+        return path
+
+    def _restore(self, branch_name: str, verify: bool = False) -> bool:
+        for path in self.work_dir.iterdir():
+            path.unlink()
+        return branch_cache._restore_branch(
+            self.cache_dir,
+            branch_name,
+            lambda name: self.work_dir / name,
+            verify=verify,
+        )
+
+    def test_restore_relinks_objects_without_copying(self):
+        params = self._write("params.npz", b"a" * 1024)
+        branch_cache._save_branch(self.cache_dir, "main", [params])
+
+        self.assertTrue(self._restore("main"))
+
+        restored = self.work_dir / "params.npz"
+        digest = branch_cache._hash_file(restored)
+        object_path = self.cache_dir / branch_cache.OBJECTS_DIR / digest
+        self.assertEqual(restored.read_bytes(), b"a" * 1024)
+        self.assertEqual(os.stat(restored).st_ino, os.stat(object_path).st_ino)
+
+    def test_identical_artifacts_are_stored_once(self):
+        params = self._write("params.npz", b"shared")
+        branch_cache._save_branch(self.cache_dir, "main", [params])
+        branch_cache._save_branch(self.cache_dir, "feature", [params])
+
+        objects = list((self.cache_dir / branch_cache.OBJECTS_DIR).iterdir())
+        self.assertEqual(len(objects), 1)
+
+    def test_corrupted_object_fails_integrity_check(self):
+        params = self._write("params.npz", b"original")
+        branch_cache._save_branch(self.cache_dir, "main", [params])
+        digest = branch_cache._hash_file(params)
+
+        # Simulate an in-place write through the shared inode.
+        time.sleep(0.01)
+        with open(self.cache_dir / branch_cache.OBJECTS_DIR / digest, "wb") as f:
+            f.write(b"tampered")
+
+        self.assertFalse(self._restore("main"))
+        self.assertNotIn("main", branch_cache._load_index(self.cache_dir)["branches"])
+
+    def test_eviction_is_lru_under_byte_budget(self):
+        for name in ("old", "middle", "new"):
+            params = self._write("params.npz", name.encode() * 100)
+            branch_cache._save_branch(self.cache_dir, name, [params])
+            time.sleep(0.01)
+
+        self.assertTrue(self._restore("old"))
+
+        evicted = branch_cache._evict(self.cache_dir, max_bytes=700, keep=["new"])
+
+        branches = branch_cache._load_index(self.cache_dir)["branches"]
+        self.assertEqual(evicted, ["middle"])
+        self.assertEqual(set(branches), {"old", "new"})
+        self.assertEqual(len(list((self.cache_dir / branch_cache.OBJECTS_DIR).iterdir())), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
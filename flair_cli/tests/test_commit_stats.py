@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec, build_synthetic_repo
+from flair_cli.cli.diff import compute_fast_diff, compute_overall_stats, load_commit_params
+from flair_cli.cli.utils.commit_stats import SKETCH_DIM, _write_commit_stats, compute_commit_stats
+from flair_cli.cli.utils.local_commits import _get_commit_by_hash
+
+
+class CommitStatsTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.params = {
+            "w": rng.standard_normal((70, 300)).astype(np.float32),
+            "b": np.zeros(9, dtype=np.float32),
+        }
+
+    def test_tensor_statistics(self):
+        stats = compute_commit_stats(self.params)
+        w = next(t for t in stats["tensors"] if t["name"] == "w")
+        values = self.params["w"].astype(np.float64)
+
+        self.assertAlmostEqual(w["norm"], float(np.linalg.norm(values)), places=6)
+        self.assertAlmostEqual(w["std"], float(values.std()), places=9)
+        self.assertEqual(w["min"], float(values.min()))
+        self.assertEqual(w["nonzero"], values.size)
+        self.assertIsNone(stats["deltaSketch"])
+
+    def test_sketch_is_linear(self):
+        other = {key: value * 0.5 + 1 for key, value in self.params.items()}
+        delta = {key: other[key] - self.params[key] for key in self.params}
+        sketch_a = np.asarray(compute_commit_stats(self.params)["paramsSketch"])
+        stats_b = compute_commit_stats(other, delta, delta_base="a")
+
+        self.assertEqual(len(stats_b["paramsSketch"]), SKETCH_DIM)
+        np.testing.assert_allclose(np.asarray(stats_b["paramsSketch"]) - sketch_a, stats_b["deltaSketch"], atol=1e-6)
+
+
+class FastDiffTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._old_cwd = os.getcwd()
+        os.chdir(self._temp_dir.name)
+        spec = SyntheticRepoSpec(model_mb=0.2, tensor_count=4, chain_length=4, checkpoint_every=4, delta_scale=0.3)
+        self.hashes = build_synthetic_repo(Path(self._temp_dir.name), spec)
+
+        # What `flair commit` records: the params and the delta against the parent
+        previous, previous_hash = None, None
+        for commit_hash in self.hashes:
+            params, _ = load_commit_params(commit_hash)
+            delta = {key: params[key] - previous[key] for key in params} if previous else None
+            _write_commit_stats(_get_commit_by_hash(commit_hash)[1], compute_commit_stats(params, delta, previous_hash))
+            previous, previous_hash = params, commit_hash
+
+    def tearDown(self):
+        os.chdir(self._old_cwd)
+        self._temp_dir.cleanup()
+
+    def _full(self, commit_a: str, commit_b: str) -> tuple[dict, float]:
+        params_a, _ = load_commit_params(commit_a)
+        params_b, _ = load_commit_params(commit_b)
+        delta_norm = np.sqrt(sum(np.sum((params_b[k].astype(np.float64) - params_a[k]) ** 2) for k in params_a))
+        return compute_overall_stats(params_a, params_b, "h", "h"), float(delta_norm)
+
+    def test_adjacent_commits_are_exact(self):
+        estimate = compute_fast_diff(self.hashes[1], self.hashes[2])
+        overall, delta_norm = self._full(self.hashes[1], self.hashes[2])
+
+        self.assertTrue(estimate["exact"])
+        self.assertAlmostEqual(estimate["delta_norm"], delta_norm, places=4)
+        self.assertAlmostEqual(estimate["cosine_similarity"], overall["cosine_similarity"], places=5)
+
+    def test_distant_commits_are_estimated_from_sketches(self):
+        estimate = compute_fast_diff(self.hashes[3], self.hashes[0])
+        overall, delta_norm = self._full(self.hashes[3], self.hashes[0])
+
+        self.assertFalse(estimate["exact"])
+        self.assertLess(abs(estimate["delta_norm"] - delta_norm), 4 * estimate["delta_norm_stderr"])
+        self.assertAlmostEqual(estimate["cosine_similarity"], overall["cosine_similarity"], delta=0.05)
+
+    def test_missing_stats_is_an_error(self):
+        os.remove(_get_commit_by_hash(self.hashes[0])[1] / "stats.json")
+        with self.assertRaises(ValueError):
+            compute_fast_diff(self.hashes[0], self.hashes[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
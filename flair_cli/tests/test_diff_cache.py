@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from typer.testing import CliRunner
+
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec, build_synthetic_repo
+from flair_cli.cli import diff as diff_cmd
+from flair_cli.cli.utils import diff_cache
+from flair_cli.cli.utils.local_commits import _get_commit_by_hash
+
+
+class DiffCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._old_cwd = os.getcwd()
+        os.chdir(self._temp_dir.name)
+        spec = SyntheticRepoSpec(model_mb=0.01, tensor_count=3, chain_length=3, checkpoint_every=2)
+        self.hashes = build_synthetic_repo(Path(self._temp_dir.name), spec)
+        self.cache_dir = Path(self._temp_dir.name) / ".flair" / diff_cache.DIFF_CACHE_DIR
+
+    def tearDown(self):
+        os.chdir(self._old_cwd)
+        self._temp_dir.cleanup()
+
+    def _set_delta_hash(self, commit_hash: str, value: str) -> None:
+        commit_file = _get_commit_by_hash(commit_hash)[1] / "commit.json"
+        commit_data = json.loads(commit_file.read_text())
+        commit_data["deltaParams"]["hash"] = value
+        commit_file.write_text(json.dumps(commit_data))
+
+    def test_hit_requires_same_options(self):
+        a, b = self.hashes[0], self.hashes[1]
+        diff_cache._store_diff(self.cache_dir, a, b, {"top": 5}, {"overall": {"x": 1}})
+
+        self.assertEqual(diff_cache._load_diff(self.cache_dir, a, b, {"top": 5}), {"overall": {"x": 1}})
+        self.assertIsNone(diff_cache._load_diff(self.cache_dir, a, b, {"top": None}))
+        self.assertIsNone(diff_cache._load_diff(self.cache_dir, b, a, {"top": 5}))
+
+    def test_params_hash_change_invalidates_entry(self):
+        # The chain is CHECKPOINT, DELTA, CHECKPOINT: hashes[1] depends on its own delta
+        a, b = self.hashes[0], self.hashes[1]
+        diff_cache._store_diff(self.cache_dir, a, b, {}, {"overall": {}})
+        self._set_delta_hash(b, "changed")
+
+        self.assertIsNone(diff_cache._load_diff(self.cache_dir, a, b, {}))
+        self.assertEqual(list(self.cache_dir.glob("*.json")), [])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        pairs = [(self.hashes[0], self.hashes[1]), (self.hashes[1], self.hashes[2]), (self.hashes[0], self.hashes[2])]
+        for a, b in pairs[:2]:
+            diff_cache._store_diff(self.cache_dir, a, b, {}, {"overall": {}})
+            time.sleep(0.01)
+        diff_cache._load_diff(self.cache_dir, *pairs[0], {})
+        time.sleep(0.01)
+        diff_cache._store_diff(self.cache_dir, *pairs[2], {}, {"overall": {}}, max_entries=2)
+
+        self.assertIsNotNone(diff_cache._load_diff(self.cache_dir, *pairs[0], {}))
+        self.assertIsNone(diff_cache._load_diff(self.cache_dir, *pairs[1], {}))
+        self.assertIsNotNone(diff_cache._load_diff(self.cache_dir, *pairs[2], {}))
+
+    def test_repeat_diff_skips_reconstruction(self):
+        runner = CliRunner()
+        args = [self.hashes[0], self.hashes[1], "--json"]
+        with patch.object(diff_cmd, "_diff_cache_max_entries", return_value=256):
+            first = runner.invoke(diff_cmd.app, args)
+            with patch.object(diff_cmd, "load_chain_params", side_effect=AssertionError("reconstructed")):
+                second = runner.invoke(diff_cmd.app, args)
+
+        self.assertEqual(first.exit_code, 0, first.output)
+        self.assertEqual(second.exit_code, 0, second.output)
+        self.assertEqual(json.loads(second.output), json.loads(first.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+import numpy as np
+
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec, build_synthetic_repo
+from flair_cli.cli.diff import (
+    compute_layer_stats,
+    compute_overall_stats,
+    compute_tensor_diffs,
+    flatten_params,
+    load_chain_params,
+    load_commit_params,
+    stream_ndjson_output,
+)
+from flair_cli.cli.utils import diff_kernel
+from flair_cli.cli.utils.diff_kernel import ParamSpool, _as_array, iter_tensor_diffs, similarity_from_gram
+
+
+def _params(seed: int) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    return {
+        "a.weight": rng.standard_normal((13, 7)).astype(np.float32),
+        "b.bias": rng.standard_normal(5).astype(np.float32),
+        "c.weight": rng.standard_normal((4, 4, 3)).astype(np.float32),
+    }
+
+
+class DiffKernelTest(unittest.TestCase):
+    def setUp(self):
+        self.params_a = _params(0)
+        self.params_b = {key: value.copy() for key, value in self.params_a.items()}
+        self.params_b["a.weight"][2:5] += 0.5
+        self.params_b["c.weight"] *= 1.1
+
+    def test_chunked_pass_matches_direct_computation(self):
+        # A chunk size that does not divide any tensor exercises the chunk boundaries
+        diffs = {d.name: d for d in iter_tensor_diffs(self.params_a, self.params_b, chunk_elements=6)}
+
+        for key, value_a in self.params_a.items():
+            delta = self.params_b[key].astype(np.float64) - value_a.astype(np.float64)
+            self.assertAlmostEqual(diffs[key].delta_norm, float(np.linalg.norm(delta)), places=9)
+            self.assertEqual(diffs[key].nonzero, int(np.count_nonzero(delta)))
+            self.assertAlmostEqual(diffs[key].max_abs, float(np.abs(delta).max()), places=9)
+
+    def test_results_identical_at_any_job_count(self):
+        # Small blocks split every tensor so workers merge partial results
+        serial = list(iter_tensor_diffs(self.params_a, self.params_b, chunk_elements=5, block_elements=14))
+        for jobs in (2, 3, 8):
+            parallel = list(
+                iter_tensor_diffs(self.params_a, self.params_b, chunk_elements=5, block_elements=14, jobs=jobs)
+            )
+            self.assertEqual(parallel, serial)
+        self.assertEqual([d.size for d in serial], [91, 5, 48])
+
+    def test_overall_stats_match_flattened_vectors(self):
+        stats = compute_overall_stats(self.params_a, self.params_b, "h", "h")
+
+        vec_a = np.concatenate([self.params_a[k].ravel() for k in sorted(self.params_a)]).astype(np.float64)
+        vec_b = np.concatenate([self.params_b[k].ravel() for k in sorted(self.params_b)]).astype(np.float64)
+        expected_cosine = vec_a @ vec_b / (np.linalg.norm(vec_a) * np.linalg.norm(vec_b))
+        self.assertAlmostEqual(stats["cosine_similarity"], float(expected_cosine), places=9)
+        self.assertEqual(stats["total_parameters"], vec_a.size)
+        self.assertEqual(stats["changed_parameters"], int(np.count_nonzero(vec_b - vec_a)))
+
+    def test_incompatible_architecture_short_circuits(self):
+        stats = compute_overall_stats(self.params_a, self.params_b, "h1", "h2")
+
+        self.assertFalse(stats["architecture_compatible"])
+
+    def test_top_k_matches_full_sort(self):
+        full = compute_layer_stats(self.params_a, self.params_b)
+        top = compute_layer_stats(self.params_a, self.params_b, top_k=2)
+
+        self.assertEqual(top, full[:2])
+        self.assertEqual([layer["name"] for layer in full][-1], "b.bias")
+
+    def test_ndjson_streams_layers_then_summary(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            stream_ndjson_output("a" * 8, "b" * 8, self.params_a, self.params_b, {}, {})
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["type"] for r in records], ["layer", "layer", "layer", "summary"])
+        self.assertEqual([r["name"] for r in records[:3]], sorted(self.params_a))
+        self.assertEqual(
+            records[-1]["overall"], compute_overall_stats(self.params_a, self.params_b, "h", "h")
+        )
+
+
+@unittest.skipUnless(importlib.util.find_spec("torch"), "torch not installed")
+class TorchBridgeTest(unittest.TestCase):
+    def test_float32_tensors_are_shared_not_copied(self):
+        import torch
+
+        tensor = torch.arange(12, dtype=torch.float32).reshape(3, 4).requires_grad_()
+        flat = _as_array(tensor)
+
+        self.assertEqual(flat.shape, (12,))
+        self.assertEqual(flat.__array_interface__["data"][0], tensor.data_ptr())
+
+    def test_half_precision_matches_float64_reference(self):
+        import torch
+
+        for dtype in (torch.float16, torch.bfloat16):
+            params_a = {key: torch.from_numpy(value).to(dtype) for key, value in _params(0).items()}
+            params_b = {key: (value * 1.5).to(dtype) for key, value in params_a.items()}
+            diffs = {d.name: d for d in iter_tensor_diffs(params_a, params_b, chunk_elements=7)}
+
+            for key in params_a:
+                reference = params_b[key].double() - params_a[key].double()
+                self.assertAlmostEqual(diffs[key].delta_norm, float(reference.norm()), places=9)
+                self.assertEqual(diffs[key].nonzero, int(torch.count_nonzero(reference)))
+            np.testing.assert_array_equal(
+                flatten_params(params_a), np.concatenate([v.float().numpy().ravel() for v in params_a.values()])
+            )
+
+
+class SimilarityMatrixTest(unittest.TestCase):
+    def test_blockwise_gram_matches_dense(self):
+        models = [
+            {"w": np.random.default_rng(i).standard_normal((40, 50)).astype(np.float32), "b": np.full(7, i, np.float32)}
+            for i in range(4)
+        ]
+        base = models[0]
+        dense = np.stack([np.concatenate([m[k].ravel() - base[k].ravel() for k in sorted(m)]) for m in models]).astype(np.float64)
+
+        with tempfile.TemporaryDirectory() as temp_dir, unittest.mock.patch.object(diff_kernel, "GRAM_BLOCK_BYTES", 8):
+            spool = ParamSpool(Path(temp_dir) / "spool", ParamSpool.layout_of(models[0]), len(models))
+            for row, model in enumerate(models):
+                spool.write_row(row, model, base=base, chunk_elements=300)
+            gram = spool.gram()
+            del spool
+
+        np.testing.assert_allclose(gram, dense @ dense.T, rtol=1e-6)
+        cosine, distance = similarity_from_gram(gram)
+        self.assertAlmostEqual(distance[1, 2], float(np.linalg.norm(dense[1] - dense[2])), places=3)
+        self.assertAlmostEqual(
+            cosine[1, 3], float(dense[1] @ dense[3] / np.linalg.norm(dense[1]) / np.linalg.norm(dense[3])), places=6
+        )
+
+    def test_layout_mismatch_is_rejected(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spool = ParamSpool(Path(temp_dir) / "spool", [("w", (2, 2))], 1)
+            with self.assertRaises(ValueError):
+                spool.write_row(0, {"w": np.zeros((4,), np.float32)})
+            del spool
+
+
+class DeltaChainDiffTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._old_cwd = os.getcwd()
+        os.chdir(self._temp_dir.name)
+        spec = SyntheticRepoSpec(model_mb=0.01, tensor_count=3, chain_length=6, checkpoint_every=4, delta_scale=0.1)
+        self.hashes = build_synthetic_repo(Path(self._temp_dir.name), spec)
+
+    def tearDown(self):
+        os.chdir(self._old_cwd)
+        self._temp_dir.cleanup()
+
+    def _full_overall(self, commit_a: str, commit_b: str) -> dict:
+        params_a, _ = load_commit_params(commit_a)
+        params_b, _ = load_commit_params(commit_b)
+        return compute_overall_stats(params_a, params_b, "h", "h")
+
+    def _chain_overall(self, commit_a: str, commit_b: str) -> dict:
+        params_a, delta, swapped, _, _ = load_chain_params(commit_a, commit_b)
+        tensor_diffs = compute_tensor_diffs(params_a, delta, b_is_delta=True, swap_sides=swapped)
+        return compute_overall_stats(params_a, delta, "h", "h", tensor_diffs=tensor_diffs)
+
+    def test_chain_diff_matches_full_reconstruction(self):
+        for commit_a, commit_b in [(self.hashes[0], self.hashes[3]), (self.hashes[3], self.hashes[1])]:
+            full = self._full_overall(commit_a, commit_b)
+            chain = self._chain_overall(commit_a, commit_b)
+
+            self.assertEqual(chain["total_parameters"], full["total_parameters"])
+            self.assertEqual(chain["changed_parameters"], full["changed_parameters"])
+            for key in ("mean_delta_norm", "max_delta_norm", "cosine_similarity"):
+                self.assertAlmostEqual(chain[key], full[key], places=4)
+
+    def test_chain_stops_at_checkpoint(self):
+        # hashes[4] is a CHECKPOINT, so there is no delta to sum from hashes[2]
+        self.assertIsNone(load_chain_params(self.hashes[2], self.hashes[5]))
+        self.assertIsNone(load_chain_params(self.hashes[1], self.hashes[1]))
+        self.assertIsNotNone(load_chain_params(self.hashes[4], self.hashes[5]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import unittest
+
+from flair_cli.benchmarks.network import PUSH_STEPS, run_network_benchmarks
+from flair_cli.benchmarks.standin import NetworkProfile
+from flair_cli.benchmarks.synthetic import SyntheticRepoSpec
+
+
+class NetworkBenchmarkTest(unittest.TestCase):
+    spec = SyntheticRepoSpec(model_mb=0.05, tensor_count=4, chain_length=3, checkpoint_every=2)
+
+    def test_push_and_clone_against_standin(self):
+        results = run_network_benchmarks(NetworkProfile(), self.spec, repeats=1, zkp_kb=1)
+        cases = results["cases"]
+
+        self.assertEqual(cases["push"]["failures"], 0)
+        self.assertEqual(cases["push"]["commits"], 3)
+        self.assertGreater(cases["push"]["commitsPerSec"], 0)
+        self.assertTrue(set(PUSH_STEPS) <= set(cases))
+        self.assertEqual(cases["push.initiate"]["repeats"], 3)
+        self.assertEqual(cases["clone"]["failures"], 0)
+        self.assertGreater(cases["clone"]["throughputMBs"], 0)
+
+    def test_injected_failures_are_counted(self):
+        results = run_network_benchmarks(
+            NetworkProfile(failure_rate=1.0), self.spec, repeats=2, zkp_kb=1, cases=("push", "clone")
+        )
+
+        self.assertEqual(results["cases"]["push"]["failures"], 2)
+        self.assertEqual(results["cases"]["push"]["commits"], 0)
+        self.assertEqual(results["cases"]["clone"]["failures"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
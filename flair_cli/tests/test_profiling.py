@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from flair_cli.core import profiling
+
+
+class ProfilingTest(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_spans_are_not_recorded(self):
+        profiling.enable()
+        profiling.disable()
+
+        with profiling.span("params.load", file="params.npz"):
+            pass
+        profiled_fn = profiling.profiled("hash.file")(lambda: 42)
+
+        self.assertEqual(profiled_fn(), 42)
+        self.assertEqual(profiling.events(), [])
+
+    def test_summary_aggregates_spans_by_name(self):
+        profiling.enable()
+
+        for _ in range(3):
+            with profiling.span("delta.apply"):
+                pass
+        with profiling.span("push.params_upload") as upload_span:
+            upload_span.set(bytes=1024)
+
+        rows = {row["name"]: row for row in profiling.summarize()}
+        self.assertEqual(rows["delta.apply"]["count"], 3)
+        self.assertEqual(rows["push.params_upload"]["count"], 1)
+
+    def test_chrome_trace_uses_complete_events(self):
+        profiling.enable()
+
+        with profiling.span("ezkl.prove"):
+            with profiling.span("params.load"):
+                pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = Path(temp_dir) / "trace.json"
+            profiling.write_chrome_trace(trace_path)
+            trace = json.loads(trace_path.read_text())
+
+        events = {event["name"]: event for event in trace["traceEvents"]}
+        self.assertEqual(events["ezkl.prove"]["ph"], "X")
+        self.assertEqual(events["ezkl.prove"]["cat"], "ezkl")
+        self.assertLessEqual(events["ezkl.prove"]["ts"], events["params.load"]["ts"])
+        self.assertGreaterEqual(events["ezkl.prove"]["dur"], events["params.load"]["dur"])
+
+
+if __name__ == "__main__":
+    unittest.main()
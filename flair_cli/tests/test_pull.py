@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from flair_cli.cli import pull as pull_cmd
+from flair_cli.cli.utils.remote_commits import _commits_since, _fetch_history, _list_commits_since, _merger_address
+
+
+def _remote(commit_hash: str, previous: str, commit_type: str, param_hash: str | None = None, committer: str = "user-wallet") -> dict:
+    return {
+        "commitHash": commit_hash,
+        "previousCommitHash": previous,
+        "commitType": commit_type,
+        "message": "train",
+        "committerAddress": committer,
+        "architecture": "numpy",
+        "paramHash": param_hash,
+        "createdAt": commit_hash,
+    }
+
+
+class PullPlanTest(unittest.TestCase):
+    def test_commits_since_returns_new_commits_oldest_first(self):
+        commits = [
+            _remote("c1", "_GENESIS_COMMIT_", "CHECKPOINT"),
+            _remote("c2", "c1", "DELTA"),
+            _remote("c3", "c2", "DELTA"),
+        ]
+
+        new_commits = _commits_since(commits, "c3", "c1")
+
+        self.assertEqual([c["commitHash"] for c in new_commits], ["c2", "c3"])
+        self.assertIsNone(_commits_since(commits, "c3", "unpushed"))
+
+    def test_replay_starts_at_newest_checkpoint(self):
+        new_commits = [
+            _remote("c2", "c1", "DELTA"),
+            _remote("c3", "c2", "CHECKPOINT"),
+            _remote("c4", "c3", "DELTA"),
+        ]
+
+        checkpoint, deltas = pull_cmd._plan_pull(new_commits)
+
+        self.assertEqual(checkpoint["commitHash"], "c3")
+        self.assertEqual([c["commitHash"] for c in deltas], ["c4"])
+
+    def test_replay_from_head_params_without_checkpoint(self):
+        new_commits = [_remote("c2", "c1", "DELTA"), _remote("c3", "c2", "DELTA")]
+
+        checkpoint, deltas = pull_cmd._plan_pull(new_commits)
+
+        self.assertIsNone(checkpoint)
+        self.assertEqual([c["commitHash"] for c in deltas], ["c2", "c3"])
+
+    def test_merge_commits_are_checkpoints_even_when_the_server_says_delta(self):
+        # Older mergers sent no commit type, which the backend stores as DELTA
+        new_commits = [
+            _remote("c2", "c1", "DELTA"),
+            _remote("c3", "c2", "DELTA", committer="merger-wallet"),
+            _remote("c4", "c3", "DELTA"),
+        ]
+
+        with patch.dict(os.environ, {"FLAIR_MERGER_ADDRESS": "merger-wallet"}):
+            _merger_address.cache_clear()
+            checkpoint, deltas = pull_cmd._plan_pull(new_commits)
+        _merger_address.cache_clear()
+
+        self.assertEqual(checkpoint["commitHash"], "c3")
+        self.assertEqual([c["commitHash"] for c in deltas], ["c4"])
+
+
+class IncrementalListingTest(unittest.TestCase):
+    def test_pages_until_a_short_page(self):
+        commits = [_remote(f"c{i}", f"c{i - 1}", "DELTA") for i in range(1, 6)]
+        with patch("flair_cli.cli.utils.remote_commits.api_client") as api_client:
+            api_client.list_branch_commits.side_effect = lambda repo, branch, since, skip, limit: commits[skip:skip + limit]
+            listed = _list_commits_since("repo", "branch", "c1", page_size=2)
+
+        self.assertEqual(listed, commits)
+        self.assertEqual([c.kwargs["skip"] for c in api_client.list_branch_commits.call_args_list], [0, 2, 4])
+
+    def test_history_stops_at_the_nearest_checkpoint(self):
+        commits = {
+            "c1": _remote("c1", "_GENESIS_COMMIT_", "CHECKPOINT"),
+            "c2": _remote("c2", "c1", "CHECKPOINT"),
+            "c3": _remote("c3", "c2", "DELTA"),
+            "c4": _remote("c4", "c3", "DELTA"),
+        }
+        with patch("flair_cli.cli.utils.remote_commits.api_client") as api_client:
+            api_client.get_commit_for_pull.side_effect = lambda repo, branch, commit_hash: commits[commit_hash]
+            chain = _fetch_history("repo", "branch", "c4", {"c4": commits["c4"]})
+
+        self.assertEqual([c["commitHash"] for c in chain], ["c4", "c3", "c2"])
+        self.assertEqual([c.args[2] for c in api_client.get_commit_for_pull.call_args_list], ["c3", "c2"])
+
+
+class PullApplyTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._old_cwd = os.getcwd()
+        os.chdir(self._temp_dir.name)
+        self.flair_dir = Path(self._temp_dir.name) / ".flair"
+        (self.flair_dir / ".params").mkdir(parents=True)
+        (self.flair_dir / "repo.json").write_text(json.dumps({"hash": "repo"}))
+
+    def tearDown(self):
+        os.chdir(self._old_cwd)
+        self._temp_dir.cleanup()
+
+    def _write_delta(self, commit_hash: str, value: float) -> None:
+        delta_dir = self.flair_dir / ".remote_commits" / commit_hash / ".delta_params"
+        delta_dir.mkdir(parents=True)
+        np.savez(delta_dir / "delta.npz", w=np.full(4, value, dtype=np.float32))
+
+    def test_pull_applies_only_new_deltas_to_head_params(self):
+        head_file = self.flair_dir / ".params" / "params.npz"
+        np.savez(head_file, w=np.ones(4, dtype=np.float32))
+        head_param_hash = hashlib.sha256(head_file.read_bytes()).hexdigest()
+        (self.flair_dir / "HEAD").write_text(json.dumps({
+            "currentBranch": "main",
+            "branchHash": "branch",
+            "previousCommit": "c1",
+        }))
+
+        commits = [
+            _remote("c1", "_GENESIS_COMMIT_", "CHECKPOINT", head_param_hash),
+            _remote("c2", "c1", "DELTA"),
+            _remote("c3", "c2", "DELTA"),
+        ]
+        self._write_delta("c2", 0.5)
+        self._write_delta("c3", 0.25)
+
+        by_hash = {c["commitHash"]: c for c in commits}
+        with patch("flair_cli.cli.utils.remote_commits.api_client") as api_client, \
+                patch.object(pull_cmd, "api_client", api_client), \
+                patch.object(pull_cmd, "_fetch_missing_blobs", return_value=True) as fetch:
+            api_client.list_branch_commits.return_value = commits
+            api_client.get_commit_for_pull.side_effect = lambda repo, branch, commit_hash: by_hash[commit_hash]
+            pull_cmd.pull()
+
+        # Listed from HEAD's timestamp; HEAD itself is looked up once for it
+        api_client.list_branch_commits.assert_called_once_with("repo", "branch", since="c1", skip=0, limit=200)
+        self.assertEqual([c.args[2] for c in api_client.get_commit_for_pull.call_args_list], ["c1", "c3"])
+        fetched = [commit_data["commitHash"] for commit_data, _ in fetch.call_args[0][0]]
+        self.assertEqual(fetched, ["c2", "c3"])
+
+        with np.load(head_file) as data:
+            np.testing.assert_allclose(data["w"], np.full(4, 1.75, dtype=np.float32))
+
+        head = json.loads((self.flair_dir / "HEAD").read_text())
+        remote_head = json.loads((self.flair_dir / "REMOTE_HEAD").read_text())
+        self.assertEqual(head["previousCommit"], "c3")
+        self.assertEqual(head["paramsHash"], hashlib.sha256(head_file.read_bytes()).hexdigest())
+        self.assertEqual(remote_head["latestCommitHash"], "c3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from flair_cli.cli.push import _delta_params_file
+
+
+class DeltaParamsFileTest(unittest.TestCase):
+    def test_delta_is_found_under_delta_params(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            commit_dir = Path(temp_dir)
+            delta = commit_dir / ".delta_params" / "delta.npz"
+            delta.parent.mkdir()
+            delta.write_bytes(b"delta")
+            # DELTA commits keep their full params next to the delta until cleanup
+            (commit_dir / "params.npz").write_bytes(b"full")
+
+            self.assertEqual(_delta_params_file(commit_dir, "delta.npz"), delta)
+
+    def test_falls_back_to_the_commit_directory(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            commit_dir = Path(temp_dir)
+            (commit_dir / "delta.npz").write_bytes(b"delta")
+
+            self.assertEqual(_delta_params_file(commit_dir, "delta.npz"), commit_dir / "delta.npz")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from flair_cli.cli.utils.reconstruction import _checkpoint_chain
+from flair_cli.cli.utils.remote_commits import _merger_address, _record_remote_history, _select_history, _to_local_commit
+
+
+def _server_commit(commit_hash: str, previous: str, committer: str = "user-wallet", commit_type: str = "DELTA") -> dict:
+    # The backend stores commits pushed without a commit type as DELTA
+    return {
+        "commitHash": commit_hash,
+        "previousCommitHash": previous,
+        "commitType": commit_type,
+        "committerAddress": committer,
+        "message": "Merged 2 commits from parent c2",
+        "architecture": "numpy",
+        "paramHash": f"hash-{commit_hash}",
+        "createdAt": commit_hash,
+    }
+
+
+class RemoteCommitTypeTest(unittest.TestCase):
+    def setUp(self):
+        env = patch.dict(os.environ, {"FLAIR_MERGER_ADDRESS": "merger-wallet"})
+        env.start()
+        self.addCleanup(env.stop)
+        _merger_address.cache_clear()
+        self.addCleanup(_merger_address.cache_clear)
+        self.commits = [
+            _server_commit("c1", "_GENESIS_COMMIT_"),
+            _server_commit("c2", "c1"),
+            _server_commit("c3", "c2", committer="merger-wallet"),
+            _server_commit("c4", "c3"),
+            _server_commit("c5", "c4"),
+        ]
+
+    def test_first_and_merge_commits_are_checkpoints_whatever_the_server_type(self):
+        types = [_to_local_commit(c, "repo", "branch")["commitType"] for c in self.commits]
+
+        # Messages play no part: every commit here carries the merger's message
+        self.assertEqual(types, ["CHECKPOINT", "DELTA", "CHECKPOINT", "DELTA", "DELTA"])
+        checkpoint = _to_local_commit(self.commits[0], "repo", "branch")
+        self.assertEqual(checkpoint["params"]["file"], "params.npz")
+        self.assertIsNone(checkpoint["deltaParams"])
+
+    def test_server_type_is_used_for_other_commits(self):
+        commit = _server_commit("c6", "c5", commit_type="checkpoint")
+
+        self.assertEqual(_to_local_commit(commit, "repo", "branch")["commitType"], "CHECKPOINT")
+
+    def test_depth_stops_at_the_first_checkpoint_past_depth(self):
+        chain = _select_history(self.commits, "c5", depth=2)
+
+        self.assertEqual([c["commitHash"] for c in chain], ["c5", "c4", "c3"])
+
+    def test_recorded_history_reconstructs_from_a_checkpoint(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            old_cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                flair_dir = Path(temp_dir) / ".flair"
+                _record_remote_history(flair_dir, self.commits[:2], "repo", "branch")
+                for commit_hash in ("c1", "c2"):
+                    # Blobs already fetched: the chain lookup should not hit the network
+                    commit_dir = flair_dir / ".remote_commits" / commit_hash
+                    blob = commit_dir / "params.npz" if commit_hash == "c1" else commit_dir / ".delta_params" / "delta.npz"
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    blob.write_bytes(b"")
+
+                chain = _checkpoint_chain("c2")
+            finally:
+                os.chdir(old_cwd)
+
+        self.assertEqual([commit_hash for commit_hash, _, _ in chain], ["c1", "c2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
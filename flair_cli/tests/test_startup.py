@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+IMPORT_BUDGET_MS = float(os.environ.get("FLAIR_IMPORT_BUDGET_MS", "150"))
+HEAVY_MODULES = ["numpy", "torch", "onnx", "ezkl", "httpx", "yaml", "flair_cli.api.utils", "flair_cli.cli.zkp"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from flair_cli.main import app
+elapsed_ms = (time.perf_counter() - start) * 1000
+try:
+    app(sys.argv[1:], prog_name="flair")
+except SystemExit:
+    pass
+print(json.dumps({"importMs": elapsed_ms, "modules": sorted(sys.modules)}), file=sys.stderr)
+"""
+
+
+def _probe(*args: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+class StartupTest(unittest.TestCase):
+    def test_help_does_not_import_heavy_modules(self):
+        modules = set(_probe("--help")["modules"])
+
+        self.assertEqual([m for m in HEAVY_MODULES if m in modules], [])
+
+    def test_subcommand_imports_only_its_module(self):
+        modules = set(_probe("config", "--help")["modules"])
+
+        self.assertIn("flair_cli.cli.config", modules)
+        self.assertNotIn("flair_cli.cli.zkp", modules)
+        self.assertNotIn("numpy", modules)
+
+    def test_log_without_stat_does_not_import_numpy(self):
+        modules = set(_probe("log")["modules"])
+
+        self.assertIn("flair_cli.cli.log", modules)
+        self.assertNotIn("numpy", modules)
+
+    def test_cli_import_time_within_budget(self):
+        import_ms = min(_probe("--help")["importMs"] for _ in range(3))
+
+        self.assertLess(import_ms, IMPORT_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
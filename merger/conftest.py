@@ -0,0 +1,6 @@
+"""Lets pytest import the merger's modules as the services do (``from lib.x import ...``) from any working directory."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
@@ -0,0 +1,259 @@
+"""
+Streaming aggregation of child models for the merger.
+
+Models are folded in one at a time, so memory is the running float64 sum plus the
+model being added, independent of how many children a group has.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Elements per chunk when scaling a layer into the float64 accumulator (8 MB of scratch)
+CHUNK_ELEMENTS = 1 << 20
+
+
+def _fedavg_dtype(dtype: np.dtype) -> np.dtype:
+    """Output dtype Flower's FedAvg gives a layer of `dtype` (layer * n / N)."""
+    return (np.zeros(1, dtype=dtype) * 1 / 1).dtype
+
+
+class WeightedAverage:
+    """
+    Running weighted FedAvg: w = sum_i(n_i * w_i) / sum_i(n_i).
+
+    Each layer is accumulated in float64, chunk by chunk through a reusable scratch
+    buffer, so adding a model allocates nothing model-sized. The result has the
+    dtype Flower's FedAvg would produce for each layer.
+    """
+
+    def __init__(self, chunk_elements: int = CHUNK_ELEMENTS) -> None:
+        self.chunk_elements = max(1, int(chunk_elements))
+        self.total_examples = 0
+        self.count = 0
+        self._sums: Optional[List[np.ndarray]] = None
+        self._dtypes: List[np.dtype] = []
+        self._scratch = np.empty(0, dtype=np.float64)
+
+    def add(self, nds: Sequence[np.ndarray], num_examples: int) -> None:
+        """Fold one model in. Raises ValueError if its layers differ from the first model's."""
+        if num_examples < 0:
+            raise ValueError("num_examples must be non-negative")
+        self._accumulate(nds, float(num_examples))
+        self.total_examples += num_examples
+        self.count += 1
+
+    def add_base(self, nds: Sequence[np.ndarray], weight: int) -> None:
+        """
+        Add weight x nds to the sum without counting as a model or toward total_examples.
+
+        Children stored as deltas against a shared parent P are added as deltas; adding
+        P once with their combined weight makes the result their FedAvg as full models.
+        """
+        self._accumulate(nds, float(weight))
+
+    def _accumulate(self, nds: Sequence[np.ndarray], weight: float) -> None:
+        if self._sums is None:
+            self._sums = [np.zeros(np.shape(layer), dtype=np.float64) for layer in nds]
+            self._dtypes = [np.asarray(layer).dtype for layer in nds]
+        if len(nds) != len(self._sums) or any(np.shape(a) != s.shape for a, s in zip(nds, self._sums)):
+            raise ValueError("Model layers do not match the other models in the group")
+
+        for layer, total in zip(nds, self._sums):
+            flat_in = np.asarray(layer).reshape(-1)
+            flat_total = total.reshape(-1)
+            for start in range(0, flat_in.size, self.chunk_elements):
+                stop = min(start + self.chunk_elements, flat_in.size)
+                if self._scratch.size < stop - start:
+                    self._scratch = np.empty(min(self.chunk_elements, flat_in.size), dtype=np.float64)
+                scaled = self._scratch[: stop - start]
+                np.multiply(flat_in[start:stop], weight, out=scaled, dtype=np.float64, casting="unsafe")
+                flat_total[start:stop] += scaled
+
+    def result(self) -> List[np.ndarray]:
+        """The averaged layers. Consumes the accumulator: each float64 sum is freed as its layer is emitted."""
+        if self._sums is None:
+            raise ValueError("No models were added")
+        if self.total_examples == 0:
+            raise ValueError("Cannot average models with zero total examples")
+        sums, self._sums = self._sums, None
+        averaged: List[np.ndarray] = []
+        for index, dtype in enumerate(self._dtypes):
+            total = sums[index]
+            sums[index] = None
+            total /= self.total_examples
+            averaged.append(total.astype(_fedavg_dtype(dtype), copy=False))
+        return averaged
+
+    def close(self) -> None:
+        """Drop the running sums (for callers that stop before result())."""
+        self._sums = None
+
+
+# -------- Robust (coordinate-wise / selection) strategies ---------
+# Bytes of float64 block stack (K models x block) the robust strategies work on at a time
+ROBUST_BLOCK_BYTES = 64 << 20
+
+
+class RobustAggregator:
+    """
+    Base of strategies that need every child at once.
+
+    Children are passed as layer lists of memory-mapped views over their spool files
+    (lib.decoders), and each layer is processed in row-blocks: the K children's slices
+    of one block are stacked into a K x block float64 array, so peak memory is about
+    K x block regardless of model size (plus the output).
+    """
+
+    name = ""
+    # Each output coordinate depends only on that coordinate of the children (lib.parallel may shard it)
+    elementwise = False
+    # Smallest group the strategy can aggregate
+    min_children = 1
+
+    def __init__(self, block_bytes: int = ROBUST_BLOCK_BYTES) -> None:
+        self.block_bytes = block_bytes
+
+    def _block_elements(self, count: int) -> int:
+        return max(1, self.block_bytes // (8 * max(1, count)))
+
+    @staticmethod
+    def _check_layers(models: Sequence[Sequence[np.ndarray]]) -> None:
+        if not models:
+            raise ValueError("No models were added")
+        shapes = [np.shape(layer) for layer in models[0]]
+        for model in models[1:]:
+            if len(model) != len(shapes) or any(np.shape(a) != s for a, s in zip(model, shapes)):
+                raise ValueError("Model layers do not match the other models in the group")
+
+    def _blocks(self, models: Sequence[Sequence[np.ndarray]], index: int):
+        """Yield (start, stop, K x (stop - start) float64 stack) over layer `index`."""
+        flats = [np.asarray(model[index]).reshape(-1) for model in models]
+        size = flats[0].size
+        block = self._block_elements(len(models))
+        stack = np.empty((len(models), min(block, size)), dtype=np.float64)
+        for start in range(0, size, block):
+            stop = min(start + block, size)
+            rows = stack[:, : stop - start]
+            for row, flat in zip(rows, flats):
+                row[...] = flat[start:stop]
+            yield start, stop, rows
+
+    def aggregate(self, models: Sequence[Sequence[np.ndarray]], num_examples: Sequence[int]) -> List[np.ndarray]:
+        raise NotImplementedError
+
+
+class _CoordinateWise(RobustAggregator):
+    elementwise = True
+
+    def _reduce(self, rows: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def aggregate(self, models: Sequence[Sequence[np.ndarray]], num_examples: Sequence[int]) -> List[np.ndarray]:
+        self._check_layers(models)
+        result: List[np.ndarray] = []
+        for index, layer in enumerate(models[0]):
+            out = np.empty(np.shape(layer), dtype=_fedavg_dtype(np.asarray(layer).dtype))
+            flat_out = out.reshape(-1)
+            for start, stop, rows in self._blocks(models, index):
+                flat_out[start:stop] = self._reduce(rows)
+            result.append(out)
+        return result
+
+
+class CoordinateMedian(_CoordinateWise):
+    """Per-coordinate median of the children (unweighted)."""
+
+    name = "median"
+
+    def _reduce(self, rows: np.ndarray) -> np.ndarray:
+        return np.median(rows, axis=0)
+
+
+class TrimmedMean(_CoordinateWise):
+    """Per-coordinate mean after dropping the `trim` fraction of largest and of smallest values (unweighted)."""
+
+    name = "trimmed_mean"
+
+    def __init__(self, trim: float = 0.1, block_bytes: int = ROBUST_BLOCK_BYTES) -> None:
+        super().__init__(block_bytes)
+        if not 0 <= trim < 0.5:
+            raise ValueError("trim must be in [0, 0.5)")
+        self.trim = trim
+
+    def _reduce(self, rows: np.ndarray) -> np.ndarray:
+        cut = int(self.trim * rows.shape[0])
+        if cut == 0:
+            return rows.mean(axis=0)
+        rows.sort(axis=0)
+        return rows[cut : rows.shape[0] - cut].mean(axis=0)
+
+
+class Krum(RobustAggregator):
+    """
+    (Multi-)Krum: score each child by the summed squared distances to its K - f - 2
+    nearest children and average the `multi` lowest-scoring ones, weighted by examples.
+
+    Pairwise distances are accumulated block by block from differences (not Gram
+    matrices, which cancel badly for nearly identical models); then only the
+    selected children are read again to build the result.
+    """
+
+    name = "krum"
+
+    def __init__(self, byzantine: int = 0, multi: int = 1, block_bytes: int = ROBUST_BLOCK_BYTES) -> None:
+        super().__init__(block_bytes)
+        if int(byzantine) < 0:
+            raise ValueError("byzantine must be non-negative")
+        if int(multi) < 1:
+            raise ValueError("multi must be at least 1")
+        self.byzantine = int(byzantine)
+        self.multi = int(multi)
+
+    @property
+    def min_children(self) -> int:
+        return self.byzantine + 3
+
+    def distances(self, models: Sequence[Sequence[np.ndarray]]) -> np.ndarray:
+        count = len(models)
+        dist = np.zeros((count, count), dtype=np.float64)
+        for index in range(len(models[0])):
+            for _, _, rows in self._blocks(models, index):
+                for i in range(count - 1):
+                    diff = rows[i + 1 :] - rows[i]
+                    d = np.einsum("ij,ij->i", diff, diff)
+                    dist[i, i + 1 :] += d
+                    dist[i + 1 :, i] += d
+        return dist
+
+    def select(self, models: Sequence[Sequence[np.ndarray]]) -> List[int]:
+        count = len(models)
+        neighbours = count - self.byzantine - 2
+        if neighbours < 1:
+            raise ValueError(f"Krum needs more than byzantine + 2 children (got {count}, byzantine={self.byzantine})")
+        dist = self.distances(models)
+        scores = [np.sort(np.delete(dist[i], i))[:neighbours].sum() for i in range(count)]
+        return [int(i) for i in np.argsort(scores, kind="stable")[: min(self.multi, count)]]
+
+    def aggregate(self, models: Sequence[Sequence[np.ndarray]], num_examples: Sequence[int]) -> List[np.ndarray]:
+        self._check_layers(models)
+        selected = self.select(models)
+        average = WeightedAverage()
+        for i in selected:
+            # Selected children are weighted as in FedAvg; all-zero weights fall back to equal weights
+            average.add(models[i], num_examples[i] if any(num_examples[j] for j in selected) else 1)
+        return average.result()
+
+
+AGGREGATORS = {"fedavg": None, "median": CoordinateMedian, "trimmed_mean": TrimmedMean, "krum": Krum}
+
+
+def make_aggregator(name: str = "fedavg", **options) -> Optional[RobustAggregator]:
+    """The robust strategy called `name`, or None for streaming FedAvg (WeightedAverage)."""
+    try:
+        factory = AGGREGATORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown aggregator {name!r}; expected one of {', '.join(AGGREGATORS)}") from None
+    return factory(**options) if factory is not None else None
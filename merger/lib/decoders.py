@@ -0,0 +1,221 @@
+"""
+Params decoders for the merger.
+
+Each decoder recognizes one container format by its leading bytes and returns the
+model's layers as numpy arrays that view the spooled file (np.memmap / np.frombuffer
+over an mmap) instead of copying it. Supported formats, tried in registry order:
+
+- ``npz``: ``np.savez`` archives; stored members are mapped, compressed ones are read.
+- ``torch``: zip-format ``torch.save`` files, loaded with ``weights_only=True, mmap=True``.
+- ``safetensors``: the raw tensor container (8-byte header length, JSON header, data).
+- ``pickle``: legacy pickled ndarray lists / state_dicts. It executes arbitrary code
+  from contributors, so it is only consulted when explicitly allowed.
+
+Named containers are ordered by key (``arr_0, arr_1, ...`` numerically), so children
+saved in different formats still line up layer by layer.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import pickle
+import re
+import struct
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import torch  # Optional, for torch.save archives
+except Exception:  # pragma: no cover - torch is optional
+    torch = None
+
+_ZIP_MAGIC = b"PK\x03\x04"
+_PICKLE_PROTO = b"\x80"
+_ARR_KEY = re.compile(r"arr_(\d+)$")
+
+_SAFETENSORS_DTYPES = {
+    "F64": np.float64,
+    "F32": np.float32,
+    "F16": np.float16,
+    "I64": np.int64,
+    "I32": np.int32,
+    "I16": np.int16,
+    "I8": np.int8,
+    "U8": np.uint8,
+    "BOOL": np.bool_,
+}
+
+
+class UnsupportedParamsFormat(ValueError):
+    """No enabled decoder recognizes the params file."""
+
+
+@dataclass(frozen=True)
+class Decoder:
+    name: str
+    sniff: Callable[[Path, bytes], bool]
+    decode: Callable[[Path], List[np.ndarray]]
+    unsafe: bool = False
+
+
+def _ordered(named: Dict[str, np.ndarray]) -> List[np.ndarray]:
+    def key(name: str):
+        match = _ARR_KEY.match(name)
+        return (0, int(match.group(1)), "") if match else (1, 0, name)
+
+    return [named[name] for name in sorted(named, key=key)]
+
+
+def _bfloat16_to_float32(bits: np.ndarray) -> np.ndarray:
+    """bfloat16 has no numpy dtype; widen its bit pattern to float32 (this one copies)."""
+    return (bits.astype(np.uint32) << 16).view(np.float32)
+
+
+# -------- npz ---------
+def _is_npz(path: Path, head: bytes) -> bool:
+    if not head.startswith(_ZIP_MAGIC):
+        return False
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+    return bool(names) and all(name.endswith(".npy") for name in names)
+
+
+def _map_npz_member(path: Path, info: zipfile.ZipInfo) -> Optional[np.ndarray]:
+    """Memory-map one stored .npy member, or None if it is compressed or holds objects."""
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        name_len, extra_len = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+    if dtype.hasobject or not shape:
+        # Scalars are read (np.memmap needs at least one dimension)
+        return None
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+
+
+def _decode_npz(path: Path) -> List[np.ndarray]:
+    named: Dict[str, np.ndarray] = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            array = _map_npz_member(path, info)
+            if array is None:
+                with archive.open(info) as member:
+                    array = np.lib.format.read_array(member, allow_pickle=False)
+            named[info.filename[:-4]] = array
+    return _ordered(named)
+
+
+# -------- torch ---------
+def _is_torch_zip(path: Path, head: bytes) -> bool:
+    if torch is None or not head.startswith(_ZIP_MAGIC):
+        return False
+    with zipfile.ZipFile(path) as archive:
+        return any(name.endswith("/data.pkl") or name == "data.pkl" for name in archive.namelist())
+
+
+def _tensor_to_numpy(tensor) -> np.ndarray:
+    tensor = tensor.detach()
+    if tensor.dtype == torch.bfloat16:
+        return _bfloat16_to_float32(tensor.view(torch.int16).numpy().view(np.uint16))
+    return tensor.numpy()
+
+
+def _decode_torch(path: Path) -> List[np.ndarray]:
+    obj = torch.load(path, map_location="cpu", weights_only=True, mmap=True)
+    if isinstance(obj, dict) and all(isinstance(v, torch.Tensor) for v in obj.values()):
+        return _ordered({k: _tensor_to_numpy(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)) and all(isinstance(v, torch.Tensor) for v in obj):
+        return [_tensor_to_numpy(v) for v in obj]
+    raise UnsupportedParamsFormat("torch archive does not hold a state_dict or list of tensors")
+
+
+# -------- safetensors ---------
+def _is_safetensors(path: Path, head: bytes) -> bool:
+    if len(head) < 9:
+        return False
+    (header_len,) = struct.unpack("<Q", head[:8])
+    return head[8:9] == b"{" and 8 + header_len <= path.stat().st_size
+
+
+def _decode_safetensors(path: Path) -> List[np.ndarray]:
+    with open(path, "rb") as f:
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    base = 8 + header_len
+    named: Dict[str, np.ndarray] = {}
+    for name, entry in header.items():
+        if name == "__metadata__":
+            continue
+        start, end = entry["data_offsets"]
+        shape = tuple(entry["shape"])
+        if entry["dtype"] == "BF16":
+            bits = np.frombuffer(buffer, dtype="<u2", count=(end - start) // 2, offset=base + start)
+            named[name] = _bfloat16_to_float32(bits).reshape(shape)
+            continue
+        dtype = _SAFETENSORS_DTYPES.get(entry["dtype"])
+        if dtype is None:
+            raise UnsupportedParamsFormat(f"Unsupported safetensors dtype {entry['dtype']} for {name}")
+        dtype = np.dtype(dtype).newbyteorder("<")
+        named[name] = np.frombuffer(buffer, dtype=dtype, count=(end - start) // dtype.itemsize, offset=base + start).reshape(shape)
+    return _ordered(named)
+
+
+# -------- pickle (legacy, unsafe) ---------
+def _is_pickle(path: Path, head: bytes) -> bool:
+    return head.startswith(_PICKLE_PROTO)
+
+
+def _decode_pickle(path: Path) -> List[np.ndarray]:
+    with open(path, "rb") as f:
+        obj = pickle.load(f)
+    if isinstance(obj, (list, tuple)) and all(hasattr(x, "shape") for x in obj):
+        return [np.asarray(x) for x in obj]
+    if torch is not None and isinstance(obj, dict) and all(isinstance(v, torch.Tensor) for v in obj.values()):
+        return _ordered({k: _tensor_to_numpy(v) for k, v in obj.items()})
+    if isinstance(obj, dict) and all(hasattr(v, "shape") for v in obj.values()):
+        return _ordered({k: np.asarray(v) for k, v in obj.items()})
+    raise UnsupportedParamsFormat("Pickle does not hold a list of arrays or a state_dict")
+
+
+DECODERS: List[Decoder] = [
+    Decoder("npz", _is_npz, _decode_npz),
+    Decoder("torch", _is_torch_zip, _decode_torch),
+    Decoder("safetensors", _is_safetensors, _decode_safetensors),
+    Decoder("pickle", _is_pickle, _decode_pickle, unsafe=True),
+]
+
+
+def register_decoder(decoder: Decoder) -> None:
+    """Add a decoder ahead of the pickle fallback."""
+    DECODERS.insert(max(0, len(DECODERS) - 1), decoder)
+
+
+def decode_params(path: Path, allow_pickle: bool = False) -> List[np.ndarray]:
+    """Decode a params file with the first decoder that recognizes it."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        head = f.read(16)
+    for decoder in DECODERS:
+        if decoder.unsafe and not allow_pickle:
+            continue
+        if decoder.sniff(path, head):
+            return decoder.decode(path)
+    hint = "" if allow_pickle or not _is_pickle(path, head) else " (pickle is disabled; set ALLOW_PICKLE_PARAMS=1 to accept it)"
+    raise UnsupportedParamsFormat(f"Unsupported parameter format{hint}")
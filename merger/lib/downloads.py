@@ -0,0 +1,212 @@
+"""
+Concurrent params downloads for the merger.
+
+Bodies are streamed to spool files while being hashed, so a child is never held in
+memory as raw bytes. Downloads run on a bounded thread pool over one pooled session
+and are handed back in submission order, letting the caller aggregate child i while
+children i+1.. are still in flight.
+
+With a cache dir, verified bodies are also kept there under their hash (hard links
+to the spool file, so caching costs no copy) and later fetches of the same hash are
+served from it, e.g. when a failed group is retried or children are shared by
+several targets of the scheduler.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+LOGGER = logging.getLogger("flair.merger.downloads")
+
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SEC = 0.5
+# (connect, read) timeouts; read is per socket read, not for the whole body
+DEFAULT_TIMEOUT: Tuple[float, float] = (10.0, 120.0)
+CHUNK_SIZE = 1 << 20
+
+# Statuses worth retrying; other 4xx responses fail immediately
+_RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(RuntimeError):
+    """A params download failed permanently (after retries, or with a non-retryable status)."""
+
+
+class HashMismatchError(DownloadError):
+    """The downloaded body does not match the commit's recorded param hash."""
+
+
+class ParamsDownloader:
+    """
+    Bounded-parallel downloader of params blobs into spool files.
+
+    Each body is written in CHUNK_SIZE pieces while its SHA-256 is computed; when an
+    expected hash is given, a mismatch is retried like a transport error (a truncated
+    or corrupted transfer) and raised as HashMismatchError once retries run out.
+    Spool files belong to the caller, who must unlink them. One downloader may be
+    shared by several mergers; fetch is thread-safe.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        max_workers: int = DEFAULT_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF_SEC,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        spool_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 0,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.timeout = timeout
+        self.spool_dir = spool_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.cache_max_bytes = cache_max_bytes
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+        # One pool for every fetch_all, so concurrent merges share max_workers connections
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="params-download")
+
+    def fetch(self, uri: str, expected_hash: Optional[str] = None) -> Path:
+        """Download one blob to a spool file, retrying with exponential backoff and jitter."""
+        cached = self._from_cache(expected_hash)
+        if cached is not None:
+            return cached
+        attempt = 0
+        while True:
+            try:
+                return self._fetch_once(uri, expected_hash)
+            except HashMismatchError:
+                if attempt >= self.retries:
+                    raise
+            except requests.HTTPError as exc:
+                status = exc.response.status_code if exc.response is not None else None
+                if status not in _RETRY_STATUSES or attempt >= self.retries:
+                    raise DownloadError(f"Download of {uri} failed with status {status}") from exc
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= self.retries:
+                    raise DownloadError(f"Download of {uri} failed after {attempt + 1} attempts: {exc}") from exc
+            delay = self.backoff * (2**attempt) * (1 + random.random())
+            attempt += 1
+            LOGGER.warning("Retrying download of %s in %.1fs (attempt %d/%d)", uri, delay, attempt, self.retries)
+            time.sleep(delay)
+
+    def _fetch_once(self, uri: str, expected_hash: Optional[str]) -> Path:
+        fd, name = tempfile.mkstemp(prefix="params-", suffix=".spool", dir=self.spool_dir)
+        path = Path(name)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as out, self.session.get(uri, stream=True, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    out.write(chunk)
+                    digest.update(chunk)
+            if expected_hash and digest.hexdigest() != expected_hash.lower():
+                raise HashMismatchError(f"Hash mismatch for {uri}: expected {expected_hash}, got {digest.hexdigest()}")
+            if expected_hash:
+                self._to_cache(path, expected_hash)
+            return path
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+    # -------- Cache ---------
+    def _cache_path(self, expected_hash: Optional[str]) -> Optional[Path]:
+        if self.cache_dir is None or not expected_hash or self.cache_max_bytes <= 0:
+            return None
+        return self.cache_dir / expected_hash.lower()
+
+    def _from_cache(self, expected_hash: Optional[str]) -> Optional[Path]:
+        """A new spool file for a cached body: a hard link, or a copy across filesystems."""
+        cache_path = self._cache_path(expected_hash)
+        if cache_path is None or not cache_path.exists():
+            return None
+        fd, name = tempfile.mkstemp(prefix="params-", suffix=".spool", dir=self.spool_dir)
+        os.close(fd)
+        path = Path(name)
+        path.unlink()
+        try:
+            try:
+                os.link(cache_path, path)
+            except OSError:
+                shutil.copyfile(cache_path, path)
+            os.utime(cache_path)
+        except FileNotFoundError:
+            # Evicted meanwhile
+            path.unlink(missing_ok=True)
+            return None
+        return path
+
+    def _to_cache(self, path: Path, expected_hash: str) -> None:
+        cache_path = self._cache_path(expected_hash)
+        if cache_path is None or cache_path.exists():
+            return
+        try:
+            os.link(path, cache_path)
+        except FileExistsError:
+            return
+        except OSError:
+            # Spool and cache on different filesystems: caching would cost a copy, skip it
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond cache_max_bytes."""
+        entries = []
+        for entry in self.cache_dir.iterdir():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.cache_max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+
+    def fetch_all(self, items: Sequence[Tuple[str, Optional[str]]]) -> Iterator[Path]:
+        """
+        Yield spool files for (uri, expected_hash) items in order, downloading ahead.
+
+        All items are queued at once and run max_workers at a time (shared with any
+        other fetch_all in progress). If the consumer stops early (or a download fails),
+        pending downloads are cancelled and any spool files not yet yielded are removed.
+        """
+        futures: List[Future] = [self._executor.submit(self.fetch, uri, expected) for uri, expected in items]
+        yielded = 0
+        try:
+            for future in futures:
+                path = future.result()
+                yielded += 1
+                yield path
+        finally:
+            for future in futures[yielded:]:
+                future.cancel()
+            wait(futures[yielded:])
+            for future in futures[yielded:]:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    future.result().unlink(missing_ok=True)
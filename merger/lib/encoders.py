@@ -0,0 +1,84 @@
+"""
+Params encoding for the merger.
+
+The aggregate is written once, as an ``np.savez``-compatible .npz (stored, not
+compressed), to a spool file that every upload then streams. Array buffers go to
+the file through memoryviews and the SHA-256 of the file is taken from the same
+bytes as they are written, so neither the serialized blob nor a ``tobytes()`` copy
+is ever held in memory. The hash is the file hash, as ``flair push`` records it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Sequence, Tuple
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 20
+
+
+class _HashingWriter:
+    """Write-only, unseekable file wrapper that hashes everything written through it.
+
+    Being unseekable makes zipfile stream members with data descriptors instead of
+    seeking back to patch headers, so the bytes hashed are exactly the bytes on disk.
+    """
+
+    def __init__(self, out: BinaryIO) -> None:
+        self._out = out
+        self._position = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, data) -> int:
+        view = memoryview(data)
+        self._out.write(view)
+        self.digest.update(view)
+        self._position += view.nbytes
+        return view.nbytes
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        self._out.flush()
+
+
+def _write_array(member: BinaryIO, array: np.ndarray) -> None:
+    # Header and bytes must agree on the order: always C (np.ascontiguousarray would turn 0-d into 1-d)
+    array = np.asarray(array, order="C")
+    np.lib.format.write_array_header_1_0(member, np.lib.format.header_data_from_array_1_0(array))
+    flat = memoryview(array.reshape(-1).view(np.uint8))
+    for start in range(0, flat.nbytes, CHUNK_SIZE):
+        member.write(flat[start : start + CHUNK_SIZE])
+
+
+def write_npz(nds: Sequence[np.ndarray], path: Path) -> Tuple[str, int]:
+    """Write layers as arr_0..arr_N of an uncompressed .npz. Returns: (sha256 hex, size in bytes)"""
+    with open(path, "wb") as out:
+        writer = _HashingWriter(out)
+        with zipfile.ZipFile(writer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+            for index, array in enumerate(nds):
+                info = zipfile.ZipInfo(f"arr_{index}.npy", date_time=(1980, 1, 1, 0, 0, 0))
+                # Upper bound on the member size, so zipfile picks zip64 headers when needed
+                info.file_size = array.nbytes + 4096
+                with archive.open(info, mode="w") as member:
+                    _write_array(member, np.asarray(array))
+    return writer.digest.hexdigest(), writer.tell()
+
+
+def spool_npz(nds: Sequence[np.ndarray], spool_dir: Optional[str] = None) -> Tuple[Path, str, int]:
+    """write_npz into a new spool file, which the caller must unlink. Returns: (path, sha256 hex, size)"""
+    fd, name = tempfile.mkstemp(prefix="aggregate-", suffix=".npz", dir=spool_dir)
+    os.close(fd)
+    path = Path(name)
+    try:
+        digest, size = write_npz(nds, path)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path, digest, size
@@ -0,0 +1,99 @@
+"""
+In-memory stand-in for the lease service used by HttpLeaseBackend.
+
+Implements the /leases/{acquire,renew,release,complete} protocol with the same
+rules as FileLeaseBackend, for local multi-instance runs and tests:
+
+    python -m lib.lease_server --port 8765
+    LEASE_BACKEND=http LEASE_URL=http://127.0.0.1:8765 python merger_service.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+from lib.leases import DONE_RETENTION_SEC
+
+
+class LeaseStore:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._records: Dict[str, dict] = {}
+
+    def handle(self, action: str, body: dict) -> Tuple[int, dict]:
+        key = body.get("key")
+        if not key:
+            return 400, {"error": "key is required"}
+        now = time.time()
+        with self._lock:
+            record = self._records.get(key)
+            if action == "acquire":
+                if record and record.get("done") and now - record["doneAt"] < DONE_RETENTION_SEC:
+                    return 200, {"done": record["done"]}
+                if record and not record.get("done") and record["expiresAt"] > now and record["owner"] != body.get("owner"):
+                    return 409, {"error": "held"}
+                record = {"owner": body.get("owner"), "token": uuid.uuid4().hex, "expiresAt": now + float(body.get("ttlSec", 60))}
+                self._records[key] = record
+                return 200, {"token": record["token"], "expiresAt": record["expiresAt"]}
+            if action == "renew":
+                if not record or record.get("token") != body.get("token"):
+                    return 409, {"error": "lost"}
+                record["expiresAt"] = now + float(body.get("ttlSec", 60))
+                return 200, {"expiresAt": record["expiresAt"]}
+            if action == "release":
+                if record and record.get("token") == body.get("token"):
+                    del self._records[key]
+                return 200, {}
+            if action == "complete":
+                self._records[key] = {"done": body.get("result"), "doneAt": now}
+                return 200, {}
+        return 404, {"error": f"unknown action {action}"}
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, store: LeaseStore | None = None) -> ThreadingHTTPServer:
+    """A lease server bound to (host, port); port 0 picks a free one (see server.server_port)."""
+    store = store or LeaseStore()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            prefix = "/leases/"
+            if not self.path.startswith(prefix):
+                status, payload = 404, {"error": "not found"}
+            else:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    body = None
+                status, payload = (400, {"error": "invalid JSON"}) if not isinstance(body, dict) else store.handle(self.path[len(prefix) :], body)
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory lease service for local merger runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = make_server(args.host, args.port)
+    print(f"Lease server listening on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Leases that let several merger instances split parent groups safely.
+
+Before merging a group, an instance acquires a time-limited lease keyed by
+(repo, branch, parent hash). While the merge runs, a LeaseKeeper renews the lease
+every ttl/3 on a background thread. The merge checks the lease is still held right
+before finalizing, so an instance that stalled past its TTL never creates a second
+merge commit. A successful merge completes the lease, leaving a tombstone that holds
+the merge commit hash: an instance that acquires the same key later learns the group
+is done instead of merging it again. A failed merge releases the lease for a retry.
+
+Backends:
+- FileLeaseBackend: lease files under a directory, guarded by flock (one host).
+- HttpLeaseBackend: a lease service over HTTP (lib.lease_server is a local stand-in).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import requests
+
+DEFAULT_TTL_SEC = 60.0
+# How long completed leases are remembered; well past any plausible poll lag
+DONE_RETENTION_SEC = 24 * 3600.0
+
+
+class LeaseLost(RuntimeError):
+    """The lease expired or was taken over before the merge finished."""
+
+
+@dataclass
+class Lease:
+    key: str
+    owner: str
+    token: str
+    expires_at: float
+
+
+@dataclass
+class AcquireResult:
+    """Exactly one of: a lease to work under, the merge commit of a completed key, or neither (held elsewhere)."""
+
+    lease: Optional[Lease] = None
+    done: Optional[str] = None
+
+
+def lease_key(repo_hash: str, branch_hash: str, parent_hash: str) -> str:
+    return f"{repo_hash}:{branch_hash}:{parent_hash}"
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class LeaseBackend:
+    def acquire(self, key: str, owner: str, ttl: float) -> AcquireResult:
+        raise NotImplementedError
+
+    def renew(self, lease: Lease, ttl: float) -> bool:
+        """Extend a held lease. Returns: False if it is no longer ours"""
+        raise NotImplementedError
+
+    def release(self, lease: Lease) -> None:
+        raise NotImplementedError
+
+    def complete(self, lease: Lease, result: str) -> None:
+        """Release the lease and record the key as done with `result`."""
+        raise NotImplementedError
+
+
+# -------- File backend ---------
+class FileLeaseBackend(LeaseBackend):
+    """
+    One JSON file per key: {"owner", "token", "expiresAt"} or {"done", "doneAt"}.
+
+    Reads and writes of a key happen under flock on a sibling .lock file, so this is
+    safe across processes on one host (and on shared filesystems with working flock).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{name}.json", self.directory / f"{name}.lock"
+
+    @contextmanager
+    def _locked(self, key: str) -> Iterator[Tuple[Optional[dict], Path]]:
+        """Hold the key's flock; yields its current record and lease file path."""
+        import fcntl
+
+        lease_path, lock_path = self._paths(key)
+        fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield self._read(lease_path), lease_path
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _write(path: Path, record: Optional[dict]) -> None:
+        if record is None:
+            path.unlink(missing_ok=True)
+            return
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> AcquireResult:
+        now = time.time()
+        with self._locked(key) as (record, path):
+            if record and record.get("done") and now - record.get("doneAt", 0) < DONE_RETENTION_SEC:
+                return AcquireResult(done=record["done"])
+            if record and not record.get("done") and record.get("expiresAt", 0) > now and record.get("owner") != owner:
+                return AcquireResult()
+            lease = Lease(key=key, owner=owner, token=uuid.uuid4().hex, expires_at=now + ttl)
+            self._write(path, {"owner": owner, "token": lease.token, "expiresAt": lease.expires_at})
+            return AcquireResult(lease=lease)
+
+    def renew(self, lease: Lease, ttl: float) -> bool:
+        with self._locked(lease.key) as (record, path):
+            if not record or record.get("token") != lease.token:
+                return False
+            lease.expires_at = time.time() + ttl
+            record["expiresAt"] = lease.expires_at
+            self._write(path, record)
+            return True
+
+    def release(self, lease: Lease) -> None:
+        with self._locked(lease.key) as (record, path):
+            if record and record.get("token") == lease.token:
+                self._write(path, None)
+
+    def complete(self, lease: Lease, result: str) -> None:
+        with self._locked(lease.key) as (record, path):
+            self._write(path, {"done": result, "doneAt": time.time()})
+
+
+# -------- HTTP backend ---------
+class HttpLeaseBackend(LeaseBackend):
+    """
+    Client of a lease service exposing JSON POST endpoints:
+      /leases/acquire  {key, owner, ttlSec}  → 200 {token, expiresAt} | 200 {done} | 409 held
+      /leases/renew    {key, token, ttlSec}  → 200 {expiresAt} | 409 lost
+      /leases/release  {key, token}          → 200
+      /leases/complete {key, token, result}  → 200
+    """
+
+    def __init__(self, base_url: str, session: Optional[requests.Session] = None, timeout: float = 10.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _post(self, action: str, payload: dict) -> requests.Response:
+        return self.session.post(f"{self.base_url}/leases/{action}", json=payload, timeout=self.timeout)
+
+    def acquire(self, key: str, owner: str, ttl: float) -> AcquireResult:
+        resp = self._post("acquire", {"key": key, "owner": owner, "ttlSec": ttl})
+        if resp.status_code == 409:
+            return AcquireResult()
+        resp.raise_for_status()
+        body = resp.json()
+        if body.get("done"):
+            return AcquireResult(done=body["done"])
+        return AcquireResult(lease=Lease(key=key, owner=owner, token=body["token"], expires_at=body["expiresAt"]))
+
+    def renew(self, lease: Lease, ttl: float) -> bool:
+        resp = self._post("renew", {"key": lease.key, "token": lease.token, "ttlSec": ttl})
+        if resp.status_code == 409:
+            return False
+        resp.raise_for_status()
+        lease.expires_at = resp.json()["expiresAt"]
+        return True
+
+    def release(self, lease: Lease) -> None:
+        self._post("release", {"key": lease.key, "token": lease.token}).raise_for_status()
+
+    def complete(self, lease: Lease, result: str) -> None:
+        self._post("complete", {"key": lease.key, "token": lease.token, "result": result}).raise_for_status()
+
+
+# -------- Keeper ---------
+class LeaseKeeper:
+    """
+    Renews a lease in the background while a merge runs.
+
+    Use as a context manager; call check() before any irreversible step and
+    complete(result) once the merge succeeded. Leaving the block without
+    complete() releases the lease.
+    """
+
+    def __init__(self, backend: LeaseBackend, lease: Lease, ttl: float) -> None:
+        self.backend = backend
+        self.lease = lease
+        self.ttl = ttl
+        self.lost = False
+        self._result: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._renew_loop, name="lease-renew", daemon=True)
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                renewed = self.backend.renew(self.lease, self.ttl)
+            except Exception:
+                # Transient backend errors: keep trying until the lease would have expired
+                renewed = time.time() < self.lease.expires_at
+            if not renewed:
+                self.lost = True
+                return
+
+    def check(self) -> None:
+        if self.lost or time.time() >= self.lease.expires_at:
+            raise LeaseLost(f"Lease on {self.lease.key} was lost")
+
+    def complete(self, result: str) -> None:
+        self._result = result
+
+    def __enter__(self) -> "LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self._result is not None:
+            self.backend.complete(self.lease, self._result)
+        elif not self.lost:
+            self.backend.release(self.lease)
@@ -0,0 +1,321 @@
+"""
+Multi-process sharded aggregation for the merger.
+
+The layers of a group are split into shards of contiguous element ranges and each
+shard is aggregated by a worker of a process pool. No arrays cross the process
+boundary: tasks carry only LayerRefs, which say where a layer lives.
+- Layers decoded as np.memmap (stored .npz members) are re-mapped by the workers
+  from the child's spool file.
+- Other layers (compressed .npz, torch, safetensors, arrays computed in the parent)
+  are copied once into a shared memory block.
+- Outputs and the float64 FedAvg sums live in shared memory blocks written by the
+  workers in place.
+
+Every output element is computed by exactly the same operations, in the same order,
+as in lib.aggregation, so results are bit-identical to single-process aggregation.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lib.aggregation import CHUNK_ELEMENTS, RobustAggregator, _fedavg_dtype
+
+# Elements per shard: small enough to balance the workers, large enough to amortize a task
+SHARD_ELEMENTS = 1 << 22
+MIN_SHARD_ELEMENTS = 1 << 16
+# Shards per worker to aim for, so uneven layers still balance
+SHARDS_PER_WORKER = 4
+_ALIGN = 64
+
+# (layer index, start, stop) over the layer's C-order flattening
+Range = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class LayerRef:
+    """Where a worker finds one layer: a np.memmap of `file`, or a view of shared memory block `shm`."""
+
+    shape: Tuple[int, ...]
+    dtype: str
+    offset: int
+    file: Optional[str] = None
+    shm: Optional[str] = None
+    fortran: bool = False
+
+
+class SharedLayers:
+    """Layers laid out back to back in one shared memory block, owned by the parent."""
+
+    def __init__(self, shapes: Sequence[Tuple[int, ...]], dtypes: Sequence[np.dtype]) -> None:
+        offsets = []
+        size = 0
+        for shape, dtype in zip(shapes, dtypes):
+            offsets.append(size)
+            size += -(-math.prod(shape) * np.dtype(dtype).itemsize // _ALIGN) * _ALIGN
+        # New blocks read as zeros (ftruncate'd shm / pagefile-backed mapping)
+        self._shm = SharedMemory(create=True, size=max(1, size))
+        self.refs = [LayerRef(tuple(shape), np.dtype(dtype).str, offset, shm=self._shm.name) for shape, dtype, offset in zip(shapes, dtypes, offsets)]
+
+    def arrays(self) -> List[np.ndarray]:
+        """Views of the layers; drop them before close()."""
+        return [np.ndarray(ref.shape, dtype=ref.dtype, buffer=self._shm.buf, offset=ref.offset) for ref in self.refs]
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+def _refs(nds: Sequence[np.ndarray]) -> Tuple[List[LayerRef], Optional[SharedLayers]]:
+    """LayerRefs for a child's layers, copying those workers cannot map into a new shared block."""
+    refs: List[Optional[LayerRef]] = []
+    copied: List[int] = []
+    for index, layer in enumerate(nds):
+        # Only a memmap that owns its mapping (not a view of one) has a meaningful offset
+        if isinstance(layer, np.memmap) and isinstance(layer.base, mmap.mmap) and layer.filename and os.path.exists(layer.filename):
+            fortran = not layer.flags.c_contiguous and layer.flags.f_contiguous
+            refs.append(LayerRef(layer.shape, layer.dtype.str, layer.offset, file=layer.filename, fortran=fortran))
+        else:
+            refs.append(None)
+            copied.append(index)
+    if not copied:
+        return refs, None
+    shared = SharedLayers([np.shape(nds[i]) for i in copied], [np.asarray(nds[i]).dtype for i in copied])
+    for index, view, ref in zip(copied, shared.arrays(), shared.refs):
+        view[...] = nds[index]
+        refs[index] = ref
+    return refs, shared
+
+
+# -------- Worker side ---------
+class _Opened:
+    """Arrays for LayerRefs inside a worker; shared blocks are attached once per task."""
+
+    def __init__(self) -> None:
+        self._blocks: Dict[str, SharedMemory] = {}
+
+    def flat(self, ref: LayerRef) -> np.ndarray:
+        if ref.file is not None:
+            array = np.memmap(ref.file, dtype=ref.dtype, mode="r", offset=ref.offset, shape=ref.shape, order="F" if ref.fortran else "C")
+        else:
+            block = self._blocks.get(ref.shm)
+            if block is None:
+                block = self._blocks[ref.shm] = SharedMemory(name=ref.shm)
+            array = np.ndarray(ref.shape, dtype=ref.dtype, buffer=block.buf, offset=ref.offset)
+        # As lib.aggregation flattens layers: C order
+        return array.reshape(-1)
+
+    def close(self) -> None:
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                # Views still held by a failing task's traceback; the mapping goes with them
+                pass
+        self._blocks.clear()
+
+
+def _accumulate_shard(ranges: Sequence[Range], refs: Sequence[LayerRef], sums: Sequence[LayerRef], weight: float, chunk_elements: int) -> None:
+    """sums += weight * layers over `ranges`, chunked exactly as WeightedAverage does."""
+    opened = _Opened()
+    try:
+        scratch = np.empty(0, dtype=np.float64)
+        for index, start, stop in ranges:
+            flat_in = opened.flat(refs[index])
+            flat_total = opened.flat(sums[index])
+            for begin in range(start, stop, chunk_elements):
+                end = min(begin + chunk_elements, stop)
+                if scratch.size < end - begin:
+                    scratch = np.empty(min(chunk_elements, stop - start), dtype=np.float64)
+                scaled = scratch[: end - begin]
+                np.multiply(flat_in[begin:end], weight, out=scaled, dtype=np.float64, casting="unsafe")
+                flat_total[begin:end] += scaled
+            del flat_in, flat_total
+    finally:
+        opened.close()
+
+
+def _divide_shard(ranges: Sequence[Range], sums: Sequence[LayerRef], total_examples: int) -> None:
+    opened = _Opened()
+    try:
+        for index, start, stop in ranges:
+            flat_total = opened.flat(sums[index])
+            flat_total[start:stop] /= total_examples
+            del flat_total
+    finally:
+        opened.close()
+
+
+def _reduce_shard(ranges: Sequence[Range], models: Sequence[Sequence[LayerRef]], out: Sequence[LayerRef], aggregator: RobustAggregator) -> None:
+    """Coordinate-wise reduction of `ranges`, in the aggregator's own row-blocks."""
+    opened = _Opened()
+    try:
+        for index, start, stop in ranges:
+            sliced = [[opened.flat(model[index])[start:stop]] for model in models]
+            flat_out = opened.flat(out[index])
+            for begin, end, rows in aggregator._blocks(sliced, 0):
+                flat_out[start + begin : start + end] = aggregator._reduce(rows)
+            del sliced, flat_out
+    finally:
+        opened.close()
+
+
+# -------- Parent side ---------
+class AggregationPool:
+    """
+    A process pool for sharded aggregation, shareable by several mergers.
+
+    Workers are spawned rather than forked, since the merger runs download and lease
+    threads. Tasks of concurrent merges interleave on the same workers.
+    """
+
+    def __init__(self, workers: int, shard_elements: int = SHARD_ELEMENTS) -> None:
+        self.workers = max(1, int(workers))
+        self.shard_elements = max(1, int(shard_elements))
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def shards(self, sizes: Sequence[int]) -> List[List[Range]]:
+        """Split layers of `sizes` elements into shards; small layers share one."""
+        total = sum(sizes)
+        target = min(self.shard_elements, max(MIN_SHARD_ELEMENTS, -(-total // (self.workers * SHARDS_PER_WORKER))))
+        shards: List[List[Range]] = []
+        current: List[Range] = []
+        filled = 0
+        for index, size in enumerate(sizes):
+            for start in range(0, size, target):
+                stop = min(start + target, size)
+                current.append((index, start, stop))
+                filled += stop - start
+                if filled >= target:
+                    shards.append(current)
+                    current, filled = [], 0
+        if current:
+            shards.append(current)
+        return shards
+
+    def run(self, fn: Callable[..., None], shards: Sequence[List[Range]], *args) -> None:
+        """Run fn(shard, *args) for every shard and wait; the first failure cancels the rest and is raised."""
+        futures = [self._executor.submit(fn, shard, *args) for shard in shards]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ShardedAverage:
+    """
+    WeightedAverage computed by an AggregationPool: same interface, same bits.
+
+    The float64 sums live in shared memory; each add() fans the child's shards out to
+    the workers and returns once all of them are folded in, so children are still
+    consumed one at a time as they finish downloading. A child's spool file must stay
+    on disk until its add() returns. Call close() to free the sums if result() is
+    never reached.
+    """
+
+    def __init__(self, pool: AggregationPool, chunk_elements: int = CHUNK_ELEMENTS) -> None:
+        self.pool = pool
+        self.chunk_elements = max(1, int(chunk_elements))
+        self.total_examples = 0
+        self.count = 0
+        self._sums: Optional[SharedLayers] = None
+        self._shapes: List[Tuple[int, ...]] = []
+        self._dtypes: List[np.dtype] = []
+        self._shards: List[List[Range]] = []
+
+    def add(self, nds: Sequence[np.ndarray], num_examples: int) -> None:
+        """Fold one model in. Raises ValueError if its layers differ from the first model's."""
+        if num_examples < 0:
+            raise ValueError("num_examples must be non-negative")
+        self._accumulate(nds, float(num_examples))
+        self.total_examples += num_examples
+        self.count += 1
+
+    def add_base(self, nds: Sequence[np.ndarray], weight: int) -> None:
+        """Add weight x nds to the sum without counting as a model (see WeightedAverage.add_base)."""
+        self._accumulate(nds, float(weight))
+
+    def _accumulate(self, nds: Sequence[np.ndarray], weight: float) -> None:
+        if self._sums is None:
+            self._shapes = [tuple(np.shape(layer)) for layer in nds]
+            self._dtypes = [np.asarray(layer).dtype for layer in nds]
+            self._sums = SharedLayers(self._shapes, [np.float64] * len(nds))
+            self._shards = self.pool.shards([math.prod(shape) for shape in self._shapes])
+        if len(nds) != len(self._shapes) or any(tuple(np.shape(a)) != s for a, s in zip(nds, self._shapes)):
+            raise ValueError("Model layers do not match the other models in the group")
+
+        refs, shared = _refs(nds)
+        try:
+            self.pool.run(_accumulate_shard, self._shards, refs, self._sums.refs, weight, self.chunk_elements)
+        finally:
+            if shared is not None:
+                shared.close()
+
+    def result(self) -> List[np.ndarray]:
+        """The averaged layers. Consumes the accumulator."""
+        if self._sums is None:
+            raise ValueError("No models were added")
+        if self.total_examples == 0:
+            raise ValueError("Cannot average models with zero total examples")
+        try:
+            self.pool.run(_divide_shard, self._shards, self._sums.refs, self.total_examples)
+            totals = self._sums.arrays()
+            averaged = [total.astype(_fedavg_dtype(dtype)) for total, dtype in zip(totals, self._dtypes)]
+            del totals
+        finally:
+            self.close()
+        return averaged
+
+    def close(self) -> None:
+        if self._sums is not None:
+            self._sums.close()
+            self._sums = None
+
+
+def aggregate_sharded(pool: AggregationPool, aggregator: RobustAggregator, models: Sequence[Sequence[np.ndarray]], num_examples: Sequence[int]) -> List[np.ndarray]:
+    """
+    aggregator.aggregate over the pool when it is elementwise (median, trimmed mean).
+
+    Other strategies (Krum's distances sum over whole models) run in this process.
+    """
+    if not aggregator.elementwise:
+        return aggregator.aggregate(models, num_examples)
+    aggregator._check_layers(models)
+    first = models[0]
+    shapes = [tuple(np.shape(layer)) for layer in first]
+    out = SharedLayers(shapes, [_fedavg_dtype(np.asarray(layer).dtype) for layer in first])
+    owned: List[SharedLayers] = []
+    try:
+        refs = []
+        for model in models:
+            model_refs, shared = _refs(model)
+            refs.append(model_refs)
+            if shared is not None:
+                owned.append(shared)
+        pool.run(_reduce_shard, pool.shards([math.prod(shape) for shape in shapes]), refs, out.refs, aggregator)
+        views = out.arrays()
+        result = [view.copy() for view in views]
+        del views
+    finally:
+        for shared in owned:
+            shared.close()
+        out.close()
+    return result
@@ -0,0 +1,119 @@
+"""
+Persistent polling state for the merger.
+
+The state file records:
+- the commit cursor: the newest ``createdAt`` seen, plus the hashes seen at exactly
+  that timestamp (the backend's ``since`` filter is inclusive);
+- pending children: commits fetched but whose parent group is not merged yet,
+  so a restart does not need to refetch history to rebuild groups;
+- merged parents: parent hash -> merge commit hash, so a group is merged once.
+
+It is rewritten atomically after every change, so a crash loses at most the
+commits of the poll in flight, which the unchanged cursor refetches.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+STATE_VERSION = 1
+# Merged parents remembered; older ones are dropped first (their children are long gone)
+MAX_MERGED = 10000
+
+
+class MergerState:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else None
+        self.cursor_time: Optional[str] = None
+        self.cursor_hashes: List[str] = []
+        self.pending: Dict[str, Dict[str, dict]] = {}
+        self.merged: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "MergerState":
+        state = cls(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return state
+        if data.get("version") != STATE_VERSION:
+            return state
+        state.cursor_time = data.get("cursorTime")
+        state.cursor_hashes = list(data.get("cursorHashes") or [])
+        state.pending = {parent: dict(children) for parent, children in (data.get("pending") or {}).items()}
+        state.merged = dict(data.get("merged") or {})
+        return state
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": STATE_VERSION,
+                    "cursorTime": self.cursor_time,
+                    "cursorHashes": self.cursor_hashes,
+                    "pending": self.pending,
+                    "merged": self.merged,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+    def unseen(self, commits: Iterable[dict]) -> List[dict]:
+        """Drop commits at the cursor's timestamp that an earlier page or poll already returned."""
+        seen = set(self.cursor_hashes)
+        return [c for c in commits if not (c.get("createdAt") == self.cursor_time and c.get("commitHash") in seen)]
+
+    def advance(self, commits: Iterable[dict]) -> None:
+        """Move the cursor past commits (oldest first, as the backend returns them)."""
+        for c in commits:
+            created = c.get("createdAt")
+            if not created:
+                continue
+            if created != self.cursor_time:
+                self.cursor_time, self.cursor_hashes = created, []
+            self.cursor_hashes.append(c.get("commitHash"))
+
+    def add_pending(self, commits: Iterable[dict]) -> int:
+        """Track new children under their parent, skipping parents already merged. Returns: Commits added"""
+        added = 0
+        for c in commits:
+            parent = c.get("previousCommitHash") or ""
+            if parent in self.merged:
+                continue
+            self.pending.setdefault(parent, {})[c["commitHash"]] = c
+            added += 1
+        return added
+
+    def pending_commits(self) -> List[dict]:
+        return [c for children in self.pending.values() for c in children.values()]
+
+    def mark_merged(self, parent_hash: str, merge_commit_hash: str) -> None:
+        self.pending.pop(parent_hash, None)
+        self.merged[parent_hash] = merge_commit_hash
+        while len(self.merged) > MAX_MERGED:
+            del self.merged[next(iter(self.merged))]
+
+
+class AdaptiveInterval:
+    """Poll interval that doubles while idle, up to `maximum`, and resets on activity."""
+
+    def __init__(self, base: float, maximum: float) -> None:
+        self.base = base
+        self.maximum = max(base, maximum)
+        self.current = base
+
+    def next(self, active: bool) -> float:
+        if active:
+            self.current = self.base
+            return self.base
+        interval = self.current
+        self.current = min(self.maximum, self.current * 2)
+        return interval
@@ -0,0 +1,68 @@
+"""
+Streaming request bodies for the merger's uploads.
+
+requests sends a file-like body with a known length by reading it incrementally,
+so these let a spooled params file be PUT raw or wrapped in multipart/form-data
+without loading it (``files=`` would build the whole multipart body in memory).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterator, List, Tuple, Union
+
+CHUNK_SIZE = 1 << 20
+
+
+class StreamingBody:
+    """A read-once body concatenated from parts: bytes, or paths of files read in chunks."""
+
+    def __init__(self, parts: List[Union[bytes, Path]]) -> None:
+        self._parts = parts
+        self.len = sum(len(p) if isinstance(p, bytes) else Path(p).stat().st_size for p in parts)
+        self._chunks: Iterator[bytes] = self._iter_chunks()
+        self._current = memoryview(b"")
+
+    def __len__(self) -> int:
+        return self.len
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            with open(part, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data = bytes(self._current) + b"".join(self._chunks)
+            self._current = memoryview(b"")
+            return data
+        while not self._current:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._current = memoryview(chunk)
+        # Short reads are fine for file-like bodies; never copy more than one chunk
+        data, self._current = bytes(self._current[:size]), self._current[size:]
+        return data
+
+
+def multipart_file_body(
+    field: str, filename: str, path: Path, data: dict, content_type: str = "application/octet-stream"
+) -> Tuple[StreamingBody, str]:
+    """A streaming multipart/form-data body with text `data` fields and one file. Returns: (body, content type)"""
+    boundary = f"flair-merger-{os.urandom(12).hex()}"
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        for key, value in data.items()
+    )
+    head += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return StreamingBody([head, Path(path), tail]), f"multipart/form-data; boundary={boundary}"
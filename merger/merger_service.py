@@ -1,8 +1,16 @@
 """
 Commit-based merger service for Flair.
 
-- Reads plain commits from repository_manager commit endpoints.
-- Aggregates model parameters with Flower FedAvg (using AsyncFederatedNode._aggregate).
+- Reads new commits incrementally (createdAt cursor + paging) and keeps pending groups, the cursor
+  and merged parents in a local state file (lib.poll_state), so each poll costs O(new commits).
+- Downloads child params concurrently into spool files, verifying each against its paramHash (lib.downloads).
+- DELTA children are aggregated as deltas and added to the shared parent's params, which are rebuilt once per
+  parent (nearest checkpoint + deltas) and cached; downloads scale with the children's delta sizes.
+- Aggregates model parameters with weighted FedAvg, streaming one child at a time, or with a robust
+  strategy (coordinate median, trimmed mean, Krum) over memory-mapped children in row-blocks (lib.aggregation).
+  With AGGREGATION_WORKERS > 1, layers are split into shards aggregated by a process pool over shared
+  memory and the mapped spool files, with bit-identical results (lib.parallel).
+- Writes the aggregate once to a spooled .npz, hashed as it is written (lib.encoders), and streams it to every upload.
 - Creates a new merge commit via the existing commit creation pipeline.
 - Uploads aggregated params/metrics to the shared-folder endpoints (ephemeral) for the merger wallet.
 
@@ -11,7 +19,8 @@ Assumptions (all satisfied by existing code):
 - Shared folder routes mounted at /repo/hash/<repoHash>/branch/hash/<branchHash>/commit/sharedFolder/...
 - Commit controller implements the initiate → zkml-check → zkml-upload → params-upload → finalize flow.
 - Params blobs are consistent across commits (same architecture hash, same tensor shapes).
-- Models are stored as pickled ndarrays or torch state_dict; anything else is rejected.
+- Models are stored as .npz, zip-format torch state_dicts or safetensors (lib.decoders); pickles are
+  rejected unless ALLOW_PICKLE_PARAMS is set.
 
 Environment/config expected (pass via CLI or env):
 - FLAIR_BASE_URL
@@ -20,7 +29,15 @@ Environment/config expected (pass via CLI or env):
 - FLAIR_WALLET (merger wallet / committerAddress)
 - FLAIR_AUTH_TOKEN (Bearer ...)
 - MIN_CHILD_COMMITS (default 2)
-- POLL_INTERVAL_SEC (default 30)
+- POLL_INTERVAL_SEC (default 30); idle polls back off by doubling up to POLL_MAX_INTERVAL_SEC (default 300)
+- MERGER_STATE_FILE (default merger_state.json), COMMIT_PAGE_SIZE (default 200)
+- LEASE_BACKEND (none | file | http; default none), LEASE_DIR (file, default merger_leases),
+  LEASE_URL (http), LEASE_TTL_SEC (default 60): required when running more than one instance
+- DOWNLOAD_WORKERS (default 4), DOWNLOAD_RETRIES (default 3), SPOOL_DIR (default: system temp dir)
+- AGGREGATOR (fedavg | median | trimmed_mean | krum; default fedavg), AGGREGATOR_TRIM (trimmed_mean, default 0.1),
+  AGGREGATOR_BYZANTINE / AGGREGATOR_MULTI (krum, default 0 / 1)
+- AGGREGATION_WORKERS (default 1: aggregate in this process)
+- ALLOW_PICKLE_PARAMS (default 0; executes contributor pickles, enable only for trusted branches)
 - ZK_PROOF_CID / ZK_SETTINGS_CID / ZK_VK_CID (for checkZKMLProof)
 - ZK_PROOF_PATH / ZK_SETTINGS_PATH / ZK_VK_PATH (for uploadZKMLProofs)
 
@@ -29,52 +46,44 @@ This service is intentionally headless (no SDK) and uses only the existing HTTP
 
 from __future__ import annotations
 
-import hashlib
 import json
 import logging
 import os
-import pickle
+import threading
 import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import requests
-from flwr.common import ndarrays_to_parameters, parameters_to_ndarrays
-from flwr.server.strategy import FedAvg
-from flwr_serverless.federated_node.aggregatable import Aggregatable
-from flwr_serverless.federated_node.async_federated_node import AsyncFederatedNode
-from flwr_serverless.shared_folder.base_folder import SharedFolder
 
-try:
-    import torch  # Optional, for torch state_dict inputs
-except Exception:  # pragma: no cover - torch is optional
-    torch = None
+from lib.aggregation import RobustAggregator, WeightedAverage, make_aggregator
+from lib.decoders import decode_params
+from lib.downloads import DEFAULT_RETRIES, DEFAULT_WORKERS, ParamsDownloader
+from lib.encoders import spool_npz
+from lib.leases import (
+    DEFAULT_TTL_SEC,
+    FileLeaseBackend,
+    HttpLeaseBackend,
+    LeaseBackend,
+    LeaseKeeper,
+    default_owner,
+    lease_key,
+)
+from lib.parallel import AggregationPool, ShardedAverage, aggregate_sharded
+from lib.poll_state import AdaptiveInterval, MergerState
+from lib.uploads import StreamingBody, multipart_file_body
 
 LOGGER = logging.getLogger("flair.merger")
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(levelname)s %(message)s")
 
-
-class InMemoryFolder(SharedFolder):
-    """Minimal SharedFolder impl so AsyncFederatedNode can run _aggregate."""
-
-    def __init__(self) -> None:
-        self._store: Dict[str, bytes] = {}
-
-    def get(self, key, default=None):
-        return self._store.get(key, default)
-
-    def __getitem__(self, key):
-        return self._store[key]
-
-    def __setitem__(self, key, value):
-        self._store[key] = value
-
-    def __len__(self):
-        return len(self._store)
-
-    def items(self):
-        return self._store.items()
+GENESIS_COMMIT_HASH = "_GENESIS_COMMIT_"
+# Rebuilt parent params kept as spooled .npz files; groups of one parent usually merge back to back
+PARENT_CACHE_SIZE = 4
 
 
 @dataclass
@@ -86,6 +95,13 @@ class CommitInfo:
     num_examples: int
     committer: str
     metrics: Dict[str, float]
+    param_hash: str = ""
+    # CHECKPOINT: params_uri holds full params; DELTA: it holds params minus the parent's
+    commit_type: str = "CHECKPOINT"
+
+    @property
+    def is_delta(self) -> bool:
+        return self.commit_type == "DELTA"
 
 
 class FlairMerger:
@@ -98,16 +114,54 @@ class FlairMerger:
         auth_token: str,
         min_children: int = 2,
         poll_interval: int = 30,
+        download_workers: int = DEFAULT_WORKERS,
+        download_retries: int = DEFAULT_RETRIES,
+        spool_dir: Optional[str] = None,
+        allow_pickle: bool = False,
+        state_path: Optional[str] = None,
+        max_poll_interval: int = 300,
+        page_size: int = 200,
+        session: Optional[requests.Session] = None,
+        downloader: Optional[ParamsDownloader] = None,
+        lease_backend: Optional[LeaseBackend] = None,
+        lease_ttl: float = DEFAULT_TTL_SEC,
+        aggregator: Optional[RobustAggregator] = None,
+        aggregation_pool: Optional[AggregationPool] = None,
     ) -> None:
+        self.repo_hash = repo_hash
+        self.branch_hash = branch_hash
         self.base_commit = f"{base_url}/repo/hash/{repo_hash}/branch/hash/{branch_hash}/commit"
         self.base_shared = f"{self.base_commit}/sharedFolder"
         self.wallet = wallet
-        self.session = requests.Session()
-        self.session.headers.update({"Authorization": auth_token})
+        # session/downloader may be shared across mergers (see scheduler_service)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"Authorization": auth_token})
+        self.session = session
         self.min_children = min_children
         self.poll_interval = poll_interval
-        self.strategy = FedAvg()
-        self._agg_node = AsyncFederatedNode(shared_folder=InMemoryFolder(), strategy=self.strategy, node_id="MERGER")
+        # Params URIs point at storage gateways, so downloads use their own session without the auth header
+        self.downloader = downloader or ParamsDownloader(max_workers=download_workers, retries=download_retries, spool_dir=spool_dir)
+        self.allow_pickle = allow_pickle
+        self.spool_dir = spool_dir
+        # None: streaming weighted FedAvg
+        self.aggregator = aggregator
+        # None: aggregate in this process; may be shared across mergers
+        self.aggregation_pool = aggregation_pool
+        self.state = MergerState.load(Path(state_path)) if state_path else MergerState()
+        self.interval = AdaptiveInterval(poll_interval, max_poll_interval)
+        self.page_size = page_size
+        # Polls and merges of one merger may run on different threads under the scheduler
+        self._state_lock = threading.Lock()
+        # Without a lease backend this instance assumes it is the only merger of the branch
+        self.lease_backend = lease_backend
+        self.lease_ttl = lease_ttl
+        self.owner = default_owner()
+        # parent hash -> spooled full params, least recently used first
+        self._parent_cache: "OrderedDict[str, Path]" = OrderedDict()
+        # spool file -> merges using it; pool workers open parent files by name, so pinned files outlive eviction
+        self._parent_pins: "Counter[Path]" = Counter()
+        self._parent_lock = threading.Lock()
 
     # -------- Fetch commits ---------
     def fetch_commits(self) -> List[dict]:
@@ -115,45 +169,191 @@ class FlairMerger:
         resp.raise_for_status()
         return resp.json().get("data", [])
 
+    def fetch_new_commits(self) -> List[dict]:
+        """Commits created since the cursor, oldest first, fetched page by page. Advances the cursor (unsaved)."""
+        new: List[dict] = []
+        while True:
+            params = {"limit": self.page_size}
+            if self.state.cursor_time:
+                # Commits already seen at the cursor's timestamp come first; skip them server-side
+                params.update(since=self.state.cursor_time, skip=len(self.state.cursor_hashes))
+            resp = self.session.get(f"{self.base_commit}/", params=params)
+            resp.raise_for_status()
+            page = resp.json().get("data", [])
+            fresh = self.state.unseen(page)
+            self.state.advance(fresh)
+            new.extend(fresh)
+            # A short page is the end; a page of only already-seen commits means the server ignored skip
+            if len(page) < self.page_size or not fresh:
+                return new
+
     def fetch_commit_detail(self, commit_hash: str) -> dict:
         resp = self.session.get(f"{self.base_commit}/hash/{commit_hash}/pull")
         resp.raise_for_status()
         return resp.json()["data"]
 
     # -------- Download & decode params ---------
-    def _download_params_blob(self, uri: str) -> bytes:
-        r = requests.get(uri, stream=True)
-        r.raise_for_status()
-        return r.content
+    def _decode_ndarrays(self, path: Path) -> List[np.ndarray]:
+        """Layers as views over the spooled file (see lib.decoders); pickle only if allowed."""
+        return decode_params(path, allow_pickle=self.allow_pickle)
+
+    @contextmanager
+    def _parent_params(self, parent_hash: str) -> Iterator[List[np.ndarray]]:
+        """Full params of a parent commit, rebuilt once and then served from the parent cache.
+
+        The spool file is pinned while the block runs: an entry evicted meanwhile is
+        unlinked only when its last user releases it.
+        """
+        with self._parent_lock:
+            path = self._parent_cache.get(parent_hash)
+            if path is None:
+                path = self._rebuild_params(parent_hash)
+                self._parent_cache[parent_hash] = path
+                while len(self._parent_cache) > PARENT_CACHE_SIZE:
+                    evicted = self._parent_cache.popitem(last=False)[1]
+                    if not self._parent_pins[evicted]:
+                        evicted.unlink(missing_ok=True)
+            self._parent_cache.move_to_end(parent_hash)
+            self._parent_pins[path] += 1
+        try:
+            yield self._decode_ndarrays(path)
+        finally:
+            with self._parent_lock:
+                self._parent_pins[path] -= 1
+                if not self._parent_pins[path]:
+                    del self._parent_pins[path]
+                    if path not in self._parent_cache.values():
+                        path.unlink(missing_ok=True)
+
+    def _is_checkpoint(self, commit: dict) -> bool:
+        # Merge commits always hold full params; so does a branch's first commit, whatever its recorded type
+        return (
+            (commit.get("commitType") or "").upper() == "CHECKPOINT"
+            or commit.get("committerAddress") == self.wallet
+            or (commit.get("previousCommitHash") or GENESIS_COMMIT_HASH) == GENESIS_COMMIT_HASH
+        )
 
-    def _decode_ndarrays(self, blob: bytes) -> List[np.ndarray]:
-        """Accepts pickled ndarray list or torch state_dict. Reject otherwise."""
+    def _rebuild_params(self, commit_hash: str) -> Path:
+        """Spool the full params of a commit: its nearest checkpoint ancestor plus the deltas after it."""
+        chain: List[Tuple[str, Optional[str]]] = []
+        while True:
+            if not commit_hash or commit_hash == GENESIS_COMMIT_HASH:
+                raise ValueError("Reached the genesis commit without finding a checkpoint")
+            detail = self.fetch_commit_detail(commit_hash)
+            uri = ((detail.get("params") or {}).get("ipfsObject") or {}).get("uri")
+            if not uri:
+                raise ValueError(f"Commit {commit_hash} has no params to rebuild its parent from")
+            chain.append((uri, detail.get("paramHash") or None))
+            if self._is_checkpoint(detail):
+                break
+            commit_hash = detail.get("previousCommitHash") or ""
+        chain.reverse()
+
+        spooled = self.downloader.fetch_all(chain)
         try:
-            obj = pickle.loads(blob)
-            if isinstance(obj, (list, tuple)) and all(hasattr(x, "shape") for x in obj):
-                return [np.array(x) for x in obj]
-            if torch and isinstance(obj, dict) and all(hasattr(v, "shape") for v in obj.values()):
-                # deterministic order by key
-                return [v.detach().cpu().numpy() for k, v in sorted(obj.items())]
-        except Exception:
-            pass
-        raise ValueError("Unsupported parameter format; expected pickled ndarrays or torch state_dict")
+            checkpoint_path = next(spooled)
+            if len(chain) == 1:
+                return checkpoint_path
+            try:
+                # Deltas are added in the params' own dtype, as `flair` reconstructs them
+                current = [np.array(layer) for layer in self._decode_ndarrays(checkpoint_path)]
+            finally:
+                checkpoint_path.unlink(missing_ok=True)
+            for path in spooled:
+                try:
+                    delta = self._decode_ndarrays(path)
+                finally:
+                    path.unlink(missing_ok=True)
+                if len(delta) != len(current) or any(d.shape != c.shape for d, c in zip(delta, current)):
+                    raise ValueError("Delta layers do not match the checkpoint they apply to")
+                current = [c + d for c, d in zip(current, delta)]
+                del delta
+        finally:
+            spooled.close()
+        path, _, _ = spool_npz(current, self.spool_dir)
+        return path
 
     # -------- Aggregation ---------
-    def _aggregate(self, models: List[Tuple[List[np.ndarray], int]]) -> Tuple[List[np.ndarray], dict]:
-        aggregatables: List[Aggregatable] = []
-        for nds, num_ex in models:
-            params = ndarrays_to_parameters(nds)
-            aggregatables.append(Aggregatable(parameters=params, num_examples=num_ex, metrics={"num_examples": num_ex}))
-        updated = self._agg_node._aggregate(aggregatables)  # type: ignore[protected-access]
-        nds = parameters_to_ndarrays(updated.parameters)
-        return nds, updated.metrics or {}
+    def _aggregate(self, commits: List[CommitInfo]) -> Tuple[List[np.ndarray], dict, str]:
+        """Weighted FedAvg over a group, one child at a time, unless a robust aggregator is set.
+
+        Children are downloaded concurrently to spool files and consumed in order, so
+        each is decoded and folded into the running float64 sum while the next ones are
+        still downloading; memory stays at about two models for any group size.
+
+        DELTA children are summed as deltas and the shared parent P is added once with
+        their combined weight: sum(w_i * (P + d_i)) = W * P + sum(w_i * d_i).
+        """
+        arch = commits[0].architecture
+        if any(c.architecture != arch for c in commits):
+            raise ValueError("Architecture mismatch within group; skipping merge")
+        if self.aggregator is not None and len(commits) >= self.aggregator.min_children:
+            return self._aggregate_robust(commits), {"num_examples": sum(c.num_examples for c in commits)}, arch
+        if self.aggregator is not None:
+            LOGGER.warning(
+                "%s needs %d children, group of parent=%s has %d; using FedAvg",
+                self.aggregator.name, self.aggregator.min_children, commits[0].parent_hash, len(commits),
+            )
+        average = ShardedAverage(self.aggregation_pool) if self.aggregation_pool is not None else WeightedAverage()
+        spooled = self.downloader.fetch_all([(c.params_uri, c.param_hash or None) for c in commits])
+        pinned = self._parent_params(commits[0].parent_hash) if any(c.is_delta for c in commits) else nullcontext()
+        try:
+            with pinned as parent:
+                if parent is not None:
+                    average.add_base(parent, sum(c.num_examples for c in commits if c.is_delta))
+                for c, path in zip(commits, spooled):
+                    try:
+                        nds = self._decode_ndarrays(path)
+                        average.add(nds, c.num_examples)
+                    finally:
+                        # Pool workers map the file itself, so it is kept until add() returns
+                        path.unlink(missing_ok=True)
+                    del nds
+                return average.result(), {"num_examples": average.total_examples}, arch
+        finally:
+            spooled.close()
+            average.close()
+
+    def _aggregate_robust(self, commits: List[CommitInfo]) -> List[np.ndarray]:
+        """Robust strategies see all children at once, as views over their spool files (stored formats map; compressed npz is read).
+
+        With DELTA children the group is aggregated as deltas against the parent (full
+        children have the parent subtracted) and the parent is added to the result:
+        median, trimmed mean and Krum's distances are all unchanged by that shift.
+        """
+        pinned = self._parent_params(commits[0].parent_hash) if any(c.is_delta for c in commits) else nullcontext()
+        with pinned as parent:
+            models: List[List[np.ndarray]] = []
+            paths: List[Path] = []
+            spooled = self.downloader.fetch_all([(c.params_uri, c.param_hash or None) for c in commits])
+            try:
+                for c, path in zip(commits, spooled):
+                    paths.append(path)
+                    nds = self._decode_ndarrays(path)
+                    if parent is not None and not c.is_delta:
+                        nds = [layer - base for layer, base in zip(nds, parent)]
+                    models.append(nds)
+                num_examples = [c.num_examples for c in commits]
+                if self.aggregation_pool is not None:
+                    result = aggregate_sharded(self.aggregation_pool, self.aggregator, models, num_examples)
+                else:
+                    result = self.aggregator.aggregate(models, num_examples)
+            finally:
+                spooled.close()
+                # Pool workers map the files themselves, so they are kept until aggregation is done
+                for path in paths:
+                    path.unlink(missing_ok=True)
+            if parent is None:
+                return result
+            return [(base + layer).astype(layer.dtype, copy=False) for base, layer in zip(parent, result)]
 
     # -------- Shared folder helpers (for merger wallet) ---------
-    def _upload_model_to_shared(self, model_bytes: bytes) -> None:
-        # /files/:committerAddress expects raw body
+    def _upload_model_to_shared(self, model_path: Path) -> None:
+        # /files/:committerAddress expects raw body; streamed from the spool file
         resp = self.session.put(
-            f"{self.base_shared}/files/{self.wallet}", data=model_bytes, headers={"Content-Type": "application/octet-stream"}
+            f"{self.base_shared}/files/{self.wallet}",
+            data=StreamingBody([model_path]),
+            headers={"Content-Type": "application/octet-stream"},
         )
         resp.raise_for_status()
 
@@ -208,16 +408,21 @@ class FlairMerger:
         r.raise_for_status()
         return r.json()["zkmlReceiptToken"]
 
-    def _upload_params(self, session_id: str, initiate_token: str, zkml_receipt: str, params_bytes: bytes, file_ext: str = "bin") -> Tuple[str, str]:
-        files = {"file": (f"params.{file_ext}", params_bytes, "application/octet-stream")}
-        data = {"sessionId": session_id, "initiateToken": initiate_token, "zkmlReceiptToken": zkml_receipt}
-        r = self.session.post(f"{self.base_commit}/create/params-upload", files=files, data=data)
+    def _upload_params(
+        self, session_id: str, initiate_token: str, zkml_receipt: str, params_path: Path, param_hash: str, file_ext: str = "npz"
+    ) -> Tuple[str, str]:
+        data = {"sessionId": session_id, "initiateToken": initiate_token, "zkmlReceiptToken": zkml_receipt, "paramHash": param_hash}
+        body, content_type = multipart_file_body("params", f"params.{file_ext}", params_path, data)
+        r = self.session.post(f"{self.base_commit}/create/params-upload", data=body, headers={"Content-Type": content_type})
         r.raise_for_status()
         body = r.json()
         return body["paramsReceiptToken"], body["paramsCid"]
 
     def _finalize(self, initiate_token: str, zkml_receipt: str, params_receipt: str, param_hash: str, architecture: str, message: str) -> str:
         payload = {
+            # Merge commits carry the aggregated full params
+            "commitHash": str(uuid.uuid4()),
+            "commitType": "CHECKPOINT",
             "message": message,
             "paramHash": param_hash,
             "architecture": architecture,
@@ -251,67 +456,111 @@ class FlairMerger:
                 num_examples=num_examples,
                 committer=c.get("committerAddress", ""),
                 metrics=metrics,
+                param_hash=c.get("paramHash") or "",
+                commit_type="CHECKPOINT" if self._is_checkpoint(c) else "DELTA",
             )
             groups.setdefault(parent, []).append(info)
         return {p: lst for p, lst in groups.items() if len(lst) >= self.min_children}
 
-    def _build_models(self, commits: List[CommitInfo]) -> Tuple[List[Tuple[List[np.ndarray], int]], str]:
-        arch = commits[0].architecture
-        models: List[Tuple[List[np.ndarray], int]] = []
-        for c in commits:
-            if c.architecture != arch:
-                raise ValueError("Architecture mismatch within group; skipping merge")
-            blob = self._download_params_blob(c.params_uri)
-            nds = self._decode_ndarrays(blob)
-            models.append((nds, c.num_examples))
-        return models, arch
-
-    def _hash_params(self, nds: List[np.ndarray]) -> str:
-        h = hashlib.sha256()
-        for arr in nds:
-            h.update(arr.tobytes())
-        return h.hexdigest()
-
-    def run_once(self) -> None:
-        commits = self.fetch_commits()
-        groups = self._select_groups(commits)
-        if not groups:
-            LOGGER.info("No mergeable groups found")
-            return
+    def poll(self) -> Tuple[int, Dict[str, List[CommitInfo]]]:
+        """Fetch new commits into pending state. Returns: (new commits seen, groups ready to merge)"""
+        with self._state_lock:
+            new_commits = self.fetch_new_commits()
+            # Skip commits authored by merger wallet to avoid re-merging; they also mark their
+            # parent merged, including merges made by other instances
+            for c in new_commits:
+                if c.get("committerAddress") == self.wallet and c.get("previousCommitHash"):
+                    self.state.mark_merged(c["previousCommitHash"], c["commitHash"])
+            self.state.add_pending(c for c in new_commits if c.get("committerAddress") != self.wallet)
+            self.state.save()
+            return len(new_commits), self._select_groups(self.state.pending_commits())
+
+    def merge_group(self, parent_hash: str, children: List[CommitInfo]) -> Optional[str]:
+        """Aggregate one group and create its merge commit. Returns: The merge commit hash, or None on failure"""
+        with self._state_lock:
+            # A poll that started before this group's earlier merge finished can hand it out again
+            if parent_hash in self.state.merged:
+                return self.state.merged[parent_hash]
+        if self.lease_backend is None:
+            return self._merge_group(parent_hash, children, None)
 
+        try:
+            acquired = self.lease_backend.acquire(lease_key(self.repo_hash, self.branch_hash, parent_hash), self.owner, self.lease_ttl)
+        except Exception as exc:
+            LOGGER.warning("Could not acquire lease for parent=%s: %s", parent_hash, exc)
+            return None
+        if acquired.done:
+            LOGGER.info("Parent %s was already merged as %s by another instance", parent_hash, acquired.done)
+            with self._state_lock:
+                self.state.mark_merged(parent_hash, acquired.done)
+                self.state.save()
+            return acquired.done
+        if acquired.lease is None:
+            LOGGER.info("Parent %s is being merged by another instance", parent_hash)
+            return None
+        with LeaseKeeper(self.lease_backend, acquired.lease, self.lease_ttl) as keeper:
+            commit_hash = self._merge_group(parent_hash, children, keeper)
+            if commit_hash:
+                keeper.complete(commit_hash)
+            return commit_hash
+
+    def _merge_group(self, parent_hash: str, children: List[CommitInfo], keeper: Optional[LeaseKeeper]) -> Optional[str]:
+        LOGGER.info("Merging %d commits with parent %s", len(children), parent_hash)
+        agg_path: Optional[Path] = None
+        try:
+            agg_nds, agg_metrics, architecture = self._aggregate(children)
+            agg_path, param_hash, _ = spool_npz(agg_nds, self.spool_dir)
+            del agg_nds
+
+            # Upload ephemeral shared-folder artifacts for merger wallet
+            self._upload_model_to_shared(agg_path)
+            self._upload_metrics_after(agg_metrics)
+
+            # Commit creation pipeline
+            session_id, init_tok = self._initiate(parent_hash)
+            zkml_tok = self._zkml_check(session_id, init_tok)
+            zkml_receipt = self._zkml_upload(session_id, init_tok, zkml_tok)
+            params_receipt, _ = self._upload_params(session_id, init_tok, zkml_receipt, agg_path, param_hash)
+            if keeper is not None:
+                # Last point at which another instance may have taken the group over
+                keeper.check()
+            commit_hash = self._finalize(
+                initiate_token=init_tok,
+                zkml_receipt=zkml_receipt,
+                params_receipt=params_receipt,
+                param_hash=param_hash,
+                architecture=architecture,
+                message=f"Merged {len(children)} commits from parent {parent_hash}",
+            )
+            LOGGER.info("Created merge commit %s", commit_hash)
+            with self._state_lock:
+                self.state.mark_merged(parent_hash, commit_hash)
+                self.state.save()
+            return commit_hash
+        except Exception as exc:  # pragma: no cover - runtime protection
+            LOGGER.exception("Failed to merge group parent=%s: %s", parent_hash, exc)
+            return None
+        finally:
+            if agg_path is not None:
+                agg_path.unlink(missing_ok=True)
+
+    def run_once(self) -> int:
+        """Fetch new commits and merge every pending group that is ready. Returns: New commits seen"""
+        new_commits, groups = self.poll()
+        if not groups:
+            LOGGER.info("No mergeable groups found (%d new commits)", new_commits)
         for parent_hash, children in groups.items():
-            LOGGER.info("Merging %d commits with parent %s", len(children), parent_hash)
-            try:
-                models, architecture = self._build_models(children)
-                agg_nds, agg_metrics = self._aggregate(models)
-                agg_blob = pickle.dumps(agg_nds)
-                param_hash = self._hash_params(agg_nds)
-
-                # Upload ephemeral shared-folder artifacts for merger wallet
-                self._upload_model_to_shared(agg_blob)
-                self._upload_metrics_after(agg_metrics or {"num_examples": sum(n for _, n in models)})
-
-                # Commit creation pipeline
-                session_id, init_tok = self._initiate(parent_hash)
-                zkml_tok = self._zkml_check(session_id, init_tok)
-                zkml_receipt = self._zkml_upload(session_id, init_tok, zkml_tok)
-                params_receipt, _ = self._upload_params(session_id, init_tok, zkml_receipt, agg_blob)
-                commit_hash = self._finalize(
-                    initiate_token=init_tok,
-                    zkml_receipt=zkml_receipt,
-                    params_receipt=params_receipt,
-                    param_hash=param_hash,
-                    architecture=architecture,
-                    message=f"Merged {len(children)} commits from parent {parent_hash}",
-                )
-                LOGGER.info("Created merge commit %s", commit_hash)
-            except Exception as exc:  # pragma: no cover - runtime protection
-                LOGGER.exception("Failed to merge group parent=%s: %s", parent_hash, exc)
+            self.merge_group(parent_hash, children)
+        return new_commits
 
     def loop_forever(self) -> None:
         while True:
-            self.run_once()
-            time.sleep(self.poll_interval)
+            try:
+                new_commits = self.run_once()
+            except requests.RequestException as exc:
+                LOGGER.warning("Poll failed: %s", exc)
+                new_commits = 0
+            time.sleep(self.interval.next(active=new_commits > 0))
 
 
 def _env(name: str, default: Optional[str] = None) -> str:
@@ -321,6 +570,56 @@ def _env(name: str, default: Optional[str] = None) -> str:
     return val
 
 
+def _lease_backend_from_env() -> Optional[LeaseBackend]:
+    kind = os.environ.get("LEASE_BACKEND", "none").lower()
+    if kind == "file":
+        return FileLeaseBackend(os.environ.get("LEASE_DIR", "merger_leases"))
+    if kind == "http":
+        return HttpLeaseBackend(_env("LEASE_URL"))
+    if kind != "none":
+        raise RuntimeError(f"Unknown LEASE_BACKEND {kind!r}; expected none, file or http")
+    return None
+
+
+def _aggregation_pool_from_env() -> Optional[AggregationPool]:
+    workers = int(os.environ.get("AGGREGATION_WORKERS", "1"))
+    return AggregationPool(workers) if workers > 1 else None
+
+
+def _aggregator_from_config(config: Dict[str, str], min_children: int) -> Optional[RobustAggregator]:
+    """Robust aggregator from AGGREGATOR* style settings (env, or a scheduler target's "aggregator" object).
+
+    Raises ValueError when groups of `min_children` are too small for the strategy
+    (Krum needs more than byzantine + 2 children).
+    """
+    name = config.get("name") or "fedavg"
+    options: Dict[str, float] = {}
+    if name == "trimmed_mean" and config.get("trim") is not None:
+        options["trim"] = float(config["trim"])
+    if name == "krum":
+        options["byzantine"] = int(config.get("byzantine") or 0)
+        options["multi"] = int(config.get("multi") or 1)
+    aggregator = make_aggregator(name, **options)
+    if aggregator is not None and min_children < aggregator.min_children:
+        raise ValueError(
+            f"{name} needs groups of at least {aggregator.min_children} children, "
+            f"but the minimum group size (MIN_CHILD_COMMITS / minChildCommits) is {min_children}"
+        )
+    return aggregator
+
+
+def _aggregator_from_env(min_children: int) -> Optional[RobustAggregator]:
+    return _aggregator_from_config(
+        {
+            "name": os.environ.get("AGGREGATOR", "fedavg"),
+            "trim": os.environ.get("AGGREGATOR_TRIM"),
+            "byzantine": os.environ.get("AGGREGATOR_BYZANTINE"),
+            "multi": os.environ.get("AGGREGATOR_MULTI"),
+        },
+        min_children,
+    )
+
+
 def main() -> None:
     base_url = _env("FLAIR_BASE_URL")
     repo_hash = _env("FLAIR_REPO_HASH")
@@ -329,6 +628,9 @@ def main() -> None:
     auth_token = _env("FLAIR_AUTH_TOKEN")
     min_children = int(os.environ.get("MIN_CHILD_COMMITS", "2"))
     poll_interval = int(os.environ.get("POLL_INTERVAL_SEC", "30"))
+    max_poll_interval = int(os.environ.get("POLL_MAX_INTERVAL_SEC", "300"))
+    download_workers = int(os.environ.get("DOWNLOAD_WORKERS", str(DEFAULT_WORKERS)))
+    download_retries = int(os.environ.get("DOWNLOAD_RETRIES", str(DEFAULT_RETRIES)))
 
     merger = FlairMerger(
         base_url=base_url,
@@ -338,6 +640,17 @@ def main() -> None:
         auth_token=auth_token,
         min_children=min_children,
         poll_interval=poll_interval,
+        download_workers=download_workers,
+        download_retries=download_retries,
+        spool_dir=os.environ.get("SPOOL_DIR") or None,
+        allow_pickle=os.environ.get("ALLOW_PICKLE_PARAMS", "0").lower() in ("1", "true", "yes"),
+        state_path=os.environ.get("MERGER_STATE_FILE", "merger_state.json"),
+        max_poll_interval=max_poll_interval,
+        page_size=int(os.environ.get("COMMIT_PAGE_SIZE", "200")),
+        lease_backend=_lease_backend_from_env(),
+        lease_ttl=float(os.environ.get("LEASE_TTL_SEC", str(DEFAULT_TTL_SEC))),
+        aggregator=_aggregator_from_env(min_children),
+        aggregation_pool=_aggregation_pool_from_env(),
     )
     merger.loop_forever()
 
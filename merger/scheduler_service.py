@@ -0,0 +1,215 @@
+"""
+Multi-target merge scheduler for Flair.
+
+Runs one FlairMerger per repo/branch target inside a single process:
+- All targets share one authenticated HTTP session (connection pool), one
+  ParamsDownloader (download pool, spool dir and hash-keyed download cache) and,
+  with AGGREGATION_WORKERS > 1, one aggregation process pool.
+- Each target keeps its own cursor and pending groups in <MERGER_STATE_DIR>/<repo>_<branch>.json.
+- Polls and merge jobs run on one shared worker pool. Merge jobs are dispatched
+  round-robin across targets, so a busy target cannot starve the others; at most
+  MERGER_PER_TARGET merges run per target and MERGER_WORKERS jobs in total.
+- Each target's poll interval backs off independently while it is idle.
+
+Environment/config expected:
+- FLAIR_BASE_URL, FLAIR_WALLET, FLAIR_AUTH_TOKEN (shared by all targets)
+- MERGER_TARGETS_FILE: JSON list of {"repoHash": ..., "branchHash": ..., "minChildCommits": optional int,
+  "aggregator": optional {"name": "median" | "trimmed_mean" | "krum" | "fedavg", "trim", "byzantine", "multi"}}
+  (targets without "aggregator" use the AGGREGATOR* environment settings)
+- MERGER_WORKERS (default 8), MERGER_PER_TARGET (default 1), MERGER_STATE_DIR (default merger_state)
+- DOWNLOAD_WORKERS, DOWNLOAD_RETRIES, SPOOL_DIR, DOWNLOAD_CACHE_DIR, DOWNLOAD_CACHE_MB (default 0: off)
+- MIN_CHILD_COMMITS, POLL_INTERVAL_SEC, POLL_MAX_INTERVAL_SEC, COMMIT_PAGE_SIZE, ALLOW_PICKLE_PARAMS,
+  AGGREGATION_WORKERS, LEASE_BACKEND, LEASE_DIR, LEASE_URL, LEASE_TTL_SEC and the ZK_* variables, as for merger_service.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lib.downloads import DEFAULT_RETRIES, DEFAULT_WORKERS, ParamsDownloader
+from lib.leases import DEFAULT_TTL_SEC
+from merger_service import (
+    CommitInfo,
+    FlairMerger,
+    _aggregation_pool_from_env,
+    _aggregator_from_config,
+    _aggregator_from_env,
+    _env,
+    _lease_backend_from_env,
+)
+
+LOGGER = logging.getLogger("flair.merger.scheduler")
+
+# Upper bound on how long the dispatcher waits before re-checking poll deadlines
+MAX_TICK_SEC = 5.0
+
+
+@dataclass
+class Target:
+    merger: FlairMerger
+    name: str
+    next_poll: float = 0.0
+    polling: bool = False
+    queued: Deque[Tuple[str, List[CommitInfo]]] = field(default_factory=deque)
+    in_flight: Set[str] = field(default_factory=set)
+
+    def waiting(self, parent_hash: str) -> bool:
+        return parent_hash in self.in_flight or any(p == parent_hash for p, _ in self.queued)
+
+
+class MergeScheduler:
+    def __init__(self, mergers: List[FlairMerger], max_workers: int = 8, per_target: int = 1) -> None:
+        self.targets = [Target(merger=m, name=f"{m.repo_hash}/{m.branch_hash}") for m in mergers]
+        self.max_workers = max(1, max_workers)
+        self.per_target = max(1, per_target)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="merge")
+        self._jobs: Dict[Future, Tuple[Target, Optional[str]]] = {}
+        self._next_target = 0
+
+    # -------- Jobs ---------
+    def _start_polls(self, now: float) -> None:
+        for target in self.targets:
+            if len(self._jobs) >= self.max_workers:
+                return
+            if not target.polling and now >= target.next_poll:
+                target.polling = True
+                self._jobs[self.executor.submit(target.merger.poll)] = (target, None)
+
+    def _dispatch_merges(self) -> None:
+        """Round-robin over targets, one merge at a time, within the global and per-target caps."""
+        while len(self._jobs) < self.max_workers:
+            started = False
+            for offset in range(len(self.targets)):
+                target = self.targets[(self._next_target + offset) % len(self.targets)]
+                if target.queued and len(target.in_flight) < self.per_target:
+                    parent_hash, children = target.queued.popleft()
+                    target.in_flight.add(parent_hash)
+                    self._jobs[self.executor.submit(target.merger.merge_group, parent_hash, children)] = (target, parent_hash)
+                    self._next_target = (self._next_target + offset + 1) % len(self.targets)
+                    started = True
+                    break
+            if not started:
+                return
+
+    def _finish(self, future: Future, now: float) -> None:
+        target, parent_hash = self._jobs.pop(future)
+        if parent_hash is not None:
+            target.in_flight.discard(parent_hash)
+            try:
+                future.result()
+            except Exception as exc:
+                LOGGER.warning("Merge of %s parent=%s failed: %s", target.name, parent_hash, exc)
+            return
+
+        target.polling = False
+        try:
+            new_commits, groups = future.result()
+        except Exception as exc:
+            LOGGER.warning("Poll of %s failed: %s", target.name, exc)
+            new_commits, groups = 0, {}
+        for parent_hash, children in groups.items():
+            if not target.waiting(parent_hash):
+                target.queued.append((parent_hash, children))
+        target.next_poll = now + target.merger.interval.next(active=new_commits > 0)
+
+    # -------- Loop ---------
+    def step(self) -> None:
+        now = time.monotonic()
+        self._start_polls(now)
+        self._dispatch_merges()
+        pending_polls = [t.next_poll for t in self.targets if not t.polling]
+        timeout = min([MAX_TICK_SEC] + [max(0.0, deadline - now) for deadline in pending_polls])
+        if not self._jobs:
+            time.sleep(timeout)
+            return
+        done, _ = wait(list(self._jobs), timeout=timeout, return_when=FIRST_COMPLETED)
+        now = time.monotonic()
+        for future in done:
+            self._finish(future, now)
+
+    def run_forever(self) -> None:
+        LOGGER.info("Scheduling %d targets on %d workers", len(self.targets), self.max_workers)
+        while True:
+            self.step()
+
+
+def _load_targets(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        targets = json.load(f)
+    if not isinstance(targets, list) or not all("repoHash" in t and "branchHash" in t for t in targets):
+        raise RuntimeError(f"{path} must be a JSON list of {{repoHash, branchHash}} objects")
+    return targets
+
+
+def main() -> None:
+    base_url = _env("FLAIR_BASE_URL")
+    wallet = _env("FLAIR_WALLET")
+    auth_token = _env("FLAIR_AUTH_TOKEN")
+    targets = _load_targets(_env("MERGER_TARGETS_FILE"))
+    workers = int(os.environ.get("MERGER_WORKERS", "8"))
+    per_target = int(os.environ.get("MERGER_PER_TARGET", "1"))
+    state_dir = Path(os.environ.get("MERGER_STATE_DIR", "merger_state"))
+    min_children = int(os.environ.get("MIN_CHILD_COMMITS", "2"))
+    spool_dir = os.environ.get("SPOOL_DIR") or None
+    lease_backend = _lease_backend_from_env()
+    lease_ttl = float(os.environ.get("LEASE_TTL_SEC", str(DEFAULT_TTL_SEC)))
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Authorization": auth_token})
+    downloader = ParamsDownloader(
+        max_workers=int(os.environ.get("DOWNLOAD_WORKERS", str(DEFAULT_WORKERS))),
+        retries=int(os.environ.get("DOWNLOAD_RETRIES", str(DEFAULT_RETRIES))),
+        spool_dir=spool_dir,
+        cache_dir=os.environ.get("DOWNLOAD_CACHE_DIR") or None,
+        cache_max_bytes=int(os.environ.get("DOWNLOAD_CACHE_MB", "0")) * 1024 * 1024,
+    )
+    aggregation_pool = _aggregation_pool_from_env()
+
+    mergers = []
+    for t in targets:
+        target_min_children = int(t.get("minChildCommits") or min_children)
+        if t.get("aggregator"):
+            aggregator = _aggregator_from_config(t["aggregator"], target_min_children)
+        else:
+            aggregator = _aggregator_from_env(target_min_children)
+        mergers.append(
+            FlairMerger(
+                base_url=base_url,
+                repo_hash=t["repoHash"],
+                branch_hash=t["branchHash"],
+                wallet=wallet,
+                auth_token=auth_token,
+                min_children=target_min_children,
+                poll_interval=int(os.environ.get("POLL_INTERVAL_SEC", "30")),
+                max_poll_interval=int(os.environ.get("POLL_MAX_INTERVAL_SEC", "300")),
+                page_size=int(os.environ.get("COMMIT_PAGE_SIZE", "200")),
+                spool_dir=spool_dir,
+                allow_pickle=os.environ.get("ALLOW_PICKLE_PARAMS", "0").lower() in ("1", "true", "yes"),
+                state_path=str(state_dir / f"{t['repoHash']}_{t['branchHash']}.json"),
+                session=session,
+                downloader=downloader,
+                lease_backend=lease_backend,
+                lease_ttl=lease_ttl,
+                aggregator=aggregator,
+                aggregation_pool=aggregation_pool,
+            )
+        )
+    MergeScheduler(mergers, max_workers=workers, per_target=per_target).run_forever()
+
+
+if __name__ == "__main__":
+    main()
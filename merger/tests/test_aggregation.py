@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import unittest
+
+import numpy as np
+
+from lib.aggregation import CoordinateMedian, Krum, TrimmedMean, WeightedAverage, make_aggregator
+from merger_service import _aggregator_from_config
+
+
+def _models(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [[rng.standard_normal((30, 17)).astype(np.float32), rng.standard_normal(101)] for _ in range(count)]
+
+
+class WeightedAverageTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.models = [
+            [
+                rng.standard_normal((13, 9)).astype(np.float32),
+                rng.integers(-100, 100, 50).astype(np.int32),
+                rng.standard_normal(77).astype(np.float16),
+                np.float64(rng.standard_normal()),
+            ]
+            for _ in range(3)
+        ]
+        self.num_examples = [5, 2, 9]
+
+    def _naive(self, models, weights, total):
+        return [sum(w * m[i].astype(np.float64) for w, m in zip(weights, models)) / total for i in range(len(models[0]))]
+
+    def test_matches_naive_weighted_mean_across_chunks(self):
+        average = WeightedAverage(chunk_elements=10)
+        for model, n in zip(self.models, self.num_examples):
+            average.add(model, n)
+        self.assertEqual((average.count, average.total_examples), (3, 16))
+
+        result = average.result()
+
+        # Flower's FedAvg dtypes: floats keep theirs, ints become float64
+        self.assertEqual([layer.dtype for layer in result], [np.float32, np.float64, np.float16, np.float64])
+        self.assertEqual(result[3].shape, ())
+        for layer, expected in zip(result, self._naive(self.models, self.num_examples, 16)):
+            np.testing.assert_allclose(layer, expected.astype(layer.dtype), rtol=1e-6)
+
+    def test_base_is_weighted_but_not_counted(self):
+        base, deltas = self.models[0], self.models[1:]
+        average = WeightedAverage(chunk_elements=10)
+        average.add_base(base, 11)
+        for delta, n in zip(deltas, self.num_examples[1:]):
+            average.add(delta, n)
+        self.assertEqual((average.count, average.total_examples), (2, 11))
+
+        expected = self._naive(self.models, [11] + self.num_examples[1:], 11)
+        for layer, value in zip(average.result(), expected):
+            np.testing.assert_allclose(layer, value.astype(layer.dtype), rtol=1e-6)
+
+    def test_rejects_mismatched_or_empty_input(self):
+        average = WeightedAverage()
+        with self.assertRaises(ValueError):
+            average.result()
+        average.add(self.models[0], 1)
+        with self.assertRaises(ValueError):
+            average.add(self.models[1][:2], 1)
+        with self.assertRaises(ValueError):
+            average.add(self.models[1], -1)
+
+        zero = WeightedAverage()
+        zero.add(self.models[0], 0)
+        with self.assertRaises(ValueError):
+            zero.result()
+
+
+class RobustAggregatorTest(unittest.TestCase):
+    # 4 children x 8 bytes: 32-element blocks, so every layer spans several blocks
+    BLOCK_BYTES = 4 * 8 * 32
+
+    def test_median_matches_numpy_across_blocks(self):
+        for count in (4, 5):
+            models = _models(count)
+            result = CoordinateMedian(block_bytes=self.BLOCK_BYTES).aggregate(models, [1] * count)
+            for index, layer in enumerate(result):
+                expected = np.median(np.stack([m[index].astype(np.float64) for m in models]), axis=0)
+                self.assertEqual(layer.dtype, models[0][index].dtype)
+                np.testing.assert_allclose(layer, expected.astype(layer.dtype), rtol=0, atol=0)
+
+    def test_trimmed_mean_drops_extremes_across_blocks(self):
+        models = _models(8)
+        result = TrimmedMean(trim=0.25, block_bytes=self.BLOCK_BYTES).aggregate(models, [1] * 8)
+        for index, layer in enumerate(result):
+            stacked = np.sort(np.stack([m[index].astype(np.float64) for m in models]), axis=0)
+            expected = stacked[2:6].mean(axis=0)
+            np.testing.assert_allclose(layer, expected.astype(layer.dtype), rtol=1e-6)
+
+    def test_trimmed_mean_without_cut_is_the_plain_mean(self):
+        models = _models(3)
+        result = TrimmedMean(trim=0.1).aggregate(models, [5, 1, 1])
+        np.testing.assert_allclose(result[1], np.mean([m[1] for m in models], axis=0))
+
+    def test_krum_picks_honest_children_over_an_outlier(self):
+        honest = _models(4, seed=1)
+        outlier = [[layer * 0 + 100.0 for layer in honest[0]]]
+        models = honest[:2] + outlier + honest[2:]
+
+        krum = Krum(byzantine=1, block_bytes=self.BLOCK_BYTES)
+        self.assertNotIn(2, krum.select(models))
+
+        multi = Krum(byzantine=1, multi=4)
+        self.assertEqual(sorted(multi.select(models)), [0, 1, 3, 4])
+        result = multi.aggregate(models, [1, 1, 1, 1, 1])
+        expected = np.mean([m[1] for m in honest], axis=0)
+        np.testing.assert_allclose(result[1], expected)
+
+    def test_krum_needs_more_than_f_plus_two_children(self):
+        with self.assertRaises(ValueError):
+            Krum(byzantine=1).aggregate(_models(3), [1, 1, 1])
+
+    def test_mismatched_layers_are_rejected(self):
+        models = _models(3)
+        models[1][0] = models[1][0][:, :5]
+        with self.assertRaises(ValueError):
+            CoordinateMedian().aggregate(models, [1, 1, 1])
+
+    def test_make_aggregator(self):
+        self.assertIsNone(make_aggregator("fedavg"))
+        self.assertIsInstance(make_aggregator("trimmed_mean", trim=0.2), TrimmedMean)
+        for name, options in [
+            ("trimmed_mean", {"trim": 0.5}),
+            ("trimmed_mean", {"trim": -0.1}),
+            ("krum", {"byzantine": -1}),
+            ("krum", {"multi": 0}),
+            ("mean", {}),
+        ]:
+            with self.subTest(name=name, options=options), self.assertRaises(ValueError):
+                make_aggregator(name, **options)
+
+    def test_config_rejects_krum_groups_that_are_too_small(self):
+        with self.assertRaisesRegex(ValueError, "at least 3 children"):
+            _aggregator_from_config({"name": "krum"}, min_children=2)
+        with self.assertRaisesRegex(ValueError, "at least 5 children"):
+            _aggregator_from_config({"name": "krum", "byzantine": "2"}, min_children=4)
+
+        self.assertEqual(_aggregator_from_config({"name": "krum", "byzantine": "1"}, min_children=4).min_children, 4)
+        self.assertIsInstance(_aggregator_from_config({"name": "median"}, min_children=1), CoordinateMedian)
+
+
+if __name__ == "__main__":
+    unittest.main()
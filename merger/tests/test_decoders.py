@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+import pickle
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from lib.decoders import UnsupportedParamsFormat, decode_params
+
+
+def _layers():
+    rng = np.random.default_rng(0)
+    return [
+        rng.standard_normal((6, 4)).astype(np.float32),
+        np.asfortranarray(rng.standard_normal((3, 5))),
+        rng.integers(-9, 9, 12).astype(np.int64),
+        np.float32(2.5),
+    ]
+
+
+def _write_safetensors(path: Path, named) -> None:
+    codes = {np.dtype(np.float32): "F32", np.dtype(np.float64): "F64", np.dtype(np.int64): "I64"}
+    header, blobs, offset = {}, [], 0
+    for name, array in named.items():
+        data = np.ascontiguousarray(array).astype(array.dtype.newbyteorder("<")).tobytes()
+        header[name] = {"dtype": codes[array.dtype], "shape": list(array.shape), "data_offsets": [offset, offset + len(data)]}
+        blobs.append(data)
+        offset += len(data)
+    encoded = json.dumps(header).encode()
+    path.write_bytes(struct.pack("<Q", len(encoded)) + encoded + b"".join(blobs))
+
+
+class DecodeParamsTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._temp_dir.name)
+        self.layers = _layers()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _assert_layers(self, decoded, expected=None):
+        expected = self.layers if expected is None else expected
+        self.assertEqual(len(decoded), len(expected))
+        for read, original in zip(decoded, expected):
+            self.assertEqual(read.dtype, np.asarray(original).dtype)
+            np.testing.assert_array_equal(read, original)
+
+    def test_npz_stored_members_are_mapped(self):
+        path = self.dir / "params.npz"
+        np.savez(path, *self.layers, np.zeros((0, 2), dtype=np.float32))
+
+        decoded = decode_params(path)
+
+        self._assert_layers(decoded, self.layers + [np.zeros((0, 2), dtype=np.float32)])
+        self.assertIsInstance(decoded[0], np.memmap)
+        self.assertTrue(decoded[1].flags.f_contiguous)
+
+    def test_npz_compressed_members_are_read(self):
+        path = self.dir / "params.npz"
+        np.savez_compressed(path, *self.layers)
+
+        self._assert_layers(decode_params(path))
+
+    def test_named_layers_sort_numerically_then_by_name(self):
+        path = self.dir / "params.npz"
+        np.savez(path, **{f"arr_{i}": layer for i, layer in reversed(list(enumerate(self.layers)))}, bias=np.ones(2))
+
+        self._assert_layers(decode_params(path), self.layers + [np.ones(2)])
+
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "torch not installed")
+    def test_torch_state_dict(self):
+        import torch
+
+        path = self.dir / "params.pt"
+        weight = torch.arange(12, dtype=torch.float32).reshape(3, 4)
+        torch.save({"fc.weight": weight, "fc.bias": torch.ones(3, dtype=torch.bfloat16)}, path)
+
+        bias, decoded_weight = decode_params(path)
+
+        np.testing.assert_array_equal(decoded_weight, weight.numpy())
+        # bfloat16 is widened to float32
+        self.assertEqual(bias.dtype, np.float32)
+        np.testing.assert_array_equal(bias, np.ones(3, dtype=np.float32))
+
+    @unittest.skipUnless(importlib.util.find_spec("torch"), "torch not installed")
+    def test_torch_refuses_pickled_objects(self):
+        import torch
+
+        path = self.dir / "params.pt"
+        torch.save({"weights": [np.ones(2)], "step": Path("x")}, path)
+
+        # weights_only loading rejects anything but tensors and plain containers
+        with self.assertRaises(pickle.UnpicklingError):
+            decode_params(path)
+
+    def test_safetensors(self):
+        path = self.dir / "params.safetensors"
+        _write_safetensors(path, {f"arr_{i}": np.asarray(layer) for i, layer in enumerate(self.layers)})
+
+        decoded = decode_params(path)
+
+        self._assert_layers(decoded)
+        self.assertFalse(decoded[0].flags.writeable)
+
+    def test_pickle_is_refused_unless_allowed(self):
+        path = self.dir / "params.pkl"
+        with open(path, "wb") as f:
+            pickle.dump(self.layers, f)
+
+        with self.assertRaisesRegex(UnsupportedParamsFormat, "pickle is disabled"):
+            decode_params(path)
+
+        self._assert_layers(decode_params(path, allow_pickle=True))
+
+    def test_unknown_format(self):
+        path = self.dir / "params.bin"
+        path.write_bytes(b"not a params file")
+
+        with self.assertRaises(UnsupportedParamsFormat):
+            decode_params(path, allow_pickle=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
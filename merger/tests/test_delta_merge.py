@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+import merger_service
+from lib.aggregation import make_aggregator
+from merger_service import CommitInfo, FlairMerger
+
+
+class _LocalDownloader:
+    """Serves params URIs that are local paths, copying each to a spool file like ParamsDownloader."""
+
+    def __init__(self, spool_dir: str) -> None:
+        self.spool_dir = spool_dir
+        self.fetched = []
+
+    def fetch_all(self, items):
+        for uri, _ in items:
+            self.fetched.append(uri)
+            fd, name = tempfile.mkstemp(prefix="params-", suffix=".spool", dir=self.spool_dir)
+            with open(fd, "wb") as out, open(uri, "rb") as src:
+                shutil.copyfileobj(src, out)
+            yield Path(name)
+
+
+def _layers(rng, scale: float = 1.0):
+    return [
+        (rng.standard_normal((20, 7)) * scale).astype(np.float32),
+        rng.standard_normal(33) * scale,
+    ]
+
+
+class DeltaMergeTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._temp_dir.name)
+        rng = np.random.default_rng(0)
+
+        # Parent p1 is itself a delta on the checkpoint p0, so it has to be rebuilt
+        checkpoint, parent_delta = _layers(rng), _layers(rng, scale=0.1)
+        self.parent = [c + d for c, d in zip(checkpoint, parent_delta)]
+        self.details = {
+            "p0": self._detail("p0", "_GENESIS_COMMIT_", "CHECKPOINT", checkpoint),
+            "p1": self._detail("p1", "p0", "DELTA", parent_delta),
+        }
+
+        self.deltas = [_layers(rng, scale=0.1) for _ in range(3)]
+        self.full = [[p + d for p, d in zip(self.parent, delta)] for delta in self.deltas]
+        self.num_examples = [3, 1, 4]
+
+        self.downloader = _LocalDownloader(self._temp_dir.name)
+        self.merger = FlairMerger("http://backend", "repo", "branch", "merger-wallet", "token", downloader=self.downloader)
+        self.merger.fetch_commit_detail = self.details.__getitem__
+
+    def tearDown(self):
+        for path in self.merger._parent_cache.values():
+            path.unlink(missing_ok=True)
+        self._temp_dir.cleanup()
+
+    def _save(self, name: str, layers) -> str:
+        path = self.dir / f"{name}.npz"
+        np.savez(path, *layers)
+        return str(path)
+
+    def _detail(self, commit_hash: str, previous: str, commit_type: str, layers) -> dict:
+        uri = self._save(commit_hash, layers)
+        return {"commitHash": commit_hash, "previousCommitHash": previous, "commitType": commit_type, "params": {"ipfsObject": {"uri": uri}}}
+
+    def _children(self, types):
+        children = []
+        for index, commit_type in enumerate(types):
+            layers = self.deltas[index] if commit_type == "DELTA" else self.full[index]
+            uri = self._save(f"c{index}", layers)
+            children.append(CommitInfo(f"c{index}", "p1", uri, "numpy", self.num_examples[index], f"w{index}", {}, commit_type=commit_type))
+        return children
+
+    def _expected_fedavg(self):
+        total = sum(self.num_examples)
+        return [sum(n * model[i].astype(np.float64) for n, model in zip(self.num_examples, self.full)) / total for i in range(2)]
+
+    def _assert_spools_removed(self):
+        self.assertEqual(list(self.dir.glob("params-*")), [])
+
+    def test_delta_group_matches_fedavg_of_full_children(self):
+        for types in (["DELTA"] * 3, ["DELTA", "CHECKPOINT", "DELTA"], ["CHECKPOINT"] * 3):
+            with self.subTest(types=types):
+                merged, metrics, arch = self.merger._aggregate(self._children(types))
+
+                self.assertEqual(metrics, {"num_examples": 8})
+                self.assertEqual(arch, "numpy")
+                for layer, expected, parent in zip(merged, self._expected_fedavg(), self.parent):
+                    self.assertEqual(layer.dtype, parent.dtype)
+                    np.testing.assert_allclose(layer, expected, rtol=1e-5, atol=1e-6)
+                self._assert_spools_removed()
+
+    def test_parent_is_rebuilt_once_for_several_groups(self):
+        self.merger._aggregate(self._children(["DELTA"] * 3))
+        self.merger._aggregate(self._children(["DELTA", "CHECKPOINT", "DELTA"]))
+
+        self.assertEqual(self.downloader.fetched.count(self.details["p0"]["params"]["ipfsObject"]["uri"]), 1)
+        with self.merger._parent_params("p1") as parent:
+            np.testing.assert_allclose(parent[1], self.parent[1])
+
+    def test_evicted_parent_is_kept_while_a_merge_uses_it(self):
+        with patch.object(merger_service, "PARENT_CACHE_SIZE", 1):
+            with self.merger._parent_params("p1") as parent:
+                path = self.merger._parent_cache["p1"]
+                # Another merge evicts p1; pool workers may still open its file by name
+                with self.merger._parent_params("p0"):
+                    pass
+                self.assertEqual(list(self.merger._parent_cache), ["p0"])
+                self.assertTrue(path.exists())
+                with np.load(path) as archive:
+                    np.testing.assert_allclose(archive["arr_1"], parent[1])
+
+        self.assertFalse(path.exists())
+        self.assertEqual(self.merger._parent_pins, {})
+
+    def test_robust_delta_group_matches_full_children(self):
+        self.merger.aggregator = make_aggregator("median")
+        merged, _, _ = self.merger._aggregate(self._children(["DELTA", "CHECKPOINT", "DELTA"]))
+
+        for index, layer in enumerate(merged):
+            expected = np.median(np.stack([model[index].astype(np.float64) for model in self.full]), axis=0)
+            np.testing.assert_allclose(layer, expected, rtol=1e-5, atol=1e-6)
+
+    def test_group_too_small_for_krum_falls_back_to_fedavg(self):
+        self.merger.aggregator = make_aggregator("krum", byzantine=1)
+        with self.assertLogs("flair.merger", level="WARNING"):
+            merged, _, _ = self.merger._aggregate(self._children(["DELTA", "CHECKPOINT", "DELTA"]))
+
+        for layer, expected in zip(merged, self._expected_fedavg()):
+            np.testing.assert_allclose(layer, expected, rtol=1e-5, atol=1e-6)
+
+    def test_rebuild_stops_at_a_merge_commit(self):
+        # Merge commits are typed DELTA by the backend but always hold full params
+        self.details["p1"].update(commitType="DELTA", committerAddress="merger-wallet")
+        self.details["p1"]["params"]["ipfsObject"]["uri"] = self._save("p1-full", self.parent)
+
+        path = self.merger._rebuild_params("p1")
+        try:
+            with np.load(path) as archive:
+                np.testing.assert_array_equal(archive["arr_1"], self.parent[1])
+        finally:
+            path.unlink()
+        self.assertNotIn(self.details["p0"]["params"]["ipfsObject"]["uri"], self.downloader.fetched)
+
+
+if __name__ == "__main__":
+    unittest.main()
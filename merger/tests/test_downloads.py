@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from lib.downloads import DownloadError, HashMismatchError, ParamsDownloader
+
+
+def _sha256(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class _BlobServer:
+    """Serves canned responses per path: a list of (status, body) consumed in order, the last one repeating."""
+
+    def __init__(self) -> None:
+        self.responses = {}
+        self.requests = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests[self.path] += 1
+                queue = server.responses[self.path]
+                status, body = queue.pop(0) if len(queue) > 1 else queue[0]
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join()
+
+
+class ParamsDownloaderTest(unittest.TestCase):
+    def setUp(self):
+        self.server = _BlobServer()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.spool_dir = Path(self._temp_dir.name) / "spool"
+        self.spool_dir.mkdir()
+        self.cache_dir = Path(self._temp_dir.name) / "cache"
+
+    def tearDown(self):
+        self.server.close()
+        self._temp_dir.cleanup()
+
+    def _downloader(self, **kwargs) -> ParamsDownloader:
+        kwargs.setdefault("retries", 2)
+        return ParamsDownloader(backoff=0, spool_dir=str(self.spool_dir), **kwargs)
+
+    def _spooled(self):
+        return sorted(self.spool_dir.iterdir())
+
+    def test_retryable_status_is_retried(self):
+        self.server.responses["/a"] = [(503, b""), (429, b""), (200, b"params")]
+
+        path = self._downloader().fetch(self.server.url("/a"))
+
+        self.assertEqual(path.read_bytes(), b"params")
+        self.assertEqual(self.server.requests["/a"], 3)
+
+    def test_retryable_status_fails_once_retries_run_out(self):
+        self.server.responses["/a"] = [(500, b"")]
+
+        with self.assertRaisesRegex(DownloadError, "status 500"):
+            self._downloader().fetch(self.server.url("/a"))
+
+        self.assertEqual(self.server.requests["/a"], 3)
+        self.assertEqual(self._spooled(), [])
+
+    def test_other_client_errors_fail_immediately(self):
+        self.server.responses["/a"] = [(404, b"")]
+
+        with self.assertRaisesRegex(DownloadError, "status 404"):
+            self._downloader().fetch(self.server.url("/a"))
+
+        self.assertEqual(self.server.requests["/a"], 1)
+
+    def test_hash_mismatch_is_retried_then_raised(self):
+        self.server.responses["/a"] = [(200, b"truncated"), (200, b"params")]
+        path = self._downloader().fetch(self.server.url("/a"), _sha256(b"params"))
+        self.assertEqual(path.read_bytes(), b"params")
+        self.assertEqual(self.server.requests["/a"], 2)
+
+        self.server.responses["/b"] = [(200, b"corrupt")]
+        with self.assertRaises(HashMismatchError):
+            self._downloader().fetch(self.server.url("/b"), _sha256(b"params"))
+        self.assertEqual(self.server.requests["/b"], 3)
+        self.assertEqual(self._spooled(), [path])
+
+    def test_abandoned_fetch_all_removes_unyielded_spools(self):
+        for name in "abc":
+            self.server.responses[f"/{name}"] = [(200, name.encode() * 10)]
+        downloader = self._downloader(max_workers=3)
+
+        spooled = downloader.fetch_all([(self.server.url(f"/{name}"), None) for name in "abc"])
+        first = next(spooled)
+        spooled.close()
+
+        self.assertEqual(first.read_bytes(), b"a" * 10)
+        self.assertEqual(self._spooled(), [first])
+
+    def test_failed_fetch_all_removes_downloaded_spools(self):
+        self.server.responses["/a"] = [(200, b"a")]
+        self.server.responses["/b"] = [(404, b"")]
+        self.server.responses["/c"] = [(200, b"c")]
+
+        with self.assertRaises(DownloadError):
+            list(self._downloader().fetch_all([(self.server.url(f"/{name}"), None) for name in "abc"]))
+
+        # "a" was yielded and belongs to the caller; "c" was not
+        self.assertEqual([p.read_bytes() for p in self._spooled()], [b"a"])
+
+    def test_cache_serves_hard_links_by_hash(self):
+        body = b"params" * 100
+        self.server.responses["/a"] = [(200, body)]
+        downloader = self._downloader(cache_dir=str(self.cache_dir), cache_max_bytes=1 << 20)
+
+        first = downloader.fetch(self.server.url("/a"), _sha256(body))
+        # A different URI with the same hash is served from the cache
+        second = downloader.fetch(self.server.url("/elsewhere"), _sha256(body).upper())
+
+        self.assertEqual(self.server.requests["/a"], 1)
+        self.assertEqual(self.server.requests["/elsewhere"], 0)
+        cached = self.cache_dir / _sha256(body)
+        self.assertEqual(second.read_bytes(), body)
+        self.assertEqual(os.stat(cached).st_ino, os.stat(second).st_ino)
+        # Callers unlink their spool files; the cache entry survives
+        first.unlink()
+        second.unlink()
+        self.assertEqual(cached.read_bytes(), body)
+
+    def test_cache_evicts_least_recently_used(self):
+        bodies = {name: name.encode() * 100 for name in "abc"}
+        for name, body in bodies.items():
+            self.server.responses[f"/{name}"] = [(200, body)]
+        downloader = self._downloader(cache_dir=str(self.cache_dir), cache_max_bytes=250)
+
+        for mtime, name in enumerate("ab"):
+            downloader.fetch(self.server.url(f"/{name}"), _sha256(bodies[name])).unlink()
+            os.utime(self.cache_dir / _sha256(bodies[name]), ns=(mtime, mtime))
+        downloader.fetch(self.server.url("/c"), _sha256(bodies["c"])).unlink()
+
+        self.assertEqual(sorted(p.name for p in self.cache_dir.iterdir()), sorted([_sha256(bodies["b"]), _sha256(bodies["c"])]))
+
+    def test_cache_is_off_without_a_budget(self):
+        self.server.responses["/a"] = [(200, b"params")]
+        downloader = self._downloader(cache_dir=str(self.cache_dir))
+
+        downloader.fetch(self.server.url("/a"), _sha256(b"params")).unlink()
+        downloader.fetch(self.server.url("/a"), _sha256(b"params")).unlink()
+
+        self.assertEqual(self.server.requests["/a"], 2)
+        self.assertEqual(list(self.cache_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from lib.encoders import spool_npz
+
+
+class SpoolNpzTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _round_trip(self, nds):
+        path, digest, size = spool_npz(nds, self._temp_dir.name)
+        try:
+            self.assertEqual(digest, hashlib.sha256(path.read_bytes()).hexdigest())
+            self.assertEqual(size, path.stat().st_size)
+            with np.load(path) as archive:
+                return [archive[f"arr_{i}"] for i in range(len(archive.files))]
+        finally:
+            path.unlink()
+
+    def test_round_trip_keeps_values_for_any_memory_order(self):
+        base = np.arange(24, dtype=np.float32).reshape(4, 6)
+        nds = [
+            base,
+            np.asfortranarray(base),
+            base[:, ::2],
+            base.T,
+            np.asfortranarray(np.arange(60, dtype=np.int64).reshape(3, 4, 5)),
+        ]
+        loaded = self._round_trip(nds)
+        for original, read in zip(nds, loaded):
+            self.assertEqual(read.dtype, original.dtype)
+            np.testing.assert_array_equal(read, original)
+
+    def test_round_trip_keeps_scalars_and_empty_arrays(self):
+        nds = [np.array(3.5, dtype=np.float32), np.zeros((0, 3), dtype=np.float16), np.float64(-1.0)]
+        loaded = self._round_trip(nds)
+        self.assertEqual([a.shape for a in loaded], [(), (0, 3), ()])
+        self.assertEqual([a.dtype for a in loaded], [np.float32, np.float16, np.float64])
+        self.assertEqual(float(loaded[0]), 3.5)
+        self.assertEqual(float(loaded[2]), -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from lib.lease_server import make_server
+from lib.leases import FileLeaseBackend, HttpLeaseBackend, LeaseKeeper, LeaseLost, lease_key
+from merger_service import FlairMerger
+
+KEY = lease_key("repo", "branch", "parent")
+
+
+class _LeaseBackendCases:
+    """Protocol cases run against every backend; subclasses set self.backend."""
+
+    def test_acquire_is_exclusive_until_release(self):
+        first = self.backend.acquire(KEY, "a", ttl=30).lease
+        self.assertIsNotNone(first)
+        self.assertIsNone(self.backend.acquire(KEY, "b", ttl=30).lease)
+
+        self.backend.release(first)
+
+        self.assertIsNotNone(self.backend.acquire(KEY, "b", ttl=30).lease)
+
+    def test_renew_extends_a_held_lease(self):
+        lease = self.backend.acquire(KEY, "a", ttl=0.5).lease
+        expires_at = lease.expires_at
+
+        self.assertTrue(self.backend.renew(lease, ttl=30))
+        self.assertGreater(lease.expires_at, expires_at)
+        time.sleep(0.6)
+        self.assertIsNone(self.backend.acquire(KEY, "b", ttl=30).lease)
+
+    def test_expired_lease_is_stolen_and_old_holder_cannot_renew(self):
+        stale = self.backend.acquire(KEY, "a", ttl=0.2).lease
+        time.sleep(0.3)
+
+        stolen = self.backend.acquire(KEY, "b", ttl=30).lease
+
+        self.assertIsNotNone(stolen)
+        self.assertFalse(self.backend.renew(stale, ttl=30))
+        # Releasing the stale lease must not free the new holder's
+        self.backend.release(stale)
+        self.assertIsNone(self.backend.acquire(KEY, "c", ttl=30).lease)
+
+    def test_completed_key_reports_its_result(self):
+        lease = self.backend.acquire(KEY, "a", ttl=30).lease
+
+        self.backend.complete(lease, "merge-commit")
+
+        self.assertEqual(self.backend.acquire(KEY, "b", ttl=30).done, "merge-commit")
+
+    def test_keeper_renews_past_the_ttl_and_detects_loss(self):
+        lease = self.backend.acquire(KEY, "a", ttl=0.3).lease
+        with LeaseKeeper(self.backend, lease, ttl=0.3) as keeper:
+            time.sleep(0.5)
+            keeper.check()
+            self.assertIsNone(self.backend.acquire(KEY, "b", ttl=30).lease)
+
+        lease = self.backend.acquire(KEY, "a", ttl=0.3).lease
+        with LeaseKeeper(self.backend, lease, ttl=0.3) as keeper:
+            # Another owner takes over, e.g. after this instance stalled
+            self.backend.release(lease)
+            self.backend.acquire(KEY, "b", ttl=30)
+            time.sleep(0.3)
+            with self.assertRaises(LeaseLost):
+                keeper.check()
+
+
+class FileLeaseBackendTest(_LeaseBackendCases, unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.backend = FileLeaseBackend(self._temp_dir.name)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+
+class HttpLeaseBackendTest(_LeaseBackendCases, unittest.TestCase):
+    def setUp(self):
+        self.server = make_server()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        self.backend = HttpLeaseBackend(f"http://127.0.0.1:{self.server.server_port}")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+class MergerRaceTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_two_instances_merge_one_group_once(self):
+        backend = FileLeaseBackend(self._temp_dir.name)
+        mergers = [
+            FlairMerger("http://backend", "repo", "branch", "merger-wallet", "token", lease_backend=backend, lease_ttl=5)
+            for _ in range(2)
+        ]
+        merges = []
+        started = threading.Barrier(2)
+
+        def slow_merge(parent_hash, children, keeper):
+            merges.append(parent_hash)
+            time.sleep(0.2)
+            keeper.check()
+            return "merge-commit"
+
+        results = [None, None]
+
+        def run(index):
+            started.wait()
+            results[index] = mergers[index].merge_group("parent", [])
+
+        with patch.object(FlairMerger, "_merge_group", side_effect=slow_merge, autospec=False):
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(merges, ["parent"])
+            self.assertIn("merge-commit", results)
+            # The loser sees the group as held (None) or done; either way a retry learns the result
+            self.assertIn(results[results.index("merge-commit") - 1], (None, "merge-commit"))
+            loser = mergers[results.index("merge-commit") - 1]
+            self.assertEqual(loser.merge_group("parent", []), "merge-commit")
+            self.assertEqual(loser.state.merged["parent"], "merge-commit")
+            self.assertEqual(merges, ["parent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
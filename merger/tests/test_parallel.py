@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from lib.aggregation import WeightedAverage, make_aggregator
+from lib.decoders import decode_params
+from lib.parallel import AggregationPool, ShardedAverage, aggregate_sharded
+
+SHM_DIR = Path("/dev/shm")
+
+
+def _shm_segments() -> set:
+    return {p.name for p in SHM_DIR.iterdir() if p.name.startswith("psm_")} if SHM_DIR.is_dir() else set()
+
+
+def _assert_bit_identical(test: unittest.TestCase, expected, actual) -> None:
+    test.assertEqual(len(expected), len(actual))
+    for a, b in zip(expected, actual):
+        test.assertEqual(a.dtype, b.dtype)
+        test.assertEqual(a.shape, b.shape)
+        test.assertEqual(a.tobytes(), b.tobytes())
+
+
+class ShardedAggregationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Small shards, so layers are split across tasks and tasks span several layers
+        cls.pool = AggregationPool(2, shard_elements=700)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self._segments = _shm_segments()
+        rng = np.random.default_rng(0)
+        self.models = []
+        for index in range(4):
+            layers = [
+                rng.standard_normal((40, 30)).astype(np.float32),
+                np.asfortranarray(rng.standard_normal((25, 12))),
+                np.float32(rng.standard_normal()),
+                np.zeros((0, 3), dtype=np.float32),
+                rng.integers(-50, 50, 999).astype(np.int64),
+                rng.standard_normal(1501).astype(np.float16),
+            ]
+            path = Path(self._temp_dir.name) / f"child{index}.npz"
+            # Stored members are mapped by the workers, compressed ones go through shared memory
+            (np.savez_compressed if index % 2 else np.savez)(path, *layers)
+            self.models.append(decode_params(path))
+        self.num_examples = [3, 1, 4, 2]
+
+    def tearDown(self):
+        self.models = None
+        self._temp_dir.cleanup()
+        self.assertEqual(_shm_segments() - self._segments, set())
+
+    def test_sharded_average_matches_weighted_average(self):
+        expected, actual = WeightedAverage(), ShardedAverage(self.pool)
+        for average in (expected, actual):
+            average.add_base(self.models[0], 5)
+            for model, n in zip(self.models, self.num_examples):
+                average.add(model, n)
+
+        self.assertEqual(actual.total_examples, expected.total_examples)
+        _assert_bit_identical(self, expected.result(), actual.result())
+
+    def test_robust_sharded_matches_in_process(self):
+        for aggregator in (
+            make_aggregator("median", block_bytes=2048),
+            make_aggregator("trimmed_mean", trim=0.25, block_bytes=2048),
+            make_aggregator("krum", byzantine=1),
+        ):
+            with self.subTest(aggregator=aggregator.name):
+                expected = aggregator.aggregate(self.models, self.num_examples)
+                actual = aggregate_sharded(self.pool, aggregator, self.models, self.num_examples)
+                _assert_bit_identical(self, expected, actual)
+
+    def test_failed_add_frees_shared_memory(self):
+        average = ShardedAverage(self.pool)
+        average.add(self.models[0], 1)
+        os.unlink(self.models[0][0].filename)
+
+        # The mapped layers survive in this process, but workers reopen the spool file by name
+        with patch("os.path.exists", return_value=True), self.assertRaises(FileNotFoundError):
+            average.add(self.models[0], 1)
+        average.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
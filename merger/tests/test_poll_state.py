@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from lib.poll_state import AdaptiveInterval, MergerState
+from merger_service import FlairMerger
+
+
+def _commit(commit_hash: str, created_at: str, parent: str = "p", committer: str = "user") -> dict:
+    return {
+        "commitHash": commit_hash,
+        "previousCommitHash": parent,
+        "createdAt": created_at,
+        "committerAddress": committer,
+        "architecture": "numpy",
+        "params": {"ipfsObject": {"uri": f"http://ipfs/{commit_hash}"}},
+    }
+
+
+class _Response:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": self._data}
+
+
+class _Backend:
+    """The commit listing of the backend: createdAt >= since, ordered by (createdAt, id), then skip/limit."""
+
+    def __init__(self, honor_skip: bool = True) -> None:
+        self.commits = []
+        self.honor_skip = honor_skip
+        self.requests = []
+
+    def get(self, url, params=None):
+        params = params or {}
+        self.requests.append(params)
+        listed = [c for c in self.commits if "since" not in params or c["createdAt"] >= params["since"]]
+        skip = params.get("skip", 0) if self.honor_skip else 0
+        return _Response(listed[skip:skip + params.get("limit", len(listed))])
+
+
+class FetchNewCommitsTest(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self._temp_dir.name) / "state.json"
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _merger(self, backend, **kwargs) -> FlairMerger:
+        return FlairMerger(
+            "http://backend", "repo", "branch", "merger-wallet", "token",
+            session=backend, page_size=2, state_path=str(self.state_path), **kwargs,
+        )
+
+    def test_same_timestamp_commits_across_a_page_boundary(self):
+        backend = _Backend()
+        backend.commits = [_commit("a", "t1"), _commit("b", "t2"), _commit("c", "t2"), _commit("d", "t2"), _commit("e", "t3")]
+        merger = self._merger(backend)
+
+        fetched = merger.fetch_new_commits()
+
+        self.assertEqual([c["commitHash"] for c in fetched], ["a", "b", "c", "d", "e"])
+        self.assertEqual(backend.requests[1], {"limit": 2, "since": "t2", "skip": 1})
+        self.assertEqual((merger.state.cursor_time, merger.state.cursor_hashes), ("t3", ["e"]))
+
+        # A later poll only returns commits after the cursor, including more at its timestamp
+        backend.commits.append(_commit("f", "t3"))
+        self.assertEqual([c["commitHash"] for c in merger.fetch_new_commits()], ["f"])
+        self.assertEqual(merger.fetch_new_commits(), [])
+
+    def test_server_ignoring_skip_does_not_loop(self):
+        backend = _Backend(honor_skip=False)
+        backend.commits = [_commit("a", "t1"), _commit("b", "t1"), _commit("c", "t1")]
+        merger = self._merger(backend)
+
+        fetched = merger.fetch_new_commits()
+
+        # Already-seen commits are filtered client-side; a page of only those ends the poll
+        self.assertEqual([c["commitHash"] for c in fetched], ["a", "b"])
+        self.assertEqual(len(backend.requests), 2)
+
+    def test_state_survives_a_restart(self):
+        backend = _Backend()
+        backend.commits = [_commit("a", "t1", parent="p1"), _commit("b", "t1", parent="p2"), _commit("c", "t2", parent="p2")]
+        merger = self._merger(backend, min_children=2)
+
+        new_commits, groups = merger.poll()
+        self.assertEqual((new_commits, list(groups)), (3, ["p2"]))
+        merger.state.mark_merged("p2", "m2")
+        merger.state.save()
+
+        restarted = self._merger(backend, min_children=2)
+        self.assertEqual(restarted.state.cursor_time, "t2")
+        self.assertEqual(restarted.state.merged, {"p2": "m2"})
+        self.assertEqual(list(restarted.state.pending), ["p1"])
+
+        # A late child of the merged parent is not grouped again; one more child completes p1
+        backend.commits += [_commit("d", "t3", parent="p2"), _commit("e", "t3", parent="p1")]
+        new_commits, groups = restarted.poll()
+        self.assertEqual(new_commits, 2)
+        self.assertEqual({p: sorted(c.commit_hash for c in children) for p, children in groups.items()}, {"p1": ["a", "e"]})
+
+    def test_merge_commits_mark_their_parent_merged(self):
+        backend = _Backend()
+        backend.commits = [
+            _commit("a", "t1"),
+            _commit("b", "t1"),
+            _commit("m", "t2", committer="merger-wallet"),
+            _commit("c", "t3"),
+        ]
+        merger = self._merger(backend)
+
+        _, groups = merger.poll()
+
+        # Another instance already merged p: its children are dropped and later ones ignored
+        self.assertEqual(groups, {})
+        self.assertEqual(merger.state.merged, {"p": "m"})
+        self.assertEqual(merger.state.pending, {})
+
+
+class MergerStateTest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "nested" / "state.json"
+            state = MergerState(path)
+            state.advance([_commit("a", "t1"), _commit("b", "t1")])
+            state.add_pending([_commit("a", "t1")])
+            state.mark_merged("old", "m")
+            state.save()
+
+            loaded = MergerState.load(path)
+
+            self.assertEqual(loaded.cursor_time, "t1")
+            self.assertEqual(loaded.cursor_hashes, ["a", "b"])
+            self.assertEqual(loaded.pending, {"p": {"a": _commit("a", "t1")}})
+            self.assertEqual(loaded.merged, {"old": "m"})
+            self.assertEqual(list(path.parent.iterdir()), [path])
+
+    def test_missing_or_other_version_file_starts_empty(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "state.json"
+            self.assertIsNone(MergerState.load(path).cursor_time)
+            path.write_text('{"version": 0, "cursorTime": "t1"}')
+            self.assertIsNone(MergerState.load(path).cursor_time)
+
+    def test_mark_merged_suppresses_later_children(self):
+        state = MergerState()
+        state.add_pending([_commit("a", "t1")])
+
+        state.mark_merged("p", "m")
+
+        self.assertEqual(state.pending, {})
+        self.assertEqual(state.add_pending([_commit("b", "t2")]), 0)
+        self.assertEqual(state.pending_commits(), [])
+
+    def test_adaptive_interval(self):
+        interval = AdaptiveInterval(10, 35)
+        self.assertEqual([interval.next(active=False) for _ in range(4)], [10, 20, 35, 35])
+        self.assertEqual(interval.next(active=True), 10)
+        self.assertEqual(interval.next(active=False), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from concurrent.futures import Future, wait
+
+from lib.poll_state import AdaptiveInterval
+from scheduler_service import MergeScheduler
+
+
+class _StubMerger:
+    """Stands in for FlairMerger: merges block until released, polls return canned groups."""
+
+    def __init__(self, name: str, release: threading.Event) -> None:
+        self.repo_hash = name
+        self.branch_hash = "branch"
+        self.interval = AdaptiveInterval(30, 300)
+        self.release = release
+        self.groups = {}
+        self.error = None
+
+    def poll(self):
+        return len(self.groups), self.groups
+
+    def merge_group(self, parent_hash, children):
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return f"merge-{parent_hash}"
+
+
+class MergeSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.schedulers = []
+
+    def tearDown(self):
+        self.release.set()
+        for scheduler in self.schedulers:
+            scheduler.executor.shutdown(wait=True)
+
+    def _scheduler(self, names, **kwargs) -> MergeScheduler:
+        scheduler = MergeScheduler([_StubMerger(name, self.release) for name in names], **kwargs)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def _queue(self, scheduler, index, *parents):
+        scheduler.targets[index].queued.extend((parent, []) for parent in parents)
+
+    def _running(self, scheduler):
+        return [(target.merger.repo_hash, parent) for target, parent in scheduler._jobs.values() if parent is not None]
+
+    def _finish_all(self, scheduler):
+        self.release.set()
+        jobs = list(scheduler._jobs)
+        wait(jobs, timeout=5)
+        for future in jobs:
+            scheduler._finish(future, 0.0)
+        self.release.clear()
+
+    def test_merges_are_dispatched_round_robin(self):
+        scheduler = self._scheduler(["a", "b"], max_workers=3, per_target=2)
+        self._queue(scheduler, 0, "a1", "a2", "a3")
+        self._queue(scheduler, 1, "b1", "b2", "b3")
+
+        scheduler._dispatch_merges()
+
+        self.assertEqual(self._running(scheduler), [("a", "a1"), ("b", "b1"), ("a", "a2")])
+        self._finish_all(scheduler)
+        scheduler._dispatch_merges()
+        # The next round starts with the target after the last one served
+        self.assertEqual(self._running(scheduler), [("b", "b2"), ("a", "a3"), ("b", "b3")])
+
+    def test_per_target_cap(self):
+        scheduler = self._scheduler(["a"], max_workers=8, per_target=1)
+        self._queue(scheduler, 0, "a1", "a2", "a3")
+
+        scheduler._dispatch_merges()
+
+        self.assertEqual(self._running(scheduler), [("a", "a1")])
+        self.assertEqual(len(scheduler.targets[0].queued), 2)
+
+    def test_global_cap(self):
+        scheduler = self._scheduler(["a", "b", "c"], max_workers=2, per_target=1)
+        for index, name in enumerate("abc"):
+            self._queue(scheduler, index, f"{name}1")
+
+        scheduler._dispatch_merges()
+        self.assertEqual(self._running(scheduler), [("a", "a1"), ("b", "b1")])
+
+        self._finish_all(scheduler)
+        scheduler._dispatch_merges()
+        self.assertEqual(self._running(scheduler), [("c", "c1")])
+
+    def test_queued_or_in_flight_parents_are_not_queued_again(self):
+        scheduler = self._scheduler(["a"], max_workers=4, per_target=1)
+        target = scheduler.targets[0]
+        self._queue(scheduler, 0, "p1", "p2")
+        scheduler._dispatch_merges()
+        self.assertEqual(target.in_flight, {"p1"})
+
+        target.merger.groups = {"p1": [], "p2": [], "p3": []}
+        poll = Future()
+        poll.set_result(target.merger.poll())
+        scheduler._jobs[poll] = (target, None)
+        target.polling = True
+        scheduler._finish(poll, 100.0)
+
+        self.assertEqual([parent for parent, _ in target.queued], ["p2", "p3"])
+        self.assertFalse(target.polling)
+        self.assertEqual(target.next_poll, 130.0)
+
+    def test_failed_merge_is_logged_and_frees_the_slot(self):
+        scheduler = self._scheduler(["a"], max_workers=4, per_target=1)
+        scheduler.targets[0].merger.error = RuntimeError("lease completion failed")
+        self._queue(scheduler, 0, "p1")
+        scheduler._dispatch_merges()
+
+        with self.assertLogs("flair.merger.scheduler", level="WARNING") as logs:
+            self._finish_all(scheduler)
+
+        self.assertIn("lease completion failed", logs.output[0])
+        self.assertEqual(scheduler.targets[0].in_flight, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,7 @@ import { ZKMLProofCreateObj } from '../lib/types/zkmlproof.js';
 import { convertCommitToNft } from '../lib/nft/nft.js';
 import { umi } from '../lib/nft/umi.js';
 import { resolveUserIdFromPrincipal } from '../lib/auth/identity/index.js';
+import { CommitListQuery, parseCommitListQuery } from '../lib/commitList/index.js';
 
 const ZKP_JWT_SECRET = process.env.ZKP_JWT_SECRET || 'super-secret-commit-generation';
 const COMMIT_JWT_SECRET = process.env.COMMIT_JWT_SECRET || 'another-super-secret-commit-generation';
@@ -44,8 +45,32 @@ async function recordSessionError(sessionId: string, pk: string) {
 
 export const getAllCommits = async (req: Request, res: Response) => {
     const { branchId } = req;
+    let listQuery: CommitListQuery | null;
     try {
-        const commits = await prisma.commit.findMany({ where: { branchId } });
+        listQuery = parseCommitListQuery(req.query);
+    } catch (err) {
+        res.status(400).json({ error: { message: (err as Error).message } });
+        return;
+    }
+    try {
+        // Without query params the full branch history is returned, as before
+        if (!listQuery) {
+            const commits = await prisma.commit.findMany({ where: { branchId } });
+            res.status(200).json({ data: commits });
+            return;
+        }
+
+        // Incremental listing for pollers: commits created at or after `since`, oldest first.
+        // `since` is inclusive so commits sharing the cursor's timestamp are not missed; callers
+        // pass `skip` = the number of those they have already seen (a prefix of this ordering).
+        const { since, skip, take } = listQuery;
+        const commits = await prisma.commit.findMany({
+            where: { branchId, ...(since ? { createdAt: { gte: since } } : {}) },
+            orderBy: [{ createdAt: 'asc' }, { id: 'asc' }],
+            skip,
+            take,
+            include: { params: { include: { ipfsObject: true } } },
+        });
         res.status(200).json({ data: commits });
         return;
     } catch (err) {
@@ -0,0 +1,28 @@
+import { test } from 'node:test';
+import assert from 'node:assert/strict';
+import { InvalidCommitListQuery, parseCommitListQuery } from './index.js';
+
+test('no params lists the full history', () => {
+    assert.equal(parseCommitListQuery({}), null);
+});
+
+test('since, skip and limit are parsed', () => {
+    assert.deepEqual(parseCommitListQuery({ since: '2026-10-19T08:00:00.000Z', skip: '3', limit: '200' }), {
+        since: new Date('2026-10-19T08:00:00.000Z'),
+        skip: 3,
+        take: 200,
+    });
+    assert.deepEqual(parseCommitListQuery({ limit: '5' }), { since: undefined, skip: 0, take: 5 });
+});
+
+test('malformed params are rejected', () => {
+    for (const query of [
+        { since: 'yesterday' },
+        { limit: '0' },
+        { limit: 'all' },
+        { skip: '-1' },
+        { skip: 'x' },
+    ]) {
+        assert.throws(() => parseCommitListQuery(query), InvalidCommitListQuery, JSON.stringify(query));
+    }
+});
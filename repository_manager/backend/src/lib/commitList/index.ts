@@ -0,0 +1,31 @@
+// Query params of the incremental commit listing (GET .../commit/?since=&skip=&limit=)
+
+export type CommitListQuery = {
+    since?: Date;   // inclusive: commits created at or after it
+    skip: number;
+    take?: number;
+};
+
+export class InvalidCommitListQuery extends Error {
+    constructor() {
+        super('since must be an ISO timestamp, limit a positive integer and skip a non-negative integer.');
+    }
+}
+
+// Returns null when no param is given (the full branch history is listed, as before)
+export const parseCommitListQuery = (query: Record<string, unknown>): CommitListQuery | null => {
+    const { since, limit, skip } = query;
+    if (since === undefined && limit === undefined && skip === undefined) return null;
+
+    const sinceDate = since !== undefined ? new Date(String(since)) : undefined;
+    const take = limit !== undefined ? parseInt(String(limit), 10) : undefined;
+    const offset = skip !== undefined ? parseInt(String(skip), 10) : 0;
+    if (
+        (sinceDate && isNaN(sinceDate.getTime())) ||
+        (take !== undefined && (isNaN(take) || take <= 0)) ||
+        isNaN(offset) || offset < 0
+    ) {
+        throw new InvalidCommitListQuery();
+    }
+    return { since: sinceDate, skip: offset, take };
+};